@@ -0,0 +1,86 @@
+import pandas as pd
+
+from tracing import traced
+
+
+AGGREGATE_FUNCTIONS = ("sum", "count", "avg", "min", "max", "count_distinct")
+
+# UI에 표시할 이름
+AGGREGATE_LABELS = {
+    "sum": "SUM (합계)",
+    "count": "COUNT (개수)",
+    "avg": "AVG (평균)",
+    "min": "MIN (최솟값)",
+    "max": "MAX (최댓값)",
+    "count_distinct": "COUNT DISTINCT (고유 개수)",
+}
+
+_PANDAS_FUNCTIONS = {
+    "sum": "sum", "count": "count", "avg": "mean", "min": "min", "max": "max", "count_distinct": "nunique",
+}
+
+
+def aggregate_column_name(column, func):
+    """집계 결과 칼럼 이름 (SQL 쿼리 모드와 같은 형식: SUM(칼럼), COUNT(*), COUNT(DISTINCT 칼럼))"""
+    if column is None:
+        return "COUNT(*)"
+    if func == "count_distinct":
+        return f"COUNT(DISTINCT {column})"
+    return f"{func.upper()}({column})"
+
+
+def aggregate_column_types(group_by, aggregates, column_types):
+    """
+    집계 결과를 저장할 Notion 속성 타입
+    그룹 키와 MIN/MAX는 원래 칼럼 타입을 유지하고, 나머지 집계 값은 숫자
+    """
+    types = {column: column_types.get(column) for column in group_by}
+    for column, func in aggregates:
+        name = aggregate_column_name(column, func)
+        types[name] = column_types.get(column) if func in ("min", "max") else "number"
+    return types
+
+
+@traced(rows=len)
+def group_dataframe(df, group_by, aggregates):
+    """
+    조인 결과를 그룹별로 집계 (pandas groupby 한 번으로 모든 집계를 계산)
+    Args:
+        df (DataFrame): 조인 결과
+        group_by (list): 그룹 키 칼럼 (비어 있으면 전체를 한 행으로 집계)
+        aggregates (list): (칼럼, 함수) 목록. 칼럼이 None이면 COUNT(*)
+            함수는 sum, count, avg, min, max, count_distinct 중 하나
+    Returns:
+        DataFrame: 그룹 키 칼럼 + 집계 칼럼 (빈 그룹 키 값도 하나의 그룹으로 유지)
+    """
+    for column, func in aggregates:
+        if func not in AGGREGATE_FUNCTIONS:
+            raise ValueError(f"지원하지 않는 집계 함수: {func}")
+    missing = [c for c in list(group_by) + [c for c, _ in aggregates if c is not None] if c not in df.columns]
+    if missing:
+        raise ValueError(f"결과에 없는 칼럼: {', '.join(missing)}")
+
+    # 합계·평균은 숫자로 변환할 수 없는 값(빈 문자열 등)을 건너뜀
+    df = df.copy(deep=False)
+    for column, func in aggregates:
+        if func in ("sum", "avg") and not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+
+    specs = {}
+    for column, func in aggregates:
+        name = aggregate_column_name(column, func)
+        if column is None:
+            specs[name] = (None, "size")
+        else:
+            specs[name] = (column, _PANDAS_FUNCTIONS[func])
+
+    if not group_by:
+        row = {name: len(df) if func == "size" else getattr(df[column], func)() for name, (column, func) in specs.items()}
+        return pd.DataFrame([row], columns=list(specs))
+
+    grouped = df.groupby(list(group_by), dropna=False, observed=True, sort=False)
+    if not specs:
+        return grouped.size().reset_index()[list(group_by)]
+    return grouped.agg(**{
+        name: (group_by[0] if column is None else column, func) for name, (column, func) in specs.items()
+    }).reset_index()
@@ -0,0 +1,123 @@
+"""
+notion_to_dataframe 마이크로 벤치마크: 행 단위 디코딩(기존) vs 칼럼 단위 디코딩
+
+    python benchmarks/bench_decode.py --rows 100000 --properties 30
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils import notion_to_dataframe
+
+
+def extract_text_value(prop):
+    """비교 기준: 칼럼 단위 디코더 도입 전의 셀 디코딩"""
+    try:
+        typ = prop["type"]
+        if typ == "title":
+            return prop["title"][0]["plain_text"] if prop["title"] else ""
+        elif typ == "rich_text":
+            return prop["rich_text"][0]["plain_text"] if prop["rich_text"] else ""
+        elif typ == "select":
+            return prop["select"]["name"] if prop["select"] else ""
+        elif typ == "number":
+            return prop["number"] if prop["number"] else 0
+        elif typ == "date":
+            return prop["date"]["start"] if prop["date"] else ""
+        else:
+            return f"[지원 안함: {typ}]"
+    except Exception as e:
+        return f"[에러: {e}]"
+
+
+def notion_to_dataframe_rowwise(db_columns, db_rows):
+    """비교 기준: 셀마다 extract_text_value를 호출하던 기존 구현"""
+    data = []
+    for row in db_rows:
+        row_dict = {}
+        for col in db_columns:
+            if col in row["properties"]:
+                row_dict[col] = extract_text_value(row["properties"][col])
+            else:
+                row_dict[col] = None
+        data.append(row_dict)
+    return pd.DataFrame(data)
+
+
+def make_pages(rows, properties, seed=0):
+    """title 1개와 rich_text/number/select/date를 섞은 합성 페이지 JSON"""
+    rng = random.Random(seed)
+    kinds = ["rich_text", "number", "select", "date"]
+    columns = ["Name"] + [f"{kinds[i % len(kinds)]}_{i}" for i in range(properties - 1)]
+    pages = []
+    for r in range(rows):
+        props = {"Name": {"type": "title", "title": [{"plain_text": f"Row {r}"}]}}
+        for col in columns[1:]:
+            kind = col.split("_", 1)[0] if not col.startswith("rich_text") else "rich_text"
+            if kind == "rich_text":
+                props[col] = {"type": "rich_text", "rich_text": [{"plain_text": f"text {rng.randint(0, 999)}"}]}
+            elif kind == "number":
+                props[col] = {"type": "number", "number": rng.randint(0, 10_000) if rng.random() > 0.05 else None}
+            elif kind == "select":
+                props[col] = {"type": "select", "select": {"name": f"opt{rng.randint(0, 9)}"} if rng.random() > 0.05 else None}
+            else:
+                props[col] = {"type": "date", "date": {"start": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}}
+        pages.append({"object": "page", "id": str(r), "properties": props})
+    return columns, pages
+
+
+def measure(fn, columns, pages, repeat=3):
+    # tracemalloc은 할당마다 비용이 들어 시간 측정과 메모리 측정을 분리
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn(columns, pages)
+        seconds.append(time.perf_counter() - start)
+        del df
+
+    tracemalloc.start()
+    df = fn(columns, pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(min(seconds), 3),
+        "peak_mb": round(peak / 2**20, 1),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--properties", type=int, default=30)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    columns, pages = make_pages(args.rows, args.properties)
+    results = {
+        "rows": args.rows,
+        "properties": args.properties,
+        "rowwise": measure(notion_to_dataframe_rowwise, columns, pages),
+        "columnar": measure(notion_to_dataframe, columns, pages),
+    }
+    results["speedup"] = round(results["rowwise"]["seconds"] / results["columnar"]["seconds"], 2)
+
+    for name in ("rowwise", "columnar"):
+        r = results[name]
+        print(f"{name:>9}: {r['seconds']:>7.2f}s  peak {r['peak_mb']:>8.1f} MB  frame {r['frame_mb']:>7.1f} MB")
+    print(f"  speedup: {results['speedup']}x")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
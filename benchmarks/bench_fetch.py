@@ -0,0 +1,74 @@
+"""
+get_database_rows (순차) vs get_database_rows_parallel (구간 분할) 벤치마크
+
+    python benchmarks/bench_fetch.py --rows 1000 5000 20000 --latency 0.3 --rps 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_notion import MockNotion, make_orders_database, serve
+from notion_transport import get_bucket, get_client
+from utils import get_database_rows, get_database_rows_parallel
+
+
+def run(rows_list, latency, rps, workers, slices, partition_by):
+    results = []
+    for rows in rows_list:
+        state = MockNotion(latency=latency)
+        database_id = state.add_database(*make_orders_database(rows))
+        server, base_url = serve(state)
+        # 순차·병렬 조회 모두 공유 transport의 같은 요청 한도를 따름
+        token = f"mock-token-{rows}"
+        notion = get_client(token, base_url=base_url)
+        get_bucket(token).set_rate(rps)
+        try:
+            start = time.perf_counter()
+            sequential_rows = get_database_rows(notion, database_id)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel_rows, timings = get_database_rows_parallel(
+                notion, database_id, partition_by=partition_by, slices=slices, max_workers=workers,
+            )
+            parallel = time.perf_counter() - start
+            assert len(parallel_rows) == len(sequential_rows) == rows
+        finally:
+            server.shutdown()
+
+        results.append({
+            "rows": rows,
+            "sequential_seconds": round(sequential, 3),
+            "parallel_seconds": round(parallel, 3),
+            "speedup": round(sequential / parallel, 2),
+            "slices": [{**t, "seconds": round(t["seconds"], 3)} for t in timings],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--latency", type=float, default=0.3, help="요청당 모의 서버 지연 (초)")
+    parser.add_argument("--rps", type=float, default=3.0, help="초당 요청 한도")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--slices", type=int, default=None)
+    parser.add_argument("--partition-by", default="created_time")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.latency, args.rps, args.workers, args.slices, args.partition_by)
+    print(f"{'rows':>8} {'sequential(s)':>14} {'parallel(s)':>12} {'speedup':>8}")
+    for r in results:
+        print(f"{r['rows']:>8} {r['sequential_seconds']:>14.2f} {r['parallel_seconds']:>12.2f} {r['speedup']:>7.2f}x")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+조인 양쪽 DB 조회 벤치마크: 스키마·행을 차례로 조회 (기존 main.main) vs utils.load_databases (비동기 동시 조회)
+
+    python benchmarks/bench_load.py --left 2000 --right 500 --latency 0.5 --rps 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_notion import MockNotion, make_orders_database, serve
+from notion_transport import get_bucket, get_client
+from utils import get_database_rows, load_database_info, load_databases
+
+
+def run(left, right, latency, rps):
+    state = MockNotion(latency=latency)
+    left_id = state.add_database(*make_orders_database(left, seed=1, title="Left"))
+    right_id = state.add_database(*make_orders_database(right, seed=2, title="Right"))
+    server, base_url = serve(state)
+    token = f"mock-token-load-{left}-{right}"
+    notion = get_client(token, base_url=base_url)
+    get_bucket(token).set_rate(rps)
+    try:
+        start = time.perf_counter()
+        load_database_info(notion, left_id)
+        load_database_info(notion, right_id)
+        left_rows = get_database_rows(notion, left_id)
+        right_rows = get_database_rows(notion, right_id)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        (_, _, async_left), (_, _, async_right) = load_databases(
+            notion, [{"database_id": left_id}, {"database_id": right_id}]
+        )
+        concurrent = time.perf_counter() - start
+        assert len(async_left) == len(left_rows) == left
+        assert len(async_right) == len(right_rows) == right
+
+        # 한쪽만 조회한 시간 (동시 조회의 하한)
+        start = time.perf_counter()
+        load_databases(notion, [{"database_id": left_id}])
+        left_only = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    return {
+        "left_rows": left,
+        "right_rows": right,
+        "latency": latency,
+        "rps": rps,
+        "sequential_seconds": round(sequential, 3),
+        "concurrent_seconds": round(concurrent, 3),
+        "left_only_seconds": round(left_only, 3),
+        "speedup": round(sequential / concurrent, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--left", type=int, default=2000)
+    parser.add_argument("--right", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.5, help="요청당 모의 서버 지연 (초)")
+    parser.add_argument("--rps", type=float, default=3.0, help="초당 요청 한도")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    result = run(args.left, args.right, args.latency, args.rps)
+    print(f"left={result['left_rows']} right={result['right_rows']} latency={result['latency']}s rps={result['rps']}")
+    print(f"sequential: {result['sequential_seconds']:.2f}s")
+    print(f"concurrent: {result['concurrent_seconds']:.2f}s  ({result['speedup']}x)")
+    print(f"left only:  {result['left_only_seconds']:.2f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+프로젝션 푸시다운 벤치마크: 전체 속성 조회·디코딩 vs filter_properties로 필요한 칼럼만 조회·디코딩
+
+    python benchmarks/bench_projection.py --rows 5000 --properties 60 --select 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion_client import Client
+
+from benchmarks.mock_notion import MockNotion, make_wide_database, serve
+from utils import get_database_rows, get_property_ids, get_required_columns, notion_to_dataframe
+
+
+def measure(notion, state, database_id, db, columns, properties):
+    bytes_before = state.bytes_sent
+    start = time.perf_counter()
+    rows = get_database_rows(notion, database_id, filter_properties=properties)
+    fetch = time.perf_counter() - start
+    start = time.perf_counter()
+    df = notion_to_dataframe(columns, rows)
+    decode = time.perf_counter() - start
+    return {
+        "columns": len(columns),
+        "response_mb": round((state.bytes_sent - bytes_before) / 1e6, 2),
+        "fetch_seconds": round(fetch, 3),
+        "decode_seconds": round(decode, 3),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 1e6, 2),
+    }
+
+
+def run(rows, properties, select):
+    state = MockNotion()
+    schema, pages = make_wide_database(rows, properties)
+    database_id = state.add_database(schema, pages)
+    server, base_url = serve(state)
+    notion = Client(auth="mock-token", base_url=base_url)
+    try:
+        db = notion.databases.retrieve(database_id=database_id)
+        columns_types = {name: prop["type"] for name, prop in db["properties"].items()}
+        full = measure(notion, state, database_id, db, list(columns_types), None)
+        # 조인 키(Key) + 앞쪽 칼럼 몇 개만 SELECT
+        selected = [name for name in columns_types if name not in ("Name", "Key")][:select]
+        columns = get_required_columns(columns_types, selected, ["Key"])
+        projected = measure(notion, state, database_id, db, columns, get_property_ids(db, columns))
+    finally:
+        server.shutdown()
+    return {"rows": rows, "properties": properties, "full": full, "projected": projected}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--properties", type=int, default=60)
+    parser.add_argument("--select", type=int, default=3, help="SELECT할 칼럼 수 (조인 키 제외)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    result = run(args.rows, args.properties, args.select)
+    print(f"{'':>10} {'columns':>8} {'response(MB)':>13} {'fetch(s)':>9} {'decode(s)':>10} {'frame(MB)':>10}")
+    for label in ("full", "projected"):
+        r = result[label]
+        print(f"{label:>10} {r['columns']:>8} {r['response_mb']:>13.2f} {r['fetch_seconds']:>9.2f} "
+              f"{r['decode_seconds']:>10.3f} {r['frame_mb']:>10.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+조인 최대 메모리 벤치마크: 전체 조회 후 조인 (get_database_rows → notion_to_dataframe → perform_join)
+vs 스트리밍 조인 (iter_database_pages → 청크 디코딩 → 작은 쪽 해시 테이블 + 큰 쪽 청크 probe)
+
+    python benchmarks/bench_stream.py --left 20000 --right 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_notion import MockNotion, make_orders_database, serve
+from join import concat_chunks, perform_join, split_build_probe, stream_join
+from notion_transport import get_bucket, get_client
+from utils import get_database_rows, iter_database_pages, iter_dataframe_chunks, load_database_info, notion_to_dataframe
+
+
+CONDITIONS = [("Product", "Product")]
+
+
+def eager_join(notion, left_id, right_id):
+    left_db, left_types = load_database_info(notion, left_id)
+    right_db, right_types = load_database_info(notion, right_id)
+    left_rows = get_database_rows(notion, left_id)
+    right_rows = get_database_rows(notion, right_id)
+    left_df = notion_to_dataframe(list(left_types), left_rows)
+    right_df = notion_to_dataframe(list(right_types), right_rows)
+    return perform_join(left_df, right_df, CONDITIONS)
+
+
+def streaming_join(notion, left_id, right_id):
+    _, left_types = load_database_info(notion, left_id)
+    _, right_types = load_database_info(notion, right_id)
+    left_chunks = iter_dataframe_chunks(list(left_types), iter_database_pages(notion, left_id), left_types)
+    right_chunks = iter_dataframe_chunks(list(right_types), iter_database_pages(notion, right_id), right_types)
+    build_side, build_df, probe_chunks = split_build_probe(left_chunks, right_chunks)
+    return concat_chunks(stream_join(build_df, probe_chunks, CONDITIONS, build_side=build_side))
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run(left, right):
+    state = MockNotion()
+    left_id = state.add_database(*make_orders_database(left, seed=1, title="Left"))
+    right_id = state.add_database(*make_orders_database(right, seed=2, title="Right"))
+    server, base_url = serve(state)
+    token = f"mock-token-stream-{left}-{right}"
+    notion = get_client(token, base_url=base_url)
+    # 메모리만 비교하므로 요청 한도는 사실상 해제
+    get_bucket(token).set_rate(10000)
+    try:
+        eager, eager_seconds, eager_peak = measure(eager_join, notion, left_id, right_id)
+        streamed, stream_seconds, stream_peak = measure(streaming_join, notion, left_id, right_id)
+    finally:
+        server.shutdown()
+    assert len(eager) == len(streamed)
+    result_bytes = int(streamed.memory_usage(deep=True).sum())
+    return {
+        "left_rows": left,
+        "right_rows": right,
+        "result_rows": len(streamed),
+        "result_mb": round(result_bytes / 2**20, 1),
+        "eager_peak_mb": round(eager_peak / 2**20, 1),
+        "streaming_peak_mb": round(stream_peak / 2**20, 1),
+        "eager_seconds": round(eager_seconds, 2),
+        "streaming_seconds": round(stream_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--left", type=int, default=20000)
+    parser.add_argument("--right", type=int, default=500)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    result = run(args.left, args.right)
+    print(f"left={result['left_rows']} right={result['right_rows']} result={result['result_rows']} "
+          f"({result['result_mb']} MB)")
+    print(f"eager:     peak {result['eager_peak_mb']:>7.1f} MB  {result['eager_seconds']:.2f}s")
+    print(f"streaming: peak {result['streaming_peak_mb']:>7.1f} MB  {result['streaming_seconds']:.2f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+SUMIFS 벤치마크: reference/sumifs_fin.py의 이중 루프(Target × Source) vs sumifs.compute_sumifs 인덱스
+
+    python benchmarks/bench_sumifs.py --targets 5000 --sources 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sumifs import compute_sumifs, criteria_value, date_range
+
+
+CONDITIONS = [
+    {"src_col": "Category", "tgt_col": "Category", "is_range": False},
+    {"src_col": "Owner", "tgt_col": "Owner", "is_range": False},
+    {"src_col": "Date", "tgt_col": "Period", "is_range": True},
+]
+
+
+def _text(value):
+    return [{"type": "text", "text": {"content": value}, "plain_text": value}]
+
+
+def make_rows(targets, sources, categories=50, owners=20, seed=0):
+    rng = random.Random(seed)
+    src_rows = []
+    for i in range(sources):
+        src_rows.append({"id": f"src-{i}", "properties": {
+            "Category": {"type": "select", "select": {"name": f"C{rng.randrange(categories)}"}},
+            "Owner": {"type": "rich_text", "rich_text": _text(f"U{rng.randrange(owners)}")},
+            "Date": {"type": "date", "date": {"start": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}},
+            "Amount": {"type": "number", "number": rng.randint(1, 1000)},
+        }})
+    target_rows = []
+    for i in range(targets):
+        month = rng.randint(1, 12)
+        target_rows.append({"id": f"tgt-{i}", "properties": {
+            "Category": {"type": "rich_text", "rich_text": _text(f"C{rng.randrange(categories)}")},
+            "Owner": {"type": "title", "title": _text(f"U{rng.randrange(owners)}")},
+            "Period": {"type": "date", "date": {"start": f"2024-{month:02d}-01", "end": f"2024-{month:02d}-28"}},
+        }})
+    return src_rows, target_rows
+
+
+def nested_loop(src_rows, target_rows, conditions, sum_column):
+    """reference/sumifs_fin.py의 원래 방식: Target 한 행마다 Source 전체를 순회"""
+    totals = []
+    for target in target_rows:
+        total = 0
+        for src in src_rows:
+            for cond in conditions:
+                if cond["is_range"]:
+                    src_date = date_range(src["properties"][cond["src_col"]])[0]
+                    start, end = date_range(target["properties"][cond["tgt_col"]])
+                    if not (datetime.fromisoformat(start) <= datetime.fromisoformat(src_date) <= datetime.fromisoformat(end)):
+                        break
+                elif criteria_value(src["properties"][cond["src_col"]]) != criteria_value(target["properties"][cond["tgt_col"]]):
+                    break
+            else:
+                total += src["properties"][sum_column]["number"]
+        totals.append(total)
+    return totals
+
+
+def run(targets, sources, sample):
+    src_rows, target_rows = make_rows(targets, sources)
+
+    start = time.perf_counter()
+    result = compute_sumifs(src_rows, target_rows, CONDITIONS, "Amount")
+    indexed = time.perf_counter() - start
+
+    # 이중 루프는 너무 느려 Target 일부만 실행한 뒤 전체 시간을 추정
+    sample = min(sample, targets)
+    start = time.perf_counter()
+    expected = nested_loop(src_rows, target_rows[:sample], CONDITIONS, "Amount")
+    loop = (time.perf_counter() - start) * targets / sample
+
+    assert list(result["value"][:sample]) == expected
+    return {
+        "targets": targets,
+        "sources": sources,
+        "nested_loop_seconds": round(loop, 2),
+        "nested_loop_sampled_targets": sample,
+        "indexed_seconds": round(indexed, 3),
+        "speedup": round(loop / indexed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", type=int, default=5000)
+    parser.add_argument("--sources", type=int, default=50000)
+    parser.add_argument("--sample", type=int, default=20, help="이중 루프를 실제로 실행할 Target 행 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    result = run(args.targets, args.sources, args.sample)
+    print(f"targets={result['targets']} sources={result['sources']}")
+    print(f"nested loop (추정): {result['nested_loop_seconds']:.2f}s  "
+          f"(Target {result['nested_loop_sampled_targets']}행 실측 기준)")
+    print(f"indexed:            {result['indexed_seconds']:.3f}s  ({result['speedup']}x)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,598 @@
+"""
+로컬 벤치마크용 Notion API 모의 서버
+
+notion_client.Client(base_url=...)로 연결하면 실제 워크스페이스 없이
+search, databases.retrieve/query/create, pages.create/retrieve/update, 페이지 속성 조회와
+페이지네이션·긴 배열 속성의 25개 잘림·지연·429 응답을 재현할 수 있다.
+
+    python benchmarks/mock_notion.py --rows 1000 100000 --latency 0.3 --throttle-rate 0.02 --port 8765
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import time
+
+
+PAGE_SIZE_LIMIT = 100
+# 페이지 객체(조회 결과 포함)에 담기는 배열 속성의 최대 항목 수 (나머지는 페이지 속성 조회로 가져옴)
+PROPERTY_ITEM_LIMIT = 25
+# 배열 항목 하나가 페이지 속성 조회 결과의 항목 하나가 되는 속성
+LIST_PROPERTY_TYPES = ("title", "rich_text", "people", "relation")
+
+
+def _rich_text(text):
+    return [{"type": "text", "text": {"content": text, "link": None}, "plain_text": text, "href": None}]
+
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def make_orders_database(rows, seed=0, products=20, title="Orders"):
+    """주문 데이터베이스 스키마와 페이지를 합성"""
+    rng = random.Random(seed)
+    database_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    product_names = [f"P{i:03d}" for i in range(products)]
+    schema = {
+        "object": "database",
+        "id": database_id,
+        "title": _rich_text(title),
+        "properties": {
+            "Name": {"id": "title", "name": "Name", "type": "title", "title": {}},
+            "Order ID": {"id": "oid", "name": "Order ID", "type": "rich_text", "rich_text": {}},
+            "Product": {"id": "prd", "name": "Product", "type": "select",
+                        "select": {"options": [{"name": name} for name in product_names]}},
+            "Qty": {"id": "qty", "name": "Qty", "type": "number", "number": {"format": "number"}},
+            "Date": {"id": "dat", "name": "Date", "type": "date", "date": {}},
+        },
+    }
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    pages = []
+    for i in range(rows):
+        created = start + timedelta(minutes=i * 7)
+        product = rng.choice(product_names) if rng.random() > 0.02 else None
+        pages.append({
+            "object": "page",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "created_time": _iso(created),
+            "last_edited_time": _iso(created + timedelta(minutes=rng.randint(0, 600))),
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "properties": {
+                "Name": {"id": "title", "type": "title", "title": _rich_text(f"Order {i}")},
+                "Order ID": {"id": "oid", "type": "rich_text", "rich_text": _rich_text(f"O-{i:07d}")},
+                "Product": {"id": "prd", "type": "select", "select": {"name": product} if product else None},
+                "Qty": {"id": "qty", "type": "number", "number": rng.randint(1, 50)},
+                "Date": {"id": "dat", "type": "date",
+                         "date": {"start": (created.date()).isoformat(), "end": None, "time_zone": None}},
+            },
+        })
+    return schema, pages
+
+
+def make_products_database(products=20, seed=0, title="Products"):
+    """make_orders_database의 Product 값마다 한 행씩 있는 상품 데이터베이스 (조인·SUMIFS용 차원 테이블)"""
+    rng = random.Random(seed)
+    database_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    schema = {
+        "object": "database",
+        "id": database_id,
+        "title": _rich_text(title),
+        "properties": {
+            "Product": {"id": "title", "name": "Product", "type": "title", "title": {}},
+            "Price": {"id": "prc", "name": "Price", "type": "number", "number": {"format": "number"}},
+            "Period": {"id": "per", "name": "Period", "type": "date", "date": {}},
+            "Total Qty": {"id": "tqt", "name": "Total Qty", "type": "number", "number": {"format": "number"}},
+        },
+    }
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    pages = []
+    for i in range(products):
+        pages.append({
+            "object": "page",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "created_time": _iso(created),
+            "last_edited_time": _iso(created),
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "properties": {
+                "Product": {"id": "title", "type": "title", "title": _rich_text(f"P{i:03d}")},
+                "Price": {"id": "prc", "type": "number", "number": rng.randint(100, 10_000)},
+                "Period": {"id": "per", "type": "date",
+                           "date": {"start": "2024-01-01", "end": "2024-12-31", "time_zone": None}},
+                "Total Qty": {"id": "tqt", "type": "number", "number": None},
+            },
+        })
+    return schema, pages
+
+
+def make_wide_database(rows, properties=60, seed=0, title="Wide"):
+    """title 1개와 rich_text/number/select/date/rollup을 섞은 넓은 데이터베이스 (Key 칼럼은 조인용)"""
+    rng = random.Random(seed)
+    database_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    kinds = ["rich_text", "number", "select", "date", "rollup"]
+    columns = [(f"{kinds[i % len(kinds)]}_{i}", kinds[i % len(kinds)]) for i in range(properties - 2)]
+    schema_properties = {
+        "Name": {"id": "title", "name": "Name", "type": "title", "title": {}},
+        "Key": {"id": "key", "name": "Key", "type": "number", "number": {"format": "number"}},
+    }
+    for i, (name, kind) in enumerate(columns):
+        schema_properties[name] = {"id": f"p{i}", "name": name, "type": kind, kind: {}}
+    schema = {"object": "database", "id": database_id, "title": _rich_text(title), "properties": schema_properties}
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    pages = []
+    for r in range(rows):
+        created = start + timedelta(minutes=r)
+        props = {
+            "Name": {"id": "title", "type": "title", "title": _rich_text(f"Row {r}")},
+            "Key": {"id": "key", "type": "number", "number": r % 1000},
+        }
+        for i, (name, kind) in enumerate(columns):
+            if kind == "rich_text":
+                value = _rich_text(" ".join(f"word{rng.randint(0, 999)}" for _ in range(8)))
+            elif kind == "number":
+                value = rng.randint(0, 10_000)
+            elif kind == "select":
+                value = {"name": f"opt{rng.randint(0, 9)}"}
+            elif kind == "date":
+                value = {"start": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "end": None, "time_zone": None}
+            else:
+                value = {"type": "array", "function": "show_original",
+                         "array": [{"type": "rich_text", "rich_text": _rich_text(f"item{j}")} for j in range(3)]}
+            props[name] = {"id": f"p{i}", "type": kind, kind: value}
+        pages.append({
+            "object": "page",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "created_time": _iso(created),
+            "last_edited_time": _iso(created),
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "properties": props,
+        })
+    return schema, pages
+
+
+def _property_value(prop):
+    """필터 비교용 단순 값"""
+    typ = prop["type"]
+    value = prop.get(typ)
+    if typ in ("title", "rich_text"):
+        return "".join(part["plain_text"] for part in value)
+    if typ in ("select", "status"):
+        return value["name"] if value else None
+    if typ == "multi_select":
+        return [option["name"] for option in value]
+    if typ == "date":
+        return value["start"] if value else None
+    return value
+
+
+def _is_iso(value):
+    return isinstance(value, str) and re.match(r"\d{4}-\d{2}-\d{2}", value) is not None
+
+
+def _as_datetime(value):
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _compare(actual, condition):
+    operator, expected = next(iter(condition.items()))
+    if operator == "is_empty":
+        return actual in (None, "", [])
+    if operator == "is_not_empty":
+        return actual not in (None, "", [])
+    if actual is None:
+        return operator in ("does_not_equal", "does_not_contain")
+    if isinstance(actual, list):
+        contained = expected in actual
+        return contained if operator == "contains" else not contained
+    if _is_iso(actual) and _is_iso(expected):
+        actual, expected = _as_datetime(actual), _as_datetime(expected)
+    comparisons = {
+        "equals": lambda: actual == expected,
+        "does_not_equal": lambda: actual != expected,
+        "contains": lambda: expected in actual,
+        "does_not_contain": lambda: expected not in actual,
+        "starts_with": lambda: actual.startswith(expected),
+        "ends_with": lambda: actual.endswith(expected),
+        "greater_than": lambda: actual > expected,
+        "less_than": lambda: actual < expected,
+        "greater_than_or_equal_to": lambda: actual >= expected,
+        "less_than_or_equal_to": lambda: actual <= expected,
+        "after": lambda: actual > expected,
+        "before": lambda: actual < expected,
+        "on_or_after": lambda: actual >= expected,
+        "on_or_before": lambda: actual <= expected,
+    }
+    return comparisons[operator]()
+
+
+def matches(page, filter):
+    """Notion 필터 JSON을 페이지에 적용"""
+    if not filter:
+        return True
+    if "and" in filter:
+        return all(matches(page, part) for part in filter["and"])
+    if "or" in filter:
+        return any(matches(page, part) for part in filter["or"])
+    if "timestamp" in filter:
+        key = filter["timestamp"]
+        return _compare(page[key], filter[key])
+    prop = page["properties"].get(filter["property"])
+    if prop is None:
+        return False
+    condition = next(value for key, value in filter.items() if key != "property")
+    return _compare(_property_value(prop), condition)
+
+
+def _normalize_value(kind, value):
+    """요청 본문의 속성 값을 응답 형식으로 변환 (rich text에 plain_text 채우기)"""
+    if kind in ("title", "rich_text"):
+        return [
+            {"type": "text", "text": part.get("text", {}), "href": None,
+             "plain_text": part.get("plain_text", part.get("text", {}).get("content", ""))}
+            for part in value or []
+        ]
+    return value
+
+
+def _page_properties(schema, values):
+    properties = {}
+    for name, value in values.items():
+        kind = value.get("type") or next(key for key in value if key != "id")
+        properties[name] = {
+            "id": schema["properties"].get(name, {}).get("id", name),
+            "type": kind,
+            kind: _normalize_value(kind, value[kind]),
+        }
+    return properties
+
+
+def _truncate_properties(page):
+    """실제 API처럼 배열 속성을 PROPERTY_ITEM_LIMIT개로 자른 페이지 사본 (relation은 has_more 표시)"""
+    properties = {}
+    for name, prop in page["properties"].items():
+        kind = prop["type"]
+        if kind in LIST_PROPERTY_TYPES and len(prop[kind]) > PROPERTY_ITEM_LIMIT:
+            prop = {**prop, kind: prop[kind][:PROPERTY_ITEM_LIMIT]}
+            if kind == "relation":
+                prop["has_more"] = True
+        elif kind == "rollup" and prop["rollup"]["type"] == "array" and len(prop["rollup"]["array"]) > PROPERTY_ITEM_LIMIT:
+            prop = {**prop, "rollup": {**prop["rollup"], "array": prop["rollup"]["array"][:PROPERTY_ITEM_LIMIT]}}
+        properties[name] = prop
+    return {**page, "properties": properties}
+
+
+def _property_items(prop, params):
+    """페이지 속성 조회 응답 (배열 속성은 항목 하나씩 페이지네이션, 나머지는 속성 항목 하나)"""
+    kind = prop["type"]
+    if kind in LIST_PROPERTY_TYPES:
+        items = [{"object": "property_item", "id": prop["id"], "type": kind, kind: item} for item in prop[kind]]
+        property_item = {"id": prop["id"], "type": kind, kind: {}}
+    elif kind == "rollup":
+        rollup = prop["rollup"]
+        # 배열 rollup의 각 값도 배열 속성이면 항목 하나씩 나뉨
+        items = []
+        for item in rollup.get("array", []):
+            values = item[item["type"]] if item["type"] in LIST_PROPERTY_TYPES else [item[item["type"]]]
+            items += [{"object": "property_item", "id": prop["id"], "type": item["type"], item["type"]: value}
+                      for value in values]
+        property_item = {"id": prop["id"], "type": "rollup",
+                         "rollup": {key: value for key, value in rollup.items() if key != "array"}}
+    else:
+        return {"object": "property_item", **prop}
+    response = _paginate(items, {"start_cursor": params.get("start_cursor", [None])[0],
+                                 "page_size": params.get("page_size", [None])[0]})
+    return {**response, "type": "property_item", "property_item": property_item}
+
+
+def _paginate(items, body):
+    """start_cursor/page_size로 목록 응답 구성 (page_size 최대 100)"""
+    start = int(body.get("start_cursor") or 0)
+    page_size = min(int(body.get("page_size") or PAGE_SIZE_LIMIT), PAGE_SIZE_LIMIT)
+    end = start + page_size
+    return {
+        "object": "list",
+        "results": items[start:end],
+        "next_cursor": str(end) if end < len(items) else None,
+        "has_more": end < len(items),
+        "type": "page_or_database",
+    }
+
+
+class MockNotion:
+    """모의 서버 상태 (데이터베이스 스키마와 페이지)"""
+
+    def __init__(self, latency=0.0, throttle_rate=0.0, retry_after=1):
+        self.latency = latency
+        # 이 비율만큼의 요청에 429 응답 (Retry-After 헤더 포함)
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.throttled_count = 0
+        self.rng = random.Random(0)
+        self.databases = {}
+        self.pages = {}
+        # 데이터베이스를 만들 수 있는 일반 페이지 (search filter=page 결과)
+        self.parent_pages = []
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self._query_cache = {}
+
+    def add_database(self, schema, pages):
+        self.databases[schema["id"]] = {"schema": schema, "pages": pages}
+        for page in pages:
+            self.pages[page["id"]] = page
+        return schema["id"]
+
+    def query(self, database_id, body, filter_properties=None):
+        key = (database_id, json.dumps({k: body.get(k) for k in ("filter", "sorts")}, sort_keys=True))
+        with self.lock:
+            rows = self._query_cache.get(key)
+        if rows is None:
+            rows = [p for p in self.databases[database_id]["pages"]
+                    if not p.get("archived") and matches(p, body.get("filter"))]
+            for sort in reversed(body.get("sorts") or []):
+                reverse = sort.get("direction") == "descending"
+                if "timestamp" in sort:
+                    rows.sort(key=lambda p: p[sort["timestamp"]], reverse=reverse)
+                else:
+                    rows.sort(key=lambda p: (_property_value(p["properties"][sort["property"]]) is None,
+                                             _property_value(p["properties"][sort["property"]]) or ""),
+                              reverse=reverse)
+            with self.lock:
+                self._query_cache[key] = rows
+        response = _paginate(rows, body)
+        response["results"] = [_truncate_properties(page) for page in response["results"]]
+        if filter_properties:
+            # filter_properties: 응답에 지정한 속성 ID만 포함
+            wanted = set(filter_properties)
+            response["results"] = [
+                {**page, "properties": {name: prop for name, prop in page["properties"].items() if prop["id"] in wanted}}
+                for page in response["results"]
+            ]
+        return response
+
+    def add_parent_page(self, title="Workspace"):
+        """데이터베이스를 만들 부모 페이지 추가"""
+        now = _iso(datetime.now(timezone.utc))
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "parent": {"type": "workspace", "workspace": True},
+            "properties": {"title": {"id": "title", "type": "title", "title": _rich_text(title)}},
+        }
+        with self.lock:
+            self.parent_pages.append(page)
+            self.pages[page["id"]] = page
+        return page["id"]
+
+    def search(self, body):
+        value = (body.get("filter") or {}).get("value")
+        if value == "page":
+            items = list(self.parent_pages)
+        elif value == "database":
+            items = [db["schema"] for db in self.databases.values()]
+        else:
+            items = [db["schema"] for db in self.databases.values()] + list(self.parent_pages)
+        query = (body.get("query") or "").lower()
+        if query:
+            def title(item):
+                parts = item["title"] if item["object"] == "database" else item["properties"]["title"]["title"]
+                return "".join(part["plain_text"] for part in parts).lower()
+            items = [item for item in items if query in title(item)]
+        return _paginate(items, body)
+
+    def create_database(self, body):
+        now = _iso(datetime.now(timezone.utc))
+        properties = {}
+        for i, (name, config) in enumerate(body.get("properties", {}).items()):
+            kind = config.get("type") or next(iter(config))
+            properties[name] = {"id": "title" if kind == "title" else f"c{i}", "name": name, "type": kind,
+                                kind: config.get(kind, {})}
+        schema = {
+            "object": "database",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "title": _normalize_value("title", body.get("title", [])),
+            "parent": {"type": "page_id", **body.get("parent", {})},
+            "properties": properties,
+        }
+        with self.lock:
+            self.databases[schema["id"]] = {"schema": schema, "pages": []}
+        return schema
+
+    def create_page(self, body):
+        database_id = body["parent"]["database_id"]
+        now = _iso(datetime.now(timezone.utc))
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "properties": _page_properties(self.databases[database_id]["schema"], body.get("properties", {})),
+        }
+        with self.lock:
+            self.databases[database_id]["pages"].append(page)
+            self.pages[page["id"]] = page
+            self._query_cache.clear()
+        return page
+
+    def update_page(self, page_id, body):
+        page = self.pages[page_id]
+        database = self.databases.get(page["parent"].get("database_id"))
+        schema = database["schema"] if database else {"properties": {}}
+        with self.lock:
+            page["properties"].update(_page_properties(schema, body.get("properties", {})))
+            for key in ("archived", "in_trash"):
+                if key in body:
+                    page["archived"] = bool(body[key])
+            page["last_edited_time"] = _iso(datetime.now(timezone.utc))
+            self._query_cache.clear()
+        return page
+
+    def invalidate(self):
+        with self.lock:
+            self._query_cache.clear()
+
+
+class MockNotionHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        with self.state.lock:
+            self.state.bytes_sent += len(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _not_found(self):
+        self._send(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+
+    def _handle(self, method):
+        state = self.state
+        with state.lock:
+            state.request_count += 1
+            throttled = state.throttle_rate and state.rng.random() < state.throttle_rate
+            if throttled:
+                state.throttled_count += 1
+        if state.latency:
+            time.sleep(state.latency)
+        if throttled:
+            return self._send(429, {"object": "error", "status": 429, "code": "rate_limited",
+                                    "message": "Rate limited"}, headers={"Retry-After": str(state.retry_after)})
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._body() if method in ("POST", "PATCH") else {}
+
+        match = re.fullmatch(r"/v1/databases/([^/]+)/query", path)
+        if method == "POST" and match:
+            if match.group(1) not in state.databases:
+                return self._not_found()
+            params = parse_qs(urlparse(self.path).query)
+            return self._send(200, state.query(match.group(1), body, params.get("filter_properties")))
+        match = re.fullmatch(r"/v1/databases/([^/]+)", path)
+        if method == "GET" and match:
+            database = state.databases.get(match.group(1))
+            return self._send(200, database["schema"]) if database else self._not_found()
+        if method == "POST" and path == "/v1/databases":
+            if body.get("parent", {}).get("page_id") not in state.pages:
+                return self._send(400, {"object": "error", "status": 400, "code": "validation_error",
+                                        "message": "parent page not found"})
+            return self._send(200, state.create_database(body))
+        if method == "POST" and path == "/v1/pages":
+            if body.get("parent", {}).get("database_id") not in state.databases:
+                return self._send(400, {"object": "error", "status": 400, "code": "validation_error",
+                                        "message": "parent database not found"})
+            return self._send(200, state.create_page(body))
+        match = re.fullmatch(r"/v1/pages/([^/]+)/properties/([^/]+)", path)
+        if method == "GET" and match:
+            page = state.pages.get(match.group(1))
+            prop_id = unquote(match.group(2))
+            prop = next((prop for prop in (page or {}).get("properties", {}).values() if prop["id"] == prop_id), None)
+            if prop is None:
+                return self._not_found()
+            return self._send(200, _property_items(prop, parse_qs(urlparse(self.path).query)))
+        match = re.fullmatch(r"/v1/pages/([^/]+)", path)
+        if match:
+            if match.group(1) not in state.pages:
+                return self._not_found()
+            if method == "GET":
+                return self._send(200, _truncate_properties(state.pages[match.group(1)]))
+            if method == "PATCH":
+                return self._send(200, state.update_page(match.group(1), body))
+        if method == "POST" and path == "/v1/search":
+            return self._send(200, state.search(body))
+        return self._not_found()
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+def serve(state, host="127.0.0.1", port=0):
+    """모의 서버를 백그라운드 스레드로 시작하고 (server, base_url) 반환"""
+    handler = type("BoundMockNotionHandler", (MockNotionHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def seed_workspace(state, rows_list=(1000,), products=20, wide_rows=0, wide_properties=60):
+    """
+    벤치마크용 작업 공간 구성 (부모 페이지 1개, 행 수별 주문 DB, 상품 DB, 선택적으로 넓은 DB)
+    Returns:
+        dict: {"parent_page": ID, "orders": {행 수: ID}, "products": ID, "wide": ID 또는 None}
+    """
+    workspace = {
+        "parent_page": state.add_parent_page("Benchmarks"),
+        "orders": {},
+        "products": state.add_database(*make_products_database(products)),
+        "wide": None,
+    }
+    for i, rows in enumerate(rows_list):
+        workspace["orders"][rows] = state.add_database(
+            *make_orders_database(rows, seed=i + 1, products=products, title=f"Orders {rows}")
+        )
+    if wide_rows:
+        workspace["wide"] = state.add_database(*make_wide_database(wide_rows, properties=wide_properties))
+    return workspace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="주문 DB 행 수 (1k~500k)")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--wide-rows", type=int, default=0, help="넓은 DB 행 수 (0이면 만들지 않음)")
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 지연 (초)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429로 응답할 요청 비율")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    state = MockNotion(latency=args.latency, throttle_rate=args.throttle_rate, retry_after=args.retry_after)
+    workspace = seed_workspace(state, args.rows, products=args.products, wide_rows=args.wide_rows)
+    server, base_url = serve(state, args.host, args.port)
+    print(f"mock Notion API: {base_url}")
+    print(json.dumps(workspace, indent=2))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
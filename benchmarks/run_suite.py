@@ -0,0 +1,191 @@
+"""
+모의 Notion API 서버 위에서 주요 경로를 측정하는 종합 벤치마크 (네트워크 불필요)
+
+    get_database_rows → notion_to_dataframe → perform_inner_join
+    → add_rows_to_notion_database / add_rows_to_notion_database_async → SUMIFS (이중 루프 vs 인덱스)
+
+    python benchmarks/run_suite.py --rows 1000 10000 --json results.json
+    python benchmarks/run_suite.py --rows 1000 10000 --compare results.json   # 이전 결과와 비교
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.bench_sumifs import nested_loop
+from benchmarks.mock_notion import MockNotion, seed_workspace, serve
+from notion_transport import get_bucket, get_client
+from notion_writer import run_async
+from sumifs import compute_sumifs
+from utils import (
+    add_rows_to_notion_database, add_rows_to_notion_database_async, create_notion_database, get_database_rows,
+    load_database_info, notion_to_dataframe, perform_inner_join,
+)
+
+
+JOIN_CONDITIONS = [("Product", "Product")]
+SUMIFS_CONDITIONS = [
+    {"src_col": "Product", "tgt_col": "Product", "is_range": False},
+    {"src_col": "Date", "tgt_col": "Period", "is_range": True},
+]
+
+# --compare에서 이 비율 이상, 이 시간(초) 이상 느려지면 회귀로 표시 (밀리초 단위 측정의 잡음 제외)
+REGRESSION_THRESHOLD = 0.2
+REGRESSION_MIN_SECONDS = 0.05
+
+
+class Recorder:
+    """단계별 소요 시간과 모의 서버 요청 수를 기록"""
+
+    def __init__(self, state):
+        self.state = state
+        self.results = []
+
+    def record(self, name, size, rows, seconds, requests=0, throttled=0):
+        """size: 시드 데이터베이스 행 수, rows: 이 단계가 처리한 행 수"""
+        self.results.append({
+            "benchmark": name,
+            "size": size,
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 and rows else None,
+            "requests": requests,
+            "throttled": throttled,
+        })
+
+    def measure(self, name, size, rows, func, *args, **kwargs):
+        requests = self.state.request_count
+        throttled = self.state.throttled_count
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        self.record(name, size, rows, seconds, self.state.request_count - requests,
+                    self.state.throttled_count - throttled)
+        return value
+
+
+def run_size(recorder, notion, workspace, rows, write_rows, sumifs_sample):
+    orders_id = workspace["orders"][rows]
+    products_id = workspace["products"]
+
+    _, orders_types = load_database_info(notion, orders_id)
+    _, products_types = load_database_info(notion, products_id)
+    order_pages = recorder.measure("get_database_rows", rows, rows, get_database_rows, notion, orders_id)
+    product_pages = get_database_rows(notion, products_id)
+
+    orders_df = recorder.measure("notion_to_dataframe", rows, rows, notion_to_dataframe, list(orders_types), order_pages)
+    products_df = notion_to_dataframe(list(products_types), product_pages)
+    joined = recorder.measure("perform_inner_join", rows, rows, perform_inner_join, orders_df, products_df, JOIN_CONDITIONS)
+
+    # 쓰기: 조인 결과 일부를 새 데이터베이스 두 개에 각각 저장
+    sample = joined.head(write_rows)
+    for name, write in (
+        ("add_rows_to_notion_database", lambda db_id: add_rows_to_notion_database(notion, db_id, sample, "Orders")),
+        ("add_rows_to_notion_database_async",
+         lambda db_id: run_async(add_rows_to_notion_database_async(
+             notion, db_id, sample, notion.databases.retrieve(database_id=db_id)["properties"], "Orders",
+         ))),
+    ):
+        db_id = create_notion_database(
+            notion, workspace["parent_page"], f"{name} {rows}", sample.columns, orders_types, products_types
+        )
+        recorder.measure(name, rows, len(sample), write, db_id)
+
+    # SUMIFS: 상품별·기간별 주문 수량 합계
+    recorder.measure(
+        "compute_sumifs", rows, rows, compute_sumifs, order_pages, product_pages, SUMIFS_CONDITIONS, "Qty"
+    )
+    # 이중 루프는 상품 일부만 실행하고 전체 시간을 추정
+    sample_targets = product_pages[:sumifs_sample]
+    start = time.perf_counter()
+    nested_loop(order_pages, sample_targets, SUMIFS_CONDITIONS, "Qty")
+    seconds = (time.perf_counter() - start) * len(product_pages) / max(len(sample_targets), 1)
+    recorder.record("sumifs_nested_loop_estimated", rows, rows, seconds)
+
+
+def run(rows_list, latency, throttle_rate, rps, write_rows, sumifs_sample, products):
+    state = MockNotion(latency=latency, throttle_rate=throttle_rate)
+    workspace = seed_workspace(state, rows_list, products=products)
+    server, base_url = serve(state)
+    token = "mock-token-suite"
+    notion = get_client(token, base_url=base_url)
+    get_bucket(token).set_rate(rps)
+    recorder = Recorder(state)
+    try:
+        for rows in rows_list:
+            run_size(recorder, notion, workspace, rows, write_rows, sumifs_sample)
+    finally:
+        server.shutdown()
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "params": {
+                "rows": rows_list, "latency": latency, "throttle_rate": throttle_rate, "rps": rps,
+                "write_rows": write_rows, "products": products,
+            },
+        },
+        "results": recorder.results,
+    }
+
+
+def compare(results, baseline):
+    """이전 결과와 (benchmark, size)별 시간을 비교해 변화율 목록 반환"""
+    previous = {(r["benchmark"], r["size"]): r["seconds"] for r in baseline["results"]}
+    changes = []
+    for r in results["results"]:
+        before = previous.get((r["benchmark"], r["size"]))
+        if before:
+            change = (r["seconds"] - before) / before
+            regression = change > REGRESSION_THRESHOLD and r["seconds"] - before > REGRESSION_MIN_SECONDS
+            changes.append({**r, "baseline_seconds": before, "change": round(change, 3), "regression": regression})
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="주문 DB 행 수 (1k~500k)")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 모의 서버 지연 (초)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429로 응답할 요청 비율")
+    parser.add_argument("--rps", type=float, default=1000.0,
+                        help="초당 요청 한도 (기본값은 사실상 무제한, 실제 한도는 3)")
+    parser.add_argument("--write-rows", type=int, default=200, help="쓰기 경로마다 저장할 행 수")
+    parser.add_argument("--sumifs-sample", type=int, default=5, help="SUMIFS 이중 루프를 실제로 실행할 Target 행 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일 (회귀가 있으면 종료 코드 1)")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.latency, args.throttle_rate, args.rps, args.write_rows, args.sumifs_sample,
+                  args.products)
+    print(f"{'benchmark':<36} {'size':>8} {'rows':>8} {'seconds':>10} {'rows/s':>12} {'requests':>9}")
+    for r in results["results"]:
+        rate = f"{r['rows_per_second']:,.0f}" if r["rows_per_second"] else "-"
+        print(f"{r['benchmark']:<36} {r['size']:>8} {r['rows']:>8} {r['seconds']:>10.3f} {rate:>12} {r['requests']:>9}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            changes = compare(results, json.load(f))
+        print()
+        for c in changes:
+            flag = "  ← 회귀" if c["regression"] else ""
+            print(f"{c['benchmark']:<36} {c['size']:>8} {c['baseline_seconds']:>10.3f} → {c['seconds']:.3f} "
+                  f"({c['change']:+.0%}){flag}")
+        if any(c["regression"] for c in changes):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import math
+import time
+from datetime import datetime
+
+from join import JOIN_LABELS, explode_relation, plan_join, relation_columns
+from notion_transport import NOTION_REQUESTS_PER_SECOND
+from utils import get_property_ids, notion_to_dataframe
+
+
+# databases.query 한 번에 받을 수 있는 최대 행 수
+PAGE_SIZE = 100
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def estimate_row_count(notion, database_id, filter=None, filter_properties=None, row_cache=None):
+    """
+    데이터베이스 전체를 읽지 않고 행 수 추정
+    필터가 없고 로컬 캐시가 동기화되어 있으면 캐시의 행 수를 사용하고,
+    아니면 created_time 순 첫 페이지(최대 100행)를 조회해 끝까지 읽었으면 정확한 값,
+    더 있으면 가장 최근 행의 created_time까지 같은 밀도로 있다고 보고 추정
+    Returns:
+        dict: {"rows", "source"("cache"/"exact"/"sample"), "sample"(페이지 목록), "api_calls", "seconds_per_call"}
+    """
+    query = {"database_id": database_id, "page_size": PAGE_SIZE,
+             "sorts": [{"timestamp": "created_time", "direction": "ascending"}]}
+    if filter:
+        query["filter"] = filter
+    if filter_properties:
+        query["filter_properties"] = filter_properties
+    start = time.perf_counter()
+    first = notion.databases.query(**query)
+    calls = 1
+    sample = first["results"]
+    result = {"sample": sample, "api_calls": calls}
+
+    if not filter and row_cache is not None and row_cache.get_state(database_id):
+        rows, source = row_cache.count_pages(database_id), "cache"
+    elif not first.get("has_more"):
+        rows, source = len(sample), "exact"
+    else:
+        last = notion.databases.query(**{
+            **query, "page_size": 1, "sorts": [{"timestamp": "created_time", "direction": "descending"}],
+        })
+        calls += 1
+        first_time = _parse_time(sample[0]["created_time"])
+        sample_end = _parse_time(sample[-1]["created_time"])
+        last_time = _parse_time(last["results"][0]["created_time"]) if last["results"] else sample_end
+        sampled_span = (sample_end - first_time).total_seconds()
+        if sampled_span > 0:
+            # 표본 n행은 생성 시각 간격 n-1개를 차지
+            rows = 1 + int(round((len(sample) - 1) * (last_time - first_time).total_seconds() / sampled_span))
+        else:
+            rows = len(sample)
+        # 첫 페이지 뒤에 행이 더 있으므로 최소 한 페이지 이상
+        rows, source = max(rows, len(sample) + 1), "sample"
+    result.update({
+        "rows": rows,
+        "source": source,
+        "api_calls": calls,
+        "seconds_per_call": (time.perf_counter() - start) / calls,
+    })
+    return result
+
+
+def estimate_join_rows(left_sample, right_sample, left_rows, right_rows, join_conditions, how="inner"):
+    """
+    양쪽 표본의 조인 결과로 전체 결과 행 수 추정 (표본이 전체면 정확한 값)
+    매칭 쌍 수는 양쪽 표본 비율의 곱으로, 매칭되지 않은 행 수는 각 쪽 표본 비율로 확대
+    """
+    if len(left_sample) == 0 or len(right_sample) == 0:
+        return {"inner": 0, "left": left_rows, "right": right_rows, "full": left_rows + right_rows,
+                "semi": 0, "anti": left_rows}[how]
+    plan = plan_join(left_sample, right_sample, join_conditions, how="inner")
+    _, _, _, left_matches, right_matches = plan["_codes"]
+    left_scale = left_rows / len(left_sample)
+    right_scale = right_rows / len(right_sample)
+    matched = plan["estimated_rows"] * left_scale * right_scale
+    left_unmatched = (~left_matches).sum() * left_scale
+    right_unmatched = (~right_matches).sum() * right_scale
+    estimate = {
+        "inner": matched,
+        "left": matched + left_unmatched,
+        "right": matched + right_unmatched,
+        "full": matched + left_unmatched + right_unmatched,
+        "semi": left_matches.sum() * left_scale,
+        "anti": left_unmatched,
+    }[how]
+    return int(round(estimate))
+
+
+def estimate_relation_join_rows(sample, rows, column, target_rows, how="inner"):
+    """
+    relation 칼럼 = 페이지 ID 조인의 결과 행 수 추정 (relation은 항상 대상 데이터베이스의 페이지를 가리킴)
+    대상 쪽 표본에는 관계된 페이지가 거의 없으므로 relation 쪽 표본의 관계 수만으로 추정 (대상 쪽 필터는 무시하므로 상한)
+    relation 칼럼을 펼친 뒤 조인하므로 SEMI JOIN도 관계 하나당 한 행
+    Args:
+        sample (DataFrame): relation 칼럼이 있는 쪽 표본 (펼치기 전)
+        rows (int): 그 쪽 전체 행 수
+        column (str): relation 칼럼
+        target_rows (int): 대상(페이지 ID) 쪽 전체 행 수
+    """
+    if len(sample) == 0:
+        return {"inner": 0, "left": 0, "right": target_rows, "full": target_rows, "semi": 0, "anti": 0}[how]
+    scale = rows / len(sample)
+    related = explode_relation(sample[[column]], column)[column]
+    matched = related.notna().sum() * scale
+    with_relation = sample[column].notna().sum() * scale
+    unmatched = rows - with_relation
+    target_unmatched = max(0, target_rows - min(target_rows, related.nunique() * scale))
+    estimate = {
+        "inner": matched,
+        "left": matched + unmatched,
+        "right": matched + target_unmatched,
+        "full": matched + unmatched + target_unmatched,
+        "semi": matched,
+        "anti": unmatched,
+    }[how]
+    return int(round(estimate))
+
+
+def read_calls(rows, cached=False):
+    """행을 읽는 데 필요한 databases.query 호출 수 (캐시는 변경분 조회 한 번으로 가정)"""
+    return 1 if cached else max(1, math.ceil(rows / PAGE_SIZE))
+
+
+def explain_join(notion, left, right, join_conditions, how="inner", save_mode="create", merge_rows=None,
+                 requests_per_second=NOTION_REQUESTS_PER_SECOND, row_cache=None):
+    """
+    JOIN을 실행하지 않고 읽기·쓰기 API 호출 수와 예상 시간을 추정
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        left, right (dict): {"name", "database_id", "db"(스키마), "columns_types", "columns"(조회할 칼럼),
+            "filter"(Notion 필터), "local_filters"}
+        join_conditions (list): (왼쪽 칼럼, 오른쪽 칼럼) 목록
+        how (str): inner/left/right/full/semi/anti
+        save_mode (str): "create"(새 데이터베이스) 또는 "merge"(기존 데이터베이스에 MERGE)
+        merge_rows (int, optional): MERGE 대상 데이터베이스의 행 수 (비교용 조회 호출 수 계산)
+        requests_per_second (float): 현재 요청 한도
+        row_cache (RowCache, optional): 로컬 캐시 (있으면 동기화된 데이터베이스의 행 수로 사용)
+    Returns:
+        dict: {"tables": [...], "join": {...}, "read_calls", "write_calls", "read_seconds", "write_seconds",
+            "total_seconds", "sample_calls"}
+    """
+    tables = []
+    samples = []
+    for side in (left, right):
+        columns = side["columns"]
+        properties = get_property_ids(side["db"], columns) if len(columns) < len(side["columns_types"]) else None
+        estimate = estimate_row_count(
+            notion, side["database_id"], side.get("filter"), filter_properties=properties, row_cache=row_cache,
+        )
+        cached = estimate["source"] == "cache"
+        samples.append(notion_to_dataframe(columns, estimate["sample"], side["columns_types"]))
+        tables.append({
+            "name": side["name"],
+            "rows": estimate["rows"],
+            "source": estimate["source"],
+            "columns": f"{len(set(columns) & set(side['columns_types']))}/{len(side['columns_types'])}",
+            "server_filter": bool(side.get("filter")),
+            "local_filters": len(side.get("local_filters") or []),
+            "read_calls": 1 + read_calls(estimate["rows"], cached),
+            "seconds_per_call": estimate["seconds_per_call"],
+            "sample_calls": estimate["api_calls"],
+        })
+
+    exact = all(table["source"] != "sample" for table in tables) and all(
+        len(sample) == table["rows"] for sample, table in zip(samples, tables)
+    )
+    follow_columns = relation_columns(join_conditions, left["columns_types"])
+    if len(join_conditions) == 1 and follow_columns:
+        output_rows = estimate_relation_join_rows(
+            samples[0], tables[0]["rows"], follow_columns[0], tables[1]["rows"], how,
+        )
+    else:
+        # 그 밖의 관계형 JOIN은 relation 칼럼을 관계 하나당 한 행으로 펼친 표본으로 추정 (전체 행 수도 같은 비율로 늘림)
+        join_rows = [table["rows"] for table in tables]
+        for index, side in enumerate(("left", "right")):
+            for column in relation_columns(join_conditions, (left, right)[index]["columns_types"], side):
+                sampled = len(samples[index])
+                samples[index] = explode_relation(samples[index], column)
+                if sampled:
+                    join_rows[index] = join_rows[index] * len(samples[index]) // sampled
+        output_rows = estimate_join_rows(
+            samples[0], samples[1], join_rows[0], join_rows[1], join_conditions, how,
+        )
+
+    # 읽기: 양쪽을 동시에 조회하므로 요청 한도와 느린 쪽의 순차 페이지네이션 중 큰 값
+    total_read_calls = sum(table["read_calls"] for table in tables)
+    read_seconds = max(
+        total_read_calls / requests_per_second,
+        max(table["read_calls"] * table["seconds_per_call"] for table in tables),
+    )
+    # 쓰기: 동시 요청이므로 요청 한도가 병목
+    if save_mode == "merge":
+        write_calls = 1 + read_calls(merge_rows or 0) + output_rows
+    else:
+        write_calls = 2 + output_rows
+    write_seconds = write_calls / requests_per_second
+
+    return {
+        "tables": tables,
+        "join": {
+            "how": how,
+            "label": JOIN_LABELS[how],
+            "on": join_conditions,
+            "output_rows": output_rows,
+            "exact": exact,
+        },
+        "read_calls": total_read_calls,
+        "write_calls": write_calls,
+        "read_seconds": read_seconds,
+        "write_seconds": write_seconds,
+        "total_seconds": read_seconds + write_seconds,
+        "sample_calls": sum(table["sample_calls"] for table in tables),
+        "requests_per_second": requests_per_second,
+    }
+
+
+def format_duration(seconds):
+    """초를 '1시간 2분 3초' 형식으로"""
+    seconds = int(math.ceil(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    parts = [f"{hours}시간"] if hours else []
+    if minutes:
+        parts.append(f"{minutes}분")
+    if seconds or not parts:
+        parts.append(f"{seconds}초")
+    return " ".join(parts)
@@ -0,0 +1,479 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from property_decoders import PAGE_ID_COLUMN
+from tracing import traced
+
+
+JOIN_TYPES = ("inner", "left", "right", "full", "semi", "anti")
+
+# UI 표시용 이름
+JOIN_LABELS = {
+    "inner": "INNER JOIN",
+    "left": "LEFT JOIN",
+    "right": "RIGHT JOIN",
+    "full": "FULL OUTER JOIN",
+    "semi": "SEMI JOIN (EXISTS)",
+    "anti": "ANTI JOIN (NOT EXISTS)",
+}
+
+
+def _key_values(values):
+    """키 비교용 값 (category는 원래 값으로, 날짜만 있는 date 칼럼의 시간대 없는 자정은 UTC 자정으로)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.cat.categories.dtype)
+    if pd.api.types.is_datetime64_dtype(values.dtype) and not isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_localize("UTC")
+    return values
+
+
+def _encode_keys(left_df, right_df, left_on, right_on):
+    """
+    양쪽 키 칼럼을 같은 정수 코드 공간으로 변환 (결측 키는 -1)
+    Returns:
+        tuple: (left_codes, right_codes, 고유 키 수)
+    """
+    n_left = len(left_df)
+    left_codes = np.zeros(n_left, dtype=np.int64)
+    right_codes = np.zeros(len(right_df), dtype=np.int64)
+    cardinality = 1
+    for left_col, right_col in zip(left_on, right_on):
+        left_values = _key_values(left_df[left_col])
+        right_values = _key_values(right_df[right_col])
+        combined = pd.concat([left_values, right_values], ignore_index=True)
+        # 정렬된 입력이 있을 때만 순서를 보존하는 코드가 필요 (병합 조인 후보)
+        sort = left_values.is_monotonic_increasing or right_values.is_monotonic_increasing
+        try:
+            codes, uniques = pd.factorize(combined, sort=sort)
+        except TypeError:
+            # 서로 비교할 수 없는 값이 섞여 있으면 정렬 없이 인코딩
+            codes, uniques = pd.factorize(combined)
+        codes = codes.astype(np.int64)
+        if len(left_on) == 1:
+            cardinality = len(uniques)
+            left_codes, right_codes = codes[:n_left], codes[n_left:]
+            break
+        previous = np.concatenate([left_codes, right_codes])
+        combined_codes = previous * len(uniques) + codes
+        valid = (codes >= 0) & (previous >= 0)
+        # 여러 키를 조합한 코드는 다시 촘촘한 코드로 바꿔 오버플로 방지
+        dense = np.full(len(combined_codes), -1, dtype=np.int64)
+        dense_codes, dense_uniques = pd.factorize(combined_codes[valid], sort=True)
+        dense[valid] = dense_codes
+        cardinality = len(dense_uniques)
+        left_codes, right_codes = dense[:n_left], dense[n_left:]
+    return left_codes, right_codes, cardinality
+
+
+def _key_counts(codes, cardinality):
+    return np.bincount(codes[codes >= 0], minlength=cardinality)
+
+
+def _is_sorted(codes):
+    present = codes[codes >= 0]
+    return bool(np.all(present[1:] >= present[:-1]))
+
+
+@traced()
+def plan_join(left_df, right_df, join_conditions, how="inner", strategy=None):
+    """
+    조인을 실제로 수행하기 전에 전략과 결과 행 수를 추정
+    Args:
+        left_df, right_df (DataFrame): 조인할 두 테이블
+        join_conditions (list): (왼쪽 칼럼, 오른쪽 칼럼) 목록
+        how (str): inner/left/right/full/semi/anti
+        strategy (str, optional): "hash" 또는 "sort_merge"로 강제. 없으면 자동 선택
+    Returns:
+        dict: 조인 계획 (strategy, build_side, estimated_rows, 키 통계 등)
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"지원하지 않는 조인 종류: {how}")
+    left_on = [left for left, _ in join_conditions]
+    right_on = [right for _, right in join_conditions]
+    left_codes, right_codes, cardinality = _encode_keys(left_df, right_df, left_on, right_on)
+    left_counts = _key_counts(left_codes, cardinality)
+    right_counts = _key_counts(right_codes, cardinality)
+
+    matched = int(np.dot(left_counts.astype(np.float64), right_counts.astype(np.float64)))
+    left_matches = np.zeros(len(left_codes), dtype=bool)
+    left_matches[left_codes >= 0] = right_counts[left_codes[left_codes >= 0]] > 0
+    right_matches = np.zeros(len(right_codes), dtype=bool)
+    right_matches[right_codes >= 0] = left_counts[right_codes[right_codes >= 0]] > 0
+    left_unmatched = int((~left_matches).sum())
+    right_unmatched = int((~right_matches).sum())
+    estimated_rows = {
+        "inner": matched,
+        "left": matched + left_unmatched,
+        "right": matched + right_unmatched,
+        "full": matched + left_unmatched + right_unmatched,
+        "semi": int(left_matches.sum()),
+        "anti": left_unmatched,
+    }[how]
+
+    if strategy is None:
+        # 한쪽이 이미 키 순서로 정렬되어 있고 다른 쪽도 정렬되어 있거나 작으면 병합 조인이 더 저렴
+        # 그 외에는 작은 쪽으로 해시 테이블을 구성
+        left_sorted, right_sorted = _is_sorted(left_codes), _is_sorted(right_codes)
+        if (left_sorted and (right_sorted or len(right_df) * 8 <= len(left_df))) or \
+                (right_sorted and len(left_df) * 8 <= len(right_df)):
+            strategy = "sort_merge"
+        else:
+            strategy = "hash"
+    if strategy not in ("hash", "sort_merge"):
+        raise ValueError(f"지원하지 않는 조인 전략: {strategy}")
+
+    return {
+        "how": how,
+        "strategy": strategy,
+        "build_side": "right" if len(right_df) <= len(left_df) else "left",
+        "left_rows": len(left_df),
+        "right_rows": len(right_df),
+        "left_distinct_keys": int((left_counts > 0).sum()),
+        "right_distinct_keys": int((right_counts > 0).sum()),
+        "estimated_rows": estimated_rows,
+        "_codes": (left_codes, right_codes, cardinality, left_matches, right_matches),
+    }
+
+
+def _hash_buckets(build_codes, cardinality):
+    """build 쪽 코드로 버킷(시작 위치, 개수)을 구성"""
+    counts = _key_counts(build_codes, cardinality)
+    if counts.max(initial=0) <= 1:
+        # build 쪽 키가 모두 고유하면 (마스터 테이블 조회) 정렬 없이 코드 → 행 위치 배열 하나로 충분
+        position = np.full(cardinality, -1, dtype=np.int64)
+        valid = build_codes >= 0
+        position[build_codes[valid]] = np.flatnonzero(valid)
+        return counts, position, None, None
+    order = np.argsort(build_codes, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]) + int((build_codes < 0).sum())
+    return counts, None, order, starts
+
+
+def _probe_buckets(probe_codes, buckets):
+    """probe 쪽 각 행의 매칭 쌍을 생성"""
+    counts, position, order, starts = buckets
+    if position is not None:
+        build_idx = np.full(len(probe_codes), -1, dtype=np.int64)
+        probing = probe_codes >= 0
+        build_idx[probing] = position[probe_codes[probing]]
+        probe_idx = np.flatnonzero(build_idx >= 0)
+        return probe_idx, build_idx[probe_idx]
+
+    valid = probe_codes >= 0
+    probe_rows = np.flatnonzero(valid)
+    per_row = counts[probe_codes[valid]]
+    probe_idx = np.repeat(probe_rows, per_row)
+    # 각 probe 행 안에서 0, 1, 2, ... 오프셋
+    offsets = np.arange(len(probe_idx)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    build_idx = order[np.repeat(starts[probe_codes[valid]], per_row) + offsets]
+    return probe_idx, build_idx
+
+
+def _hash_pairs(probe_codes, build_codes, cardinality):
+    """build 쪽 코드로 버킷을 만들고 probe 쪽 각 행의 매칭 쌍을 생성"""
+    return _probe_buckets(probe_codes, _hash_buckets(build_codes, cardinality))
+
+
+def _sort_merge_pairs(left_codes, right_codes):
+    """양쪽을 키 순서로 정렬한 뒤 같은 키 구간끼리 매칭 (입력이 정렬되어 있으면 정렬 생략)"""
+    left_order = np.flatnonzero(left_codes >= 0) if _is_sorted(left_codes) else np.argsort(left_codes, kind="stable")
+    right_order = np.flatnonzero(right_codes >= 0) if _is_sorted(right_codes) else np.argsort(right_codes, kind="stable")
+    left_order = left_order[left_codes[left_order] >= 0]
+    right_order = right_order[right_codes[right_order] >= 0]
+    left_sorted = left_codes[left_order]
+    right_sorted = right_codes[right_order]
+
+    lo = np.searchsorted(right_sorted, left_sorted, side="left")
+    hi = np.searchsorted(right_sorted, left_sorted, side="right")
+    per_row = hi - lo
+    left_idx = np.repeat(left_order, per_row)
+    offsets = np.arange(len(left_idx)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    right_idx = right_order[np.repeat(lo, per_row) + offsets]
+    return left_idx, right_idx
+
+
+def _take(df, indexer):
+    """indexer가 -1인 위치는 결측값 행으로 채워 행 선택"""
+    if len(indexer) and indexer.min() < 0:
+        return df.reset_index(drop=True).reindex(indexer).reset_index(drop=True)
+    return df.iloc[indexer].reset_index(drop=True)
+
+
+def _assemble(left_df, right_df, left_idx, right_idx, join_conditions, how, suffixes):
+    """매칭 쌍(행 위치, -1은 결측 행)으로 결과 DataFrame 구성 (칼럼 이름 규칙은 pandas.merge와 같음)"""
+    left_part = _take(left_df, left_idx)
+    right_part = _take(right_df, right_idx)
+
+    # 이름이 같은 키 칼럼은 하나로 합침 (왼쪽 값이 없으면 오른쪽 값 사용)
+    shared_keys = [left for left, right in join_conditions if left == right]
+    for key in shared_keys:
+        if how in ("right", "full"):
+            missing = left_idx < 0
+            if missing.any():
+                left_values, right_values = left_part[key], right_part[key]
+                if left_values.dtype != right_values.dtype or isinstance(left_values.dtype, pd.CategoricalDtype):
+                    left_values, right_values = left_values.astype(object), right_values.astype(object)
+                left_part[key] = left_values.where(~missing, right_values)
+        right_part = right_part.drop(columns=key)
+
+    overlap = set(left_part.columns) & set(right_part.columns)
+    left_part = left_part.rename(columns={col: f"{col}{suffixes[0]}" for col in overlap})
+    right_part = right_part.rename(columns={col: f"{col}{suffixes[1]}" for col in overlap})
+    return pd.concat([left_part, right_part], axis=1)
+
+
+@traced(rows=len)
+def perform_join(left_df, right_df, join_conditions, how="inner", strategy=None, suffixes=("_left", "_right"), plan=None):
+    """
+    두 DataFrame 조인 (inner/left/right/full/semi/anti)
+    결과의 칼럼 이름 규칙은 pandas.merge와 같음 (이름이 같은 키는 하나로, 겹치는 칼럼은 접미사)
+    Args:
+        left_df, right_df (DataFrame): 조인할 두 테이블
+        join_conditions (list): (왼쪽 칼럼, 오른쪽 칼럼) 목록
+        how (str): inner/left/right/full/semi/anti
+        strategy (str, optional): "hash" 또는 "sort_merge"로 강제
+        suffixes (tuple): 겹치는 칼럼 이름에 붙일 접미사
+        plan (dict, optional): 미리 계산한 plan_join 결과 (키 인코딩을 다시 하지 않음)
+    Returns:
+        DataFrame: 조인 결과. 수행한 조인 계획은 result.attrs["join_plan"]에 저장
+    """
+    if plan is None:
+        plan = plan_join(left_df, right_df, join_conditions, how, strategy)
+    left_codes, right_codes, cardinality, left_matches, right_matches = plan["_codes"]
+    how = plan["how"]
+    plan = {key: value for key, value in plan.items() if key != "_codes"}
+
+    if how in ("semi", "anti"):
+        # 결과를 합치지 않고 왼쪽 행만 거름
+        mask = left_matches if how == "semi" else ~left_matches
+        result = left_df[mask].reset_index(drop=True)
+        result.attrs["join_plan"] = plan
+        return result
+
+    if plan["strategy"] == "sort_merge":
+        left_idx, right_idx = _sort_merge_pairs(left_codes, right_codes)
+    elif plan["build_side"] == "right":
+        left_idx, right_idx = _hash_pairs(left_codes, right_codes, cardinality)
+    else:
+        right_idx, left_idx = _hash_pairs(right_codes, left_codes, cardinality)
+    if plan["strategy"] == "sort_merge" or plan["build_side"] == "left":
+        # 결과는 왼쪽 행 순서를 따름 (왼쪽으로 probe한 경우는 이미 순서대로)
+        order = np.argsort(left_idx, kind="stable")
+        left_idx, right_idx = left_idx[order], right_idx[order]
+
+    if how in ("left", "full"):
+        unmatched = np.flatnonzero(~left_matches)
+        left_idx = np.concatenate([left_idx, unmatched])
+        right_idx = np.concatenate([right_idx, np.full(len(unmatched), -1)])
+        order = np.argsort(left_idx, kind="stable")
+        left_idx, right_idx = left_idx[order], right_idx[order]
+    if how in ("right", "full"):
+        unmatched = np.flatnonzero(~right_matches)
+        left_idx = np.concatenate([left_idx, np.full(len(unmatched), -1)])
+        right_idx = np.concatenate([right_idx, unmatched])
+
+    result = _assemble(left_df, right_df, left_idx, right_idx, join_conditions, how, suffixes)
+    result.attrs["join_plan"] = plan
+    return result
+
+
+# --- 스트리밍 조인: 작은 쪽으로 해시 테이블을 한 번 만들고 큰 쪽은 청크 단위로 probe ---
+
+
+
+class HashJoinTable:
+    """
+    build 쪽 키를 한 번만 인코딩해 두고, probe 청크의 키를 같은 코드 공간으로 변환하는 해시 테이블
+    (버킷은 한 번만 만들고 청크마다 probe만 수행)
+    """
+
+    def __init__(self, build_df, key_columns):
+        self.df = build_df
+        self.key_columns = list(key_columns)
+        self.uniques = []
+        self.steps = []
+        codes = None
+        for col in self.key_columns:
+            column_codes, uniques = pd.factorize(_key_values(build_df[col]))
+            column_codes = column_codes.astype(np.int64)
+            self.uniques.append(pd.Index(uniques))
+            if codes is None:
+                codes = column_codes
+                continue
+            # 여러 키를 조합한 코드는 다시 촘촘한 코드로 바꿔 오버플로 방지 (probe 때 같은 변환을 재사용)
+            combined = codes * len(uniques) + column_codes
+            valid = (codes >= 0) & (column_codes >= 0)
+            step = pd.Index(np.unique(combined[valid]))
+            codes = np.full(len(combined), -1, dtype=np.int64)
+            codes[valid] = step.get_indexer(combined[valid])
+            self.steps.append(step)
+        self.codes = codes if codes is not None else np.zeros(len(build_df), dtype=np.int64)
+        self.cardinality = len(self.steps[-1]) if self.steps else (len(self.uniques[0]) if self.uniques else 1)
+        self.buckets = _hash_buckets(self.codes, self.cardinality)
+        self.counts = self.buckets[0]
+
+    def probe_codes(self, probe_df, key_columns):
+        """probe 청크의 키를 build 쪽 코드로 변환 (결측이거나 build 쪽에 없는 키는 -1)"""
+        codes = None
+        for i, col in enumerate(key_columns):
+            column_codes = self.uniques[i].get_indexer(_key_values(probe_df[col])).astype(np.int64)
+            if codes is None:
+                codes = column_codes
+                continue
+            combined = codes * len(self.uniques[i]) + column_codes
+            valid = (codes >= 0) & (column_codes >= 0)
+            codes = np.full(len(combined), -1, dtype=np.int64)
+            codes[valid] = self.steps[i - 1].get_indexer(combined[valid])
+        return codes if codes is not None else np.zeros(len(probe_df), dtype=np.int64)
+
+    def matches(self, codes):
+        """probe 행마다 build 쪽에 같은 키가 있는지"""
+        matched = np.zeros(len(codes), dtype=bool)
+        matched[codes >= 0] = self.counts[codes[codes >= 0]] > 0
+        return matched
+
+
+def split_build_probe(left_chunks, right_chunks):
+    """
+    양쪽 청크를 번갈아 하나씩 읽어 먼저 끝나는 쪽(행이 적은 쪽)을 build 쪽으로 선택
+    Returns:
+        tuple: (build_side, build 쪽 전체 DataFrame, probe 쪽 청크 iterator)
+            probe 쪽에서 이미 읽은 청크가 먼저 나오고 나머지는 그대로 스트리밍
+    """
+    iterators = {"left": iter(left_chunks), "right": iter(right_chunks)}
+    buffers = {"left": [], "right": []}
+    while True:
+        for side in ("left", "right"):
+            chunk = next(iterators[side], None)
+            if chunk is None:
+                probe_side = "right" if side == "left" else "left"
+                build_df = concat_chunks(buffers[side])
+                buffered = buffers[probe_side]
+
+                def probe_chunks():
+                    while buffered:
+                        yield buffered.pop(0)
+                    yield from iterators[probe_side]
+
+                return side, build_df, probe_chunks()
+            buffers[side].append(chunk)
+
+
+def stream_join(build_df, probe_chunks, join_conditions, how="inner", build_side="right", suffixes=("_left", "_right")):
+    """
+    build 쪽 해시 테이블에 probe 쪽 청크를 차례로 조인해 결과 청크를 생성 (inner/left/right/full/semi/anti)
+    probe 청크는 조인 후 바로 버리므로 메모리는 build 쪽 + 청크 하나 + 결과만 사용
+    build 쪽이 결과에 빠진 행(right/full의 오른쪽, left/full의 왼쪽)과 semi/anti 결과는 마지막 청크로 생성
+    Args:
+        build_df (DataFrame): 해시 테이블을 만들 쪽 전체
+        probe_chunks (iterable): 반대쪽 DataFrame 청크 (칼럼 구성이 모두 같아야 함)
+        join_conditions (list): (왼쪽 칼럼, 오른쪽 칼럼) 목록
+        how (str): inner/left/right/full/semi/anti
+        build_side (str): build_df가 "left"인지 "right"인지
+    Yields:
+        DataFrame: 결과 청크 (perform_join과 같은 칼럼 구성)
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"지원하지 않는 조인 종류: {how}")
+    left_on = [left for left, _ in join_conditions]
+    right_on = [right for _, right in join_conditions]
+    build_on, probe_on = (right_on, left_on) if build_side == "right" else (left_on, right_on)
+    table = HashJoinTable(build_df, build_on)
+    build_seen = np.zeros(len(build_df), dtype=bool)
+    probe_template = None
+
+    for chunk in probe_chunks:
+        if probe_template is None:
+            probe_template = chunk.iloc[:0]
+        codes = table.probe_codes(chunk, probe_on)
+        matched = table.matches(codes)
+        if build_side == "right" and how in ("semi", "anti"):
+            yield chunk[matched if how == "semi" else ~matched].reset_index(drop=True)
+            continue
+        probe_idx, build_idx = _probe_buckets(codes, table.buckets)
+        build_seen[build_idx] = True
+        if how in ("semi", "anti"):
+            continue
+        # probe 쪽이 보존되는 조인이면 매칭되지 않은 probe 행도 포함 (probe 행 순서 유지)
+        if (build_side == "right" and how in ("left", "full")) or (build_side == "left" and how in ("right", "full")):
+            unmatched = np.flatnonzero(~matched)
+            probe_idx = np.concatenate([probe_idx, unmatched])
+            build_idx = np.concatenate([build_idx, np.full(len(unmatched), -1)])
+            order = np.argsort(probe_idx, kind="stable")
+            probe_idx, build_idx = probe_idx[order], build_idx[order]
+        if build_side == "right":
+            yield _assemble(chunk, build_df, probe_idx, build_idx, join_conditions, how, suffixes)
+        else:
+            yield _assemble(build_df, chunk, build_idx, probe_idx, join_conditions, how, suffixes)
+
+    if build_side == "left" and how in ("semi", "anti"):
+        yield build_df[build_seen if how == "semi" else ~build_seen].reset_index(drop=True)
+    elif (build_side == "right" and how in ("right", "full")) or (build_side == "left" and how in ("left", "full")):
+        unmatched = np.flatnonzero(~build_seen)
+        missing = np.full(len(unmatched), -1)
+        if probe_template is None:
+            probe_template = pd.DataFrame(columns=probe_on)
+        if build_side == "right":
+            yield _assemble(probe_template, build_df, missing, unmatched, join_conditions, how, suffixes)
+        else:
+            yield _assemble(build_df, probe_template, unmatched, missing, join_conditions, how, suffixes)
+
+
+def concat_chunks(chunks):
+    """
+    청크들을 하나의 DataFrame으로 합침
+    청크마다 카테고리가 다른 category 칼럼은 object로 바뀌지 않도록 카테고리를 합쳐 유지
+    날짜만 있는 청크(시간대 없음)와 시각이 있는 청크(UTC)가 섞인 date 칼럼은 UTC로 맞춤
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[col] = union_categoricals([part.array for part in parts], ignore_order=True)
+        elif any(isinstance(part.dtype, pd.DatetimeTZDtype) for part in parts):
+            columns[col] = pd.concat([_key_values(part) for part in parts], ignore_index=True)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns, columns=chunks[0].columns)
+
+
+def relation_columns(join_conditions, columns_types, side="left"):
+    """
+    조인 조건 중 페이지 ID와 짝지은 relation 칼럼 목록
+    Args:
+        join_conditions (list): (왼쪽 칼럼, 오른쪽 칼럼) 목록
+        columns_types (dict): side 쪽 데이터베이스의 {칼럼: 타입}
+        side (str): relation 칼럼이 있는 쪽 ("left"/"right")
+    Raises:
+        ValueError: 페이지 ID와 짝지은 칼럼이 relation 속성이 아닐 때
+    """
+    columns = []
+    for left, right in join_conditions:
+        column, other = (left, right) if side == "left" else (right, left)
+        if other != PAGE_ID_COLUMN or column == PAGE_ID_COLUMN:
+            continue
+        if columns_types.get(column) != "relation":
+            raise ValueError(f"'{column}'은 relation 속성이 아니므로 페이지 ID와 조인할 수 없습니다.")
+        columns.append(column)
+    return columns
+
+
+def explode_relation(df, column):
+    """
+    relation 칼럼("ID1, ID2, ...")을 관계 하나당 한 행으로 펼침 (다대다 관계)
+    관계가 없는 행은 결측값 한 행으로 남김 (LEFT/ANTI JOIN에서 유지되도록)
+    """
+    values = df[column].to_numpy(dtype=object, na_value=None)
+    parts = [value.split(", ") if value else [None] for value in values]
+    counts = np.fromiter((len(ids) for ids in parts), dtype=np.int64, count=len(parts))
+    if (counts == 1).all():
+        return df
+    exploded = df.take(np.repeat(np.arange(len(df)), counts))
+    exploded[column] = pd.array([page_id for ids in parts for page_id in ids], dtype="string")
+    return exploded.reset_index(drop=True)
@@ -1,10 +1,132 @@
 import streamlit as st
 import pandas as pd
-from utils import get_database_rows, load_database_info, notion_to_dataframe, perform_inner_join, create_notion_database, add_rows_to_notion_database
-from datetime import datetime
+from utils import get_database_rows, get_database_rows_parallel, iter_database_pages, iter_dataframe_chunks, get_property_ids, get_required_columns, load_databases, notion_to_dataframe, join_dataframes, create_notion_database, add_rows_with_progress, merge_rows_with_progress
+from notion_filter import build_notion_filter, apply_local_filters
+from row_cache import RowCache, load_database_info_cached, get_database_rows_cached
+from write_journal import WriteJournal, make_run_id
+from notion_transport import NOTION_REQUESTS_PER_SECOND, get_bucket
+from notion_cache import cached_database_info, cached_user_databases, invalidate_metadata
+from property_decoders import PAGE_ID_COLUMN
+from join import JOIN_LABELS, concat_chunks, explode_relation, plan_join, relation_columns, split_build_probe, stream_join
+from aggregate import aggregate_column_types, group_dataframe
+from planner import execute_join_plan, plan_join_order, qualify, table_stats
+from sql_query import SQLError, build_plan, execute_plan, explain_plan, parse_sql, resolve_tables
+from explain import estimate_row_count, explain_join, format_duration
+from relation import load_related_pages, relation_target, same_database
+from property_items import complete_properties
+from tracing import run_in_context, span
+from concurrent.futures import ThreadPoolExecutor
+from notion_client import APIResponseError
 
 # main.py 수정 부분 - 저장 관련 코드 변경
 
+def _result_column(result_df, side, column):
+    """조인 전 칼럼이 조인 결과에서 쓰는 이름 (겹치는 칼럼은 '_left'/'_right' 접미사)"""
+    suffixed = f"{column}_{side}"
+    return suffixed if suffixed in result_df.columns else column
+
+
+def _apply_rate_limit(notion):
+    """설정한 초당 요청 수를 토큰별 공유 버킷에 반영 (같은 토큰의 읽기·쓰기가 모두 따름)"""
+    get_bucket(notion.options.auth).set_rate(st.session_state.get("requests_per_second", NOTION_REQUESTS_PER_SECOND))
+
+
+def _database_available(notion, database_id):
+    """이어서 저장할 데이터베이스가 아직 있는지 (삭제·보관되었거나 접근할 수 없으면 False)"""
+    try:
+        db = notion.databases.retrieve(database_id=database_id)
+    except APIResponseError:
+        return False
+    return not db.get("archived") and not db.get("in_trash")
+
+
+def _save_new_database(notion, save_container, result_df, parent_page_id, result_name, run_parts,
+                       columns_types, right_columns_types=None, source_name=None, restart=False):
+    """
+    결과를 새 Notion 데이터베이스에 저장 (같은 설정으로 중단된 저장이 있으면 같은 데이터베이스에 이어서 저장)
+    Args:
+        run_parts (tuple): 실행 ID를 정하는 조회 설정 (원본 데이터베이스, 조인 조건, 필터)
+        columns_types, right_columns_types (dict): create_notion_database에 넘길 칼럼 타입
+        source_name (str, optional): add_rows_with_progress에 넘길 원본 데이터베이스 이름
+        restart (bool): True면 중단된 저장을 이어가지 않고 처음부터 저장
+    """
+    journal = WriteJournal()
+    base_id = make_run_id(*run_parts, parent_page_id, result_name, list(result_df.columns))
+    if restart:
+        journal.abandon(base_id)
+    run_id, new_db_id = journal.resume_run(base_id)
+    if new_db_id and not _database_available(notion, new_db_id):
+        # 이어서 저장할 데이터베이스가 삭제·보관되었으면 새 실행으로 처음부터 저장
+        st.warning("이전에 저장하던 데이터베이스를 찾을 수 없어 새 데이터베이스에 처음부터 저장합니다.")
+        journal.finish(run_id)
+        run_id, new_db_id = journal.resume_run(base_id)
+    if new_db_id:
+        done_count = len(journal.done_rows(run_id))
+        st.info(f"이전에 중단된 저장을 이어서 진행합니다. (이미 저장된 행: {done_count}개)")
+    else:
+        new_db_id = create_notion_database(
+            notion, parent_page_id, result_name, result_df.columns, columns_types, right_columns_types,
+        )
+        if new_db_id:
+            journal.set_database(run_id, new_db_id)
+            # 새 데이터베이스가 목록에 바로 보이도록 캐시 무효화
+            invalidate_metadata(notion)
+
+    if not new_db_id:
+        save_container.error("데이터베이스 생성에 실패했습니다.")
+        return
+    success_count, total_count = add_rows_with_progress(
+        notion, new_db_id, result_df, source_name, journal=journal, run_id=run_id
+    )
+    if success_count == total_count:
+        journal.finish(run_id)
+    save_container.success(f"✅ {success_count}/{total_count} 행이 Notion 데이터베이스에 성공적으로 저장되었습니다!")
+
+    # 생성된 DB로 이동할 수 있는 링크 제공
+    db_url = f"https://notion.so/{new_db_id.replace('-', '')}"
+    st.markdown(f"[새 데이터베이스 보기]({db_url})")
+
+
+def _complete_properties(notion, db_name, pages, columns, db=None):
+    """쿼리에 쓰는 칼럼 중 25개가 넘어 잘린 값을 페이지 속성 조회로 채움 (실패하면 경고)"""
+    completed, failed = complete_properties(notion, pages, columns, db)
+    if completed:
+        st.caption(f"{db_name}: 잘린 속성 값 {len(completed):,}개를 전체 값으로 채웠습니다.")
+    if failed:
+        st.warning(f"{db_name}: 잘린 속성 값 {len(failed):,}개를 가져오지 못해 앞의 25개 항목만 사용합니다. "
+                   f"(예: {next(iter(failed.values()))})")
+    return pages
+
+
+def _dataframe_chunks(notion, db_name, database_id, db, columns_types, notion_filter, local_filters, columns, keep_columns):
+    """스트리밍 조인용 DataFrame 청크 (응답 페이지마다 디코딩 → 로컬 필터 → 필터에만 쓰인 칼럼 제거)"""
+    properties = get_property_ids(db, columns) if len(columns) < len(columns_types) else None
+    pages = iter_database_pages(notion, database_id, filter=notion_filter, filter_properties=properties)
+    pages = (_complete_properties(notion, db_name, batch, columns, db) for batch in pages)
+    for chunk in iter_dataframe_chunks(columns, pages, columns_types):
+        yield apply_local_filters(chunk, local_filters)[keep_columns]
+
+
+def _join_conditions():
+    """세션 상태의 조인 조건 [(왼쪽 칼럼, 오른쪽 칼럼), ...]"""
+    return [
+        (st.session_state[f"join_left_{i}"], st.session_state[f"join_right_{i}"])
+        for i in range(st.session_state.join_condition_count)
+    ]
+
+
+def _key_columns(join_conditions):
+    """SELECT와 상관없이 조회해야 하는 양쪽 칼럼 (조인 키 + GROUP BY에 쓰는 칼럼)"""
+    left_keys = [left for left, _ in join_conditions]
+    right_keys = [right for _, right in join_conditions]
+    if st.session_state.get("use_group_by"):
+        sources = list(st.session_state.get("group_by_columns", []))
+        sources += [source for source, _ in st.session_state.get("aggregates", []) if source is not None]
+        left_keys += [col for side, col in sources if side == "left"]
+        right_keys += [col for side, col in sources if side == "right"]
+    return left_keys, right_keys
+
+
 def main(notion):
     """메인 실행 함수: 프론트엔드에서 설정된 값으로 JOIN 수행"""
     try:
@@ -14,39 +136,221 @@ def main(notion):
         left_db_name = st.session_state.left_db_label[0]
         right_db_name = st.session_state.right_db_label[0]
         
-        # 데이터베이스 정보 로드
-        left_db, left_columns_types = load_database_info(notion, left_db_id)
-        right_db, right_columns_types = load_database_info(notion, right_db_id)
+        use_row_cache = st.session_state.get("use_row_cache", False)
+        row_cache = RowCache(notion.options.auth) if use_row_cache else None
+        _apply_rate_limit(notion)
         
-        # 데이터베이스 행 가져오기
-        left_db_rows = get_database_rows(notion, left_db_id)
-        right_db_rows = get_database_rows(notion, right_db_id)
+        # WHERE 필터를 Notion 필터로 변환 (표현할 수 없는 조건은 로컬에서 처리)
+        left_notion_filter, left_local_filters = build_notion_filter(st.session_state.get("left_filters", []))
+        right_notion_filter, right_local_filters = build_notion_filter(st.session_state.get("right_filters", []))
         
-        # DataFrame 변환
-        left_columns = list(left_columns_types.keys())
-        right_columns = list(right_columns_types.keys())
+        # SELECT 칼럼 + 조인 키 + 로컬 필터 칼럼만 조회·디코딩 (SELECT를 저장하지 않았으면 전체 칼럼)
+        join_conditions = _join_conditions()
+        if use_row_cache:
+            # 캐시에는 전체 row가 있으므로 필터는 모두 로컬에서 적용
+            left_local_filters = st.session_state.get("left_filters", [])
+            right_local_filters = st.session_state.get("right_filters", [])
+        left_keys, right_keys = _key_columns(join_conditions)
         
-        left_df = notion_to_dataframe(left_columns, left_db_rows)
-        right_df = notion_to_dataframe(right_columns, right_db_rows)
+        def left_required(columns_types):
+            return get_required_columns(
+                columns_types, st.session_state.get("left_columns_selected"), left_keys, left_local_filters,
+            )
         
-        # 필터 적용
-        if hasattr(st.session_state, 'left_columns_selected') and hasattr(st.session_state, 'right_columns_selected'):
-            selected_left_cols = st.session_state.left_columns_selected
-            selected_right_cols = st.session_state.right_columns_selected
+        def right_required(columns_types):
+            return get_required_columns(
+                columns_types, st.session_state.get("right_columns_selected"), right_keys, right_local_filters,
+            )
+        
+        join_type = st.session_state.get("join_type", "inner")
+        # 관계형 JOIN: relation 속성 = 페이지 ID (한쪽이라도 있으면 스트리밍 대신 일반 경로로 처리)
+        relation_join = any(PAGE_ID_COLUMN in condition for condition in join_conditions)
+        follow_relation = any(right == PAGE_ID_COLUMN for _, right in join_conditions)
+        if st.session_state.get("stream_join") and join_conditions and not use_row_cache and not relation_join:
+            # 스트리밍 조인: 응답 페이지마다 바로 칼럼 청크로 디코딩하고 원본 JSON은 버림
+            # 먼저 끝나는(작은) 쪽으로 해시 테이블을 만들고 큰 쪽은 청크 단위로 probe
+            left_db, left_columns_types = cached_database_info(notion, left_db_id)
+            right_db, right_columns_types = cached_database_info(notion, right_db_id)
+            left_chunks = _dataframe_chunks(
+                notion, left_db_name, left_db_id, left_db, left_columns_types, left_notion_filter, left_local_filters,
+                left_required(left_columns_types),
+                get_required_columns(left_columns_types, st.session_state.get("left_columns_selected"), left_keys),
+            )
+            right_chunks = _dataframe_chunks(
+                notion, right_db_name, right_db_id, right_db, right_columns_types, right_notion_filter, right_local_filters,
+                right_required(right_columns_types),
+                get_required_columns(right_columns_types, st.session_state.get("right_columns_selected"), right_keys),
+            )
+            try:
+                with span("stream_build") as build_span:
+                    build_side, build_df, probe_chunks = split_build_probe(left_chunks, right_chunks)
+                    if build_span is not None:
+                        build_span.set("rows", len(build_df))
+                st.info(
+                    f"스트리밍 {JOIN_LABELS[join_type]}: 해시 테이블 {build_side} ({len(build_df):,}행), "
+                    f"반대쪽은 응답 페이지 단위로 probe"
+                )
+                with span("stream_probe") as probe_span:
+                    result_df = concat_chunks(stream_join(
+                        build_df, probe_chunks, join_conditions, how=join_type, build_side=build_side,
+                    ))
+                    if probe_span is not None:
+                        probe_span.set("rows", len(result_df))
+            except Exception as e:
+                st.error(f"조인 수행 중 오류 발생: {e}")
+                return
+        else:
+            # 데이터베이스 정보와 행 가져오기 (필터는 서버 측에서 적용)
+            if use_row_cache:
+                left_db, left_columns_types = load_database_info_cached(notion, left_db_id, row_cache)
+                right_db, right_columns_types = load_database_info_cached(notion, right_db_id, row_cache)
+                left_db_rows = get_database_rows_cached(notion, left_db_id, row_cache, left_required(left_columns_types))
+                right_db_rows = get_database_rows_cached(notion, right_db_id, row_cache, right_required(right_columns_types))
+            elif follow_relation:
+                # 왼쪽을 먼저 가져온 뒤 relation 속성이 가리키는 오른쪽 페이지만 가져옴
+                # (관계된 페이지가 적으면 ID로 개별 조회, 많으면 오른쪽 전체 조회)
+                left_db, left_columns_types = cached_database_info(notion, left_db_id)
+                right_db, right_columns_types = cached_database_info(notion, right_db_id)
+                follow_columns = relation_columns(join_conditions, left_columns_types)
+                self_relation = same_database(left_db_id, right_db_id)
+                left_columns = left_required(left_columns_types)
+                if self_relation:
+                    # 자기 참조 관계는 왼쪽에서 가져온 페이지를 오른쪽에도 재사용하므로 양쪽 칼럼을 함께 조회
+                    left_columns += [col for col in right_required(right_columns_types) if col not in left_columns]
+                properties = get_property_ids(left_db, left_columns) if len(left_columns) < len(left_columns_types) else None
+                left_db_rows = get_database_rows(notion, left_db_id, filter=left_notion_filter, filter_properties=properties)
+                # 25개가 넘는 relation은 잘려 있으므로 따라가기 전에 전체 값을 채움
+                _complete_properties(notion, left_db_name, left_db_rows, left_columns, left_db)
+                for column in follow_columns:
+                    target = relation_target(left_db, column)
+                    if target and not same_database(target, right_db_id):
+                        st.warning(f"'{column}'은 {right_db_name}이 아닌 다른 데이터베이스를 가리킵니다. 매칭되는 행이 없을 수 있습니다.")
+                right_db_rows, strategy, failed = load_related_pages(
+                    notion, left_db_rows, follow_columns, right_db_id, right_notion_filter,
+                    known_pages=left_db_rows if self_relation else (),
+                )
+                if right_db_rows is None:
+                    columns = right_required(right_columns_types)
+                    properties = get_property_ids(right_db, columns) if len(columns) < len(right_columns_types) else None
+                    right_db_rows = get_database_rows(notion, right_db_id, filter=right_notion_filter, filter_properties=properties)
+                if strategy != "query":
+                    # ID로 가져온 페이지에는 Notion 필터가 적용되지 않았으므로 모든 필터를 로컬에서 적용
+                    right_local_filters = st.session_state.get("right_filters", [])
+                strategy_labels = {
+                    "known": "이미 가져온 페이지 재사용",
+                    "retrieve": "관계된 페이지만 ID로 조회",
+                    "query": "오른쪽 데이터베이스 전체 조회",
+                }
+                st.info(f"관계형 JOIN: {right_db_name} {len(right_db_rows):,}행 ({strategy_labels[strategy]})")
+                if failed:
+                    st.warning(f"{right_db_name}: 관계된 페이지 {len(failed):,}개를 가져오지 못해 JOIN 결과에서 빠졌습니다. "
+                               f"(예: {next(iter(failed.values()))})")
+            elif st.session_state.get("parallel_fetch"):
+                # 대용량 DB: created_time 구간별 동시 페이지네이션, 양쪽 DB도 동시에 조회
+                # (요청 한도는 토큰별 공유 버킷이 적용)
+                # 스키마는 캐시에서 먼저 가져오고 (st.cache_data는 스크립트 스레드에서 호출) 행만 스레드에서 조회
+                left_db, left_columns_types = cached_database_info(notion, left_db_id)
+                right_db, right_columns_types = cached_database_info(notion, right_db_id)
+
+                def fetch_side(database_id, db, columns_types, notion_filter, required):
+                    columns = required(columns_types)
+                    properties = get_property_ids(db, columns) if len(columns) < len(columns_types) else None
+                    rows, timings = get_database_rows_parallel(
+                        notion, database_id, filter=notion_filter, filter_properties=properties
+                    )
+                    return rows, timings
+            
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    left_future = run_in_context(executor, fetch_side, left_db_id, left_db, left_columns_types,
+                                                 left_notion_filter, left_required)
+                    right_future = run_in_context(executor, fetch_side, right_db_id, right_db, right_columns_types,
+                                                  right_notion_filter, right_required)
+                    left_db_rows, left_timings = left_future.result()
+                    right_db_rows, right_timings = right_future.result()
+                with st.expander("⏱️ 구간별 조회 시간"):
+                    st.dataframe(pd.DataFrame(
+                        [{"db": left_db_name, **t} for t in left_timings] + [{"db": right_db_name, **t} for t in right_timings]
+                    ))
+            else:
+                # 양쪽 DB의 스키마·행을 비동기로 동시에 조회 (전체 시간 ≈ 느린 쪽 시간)
+                (left_db, left_columns_types, left_db_rows), (right_db, right_columns_types, right_db_rows) = load_databases(
+                    notion,
+                    [
+                        {"database_id": left_db_id, "filter": left_notion_filter, "columns": left_required},
+                        {"database_id": right_db_id, "filter": right_notion_filter, "columns": right_required},
+                    ],
+                )
+            left_columns = left_required(left_columns_types)
+            right_columns = right_required(right_columns_types)
+            _complete_properties(notion, left_db_name, left_db_rows, left_columns, left_db)
+            _complete_properties(notion, right_db_name, right_db_rows, right_columns, right_db)
         
-        # 조인 조건 가져오기
-        join_conditions = []
-        for i in range(st.session_state.join_condition_count):
-            left_col = st.session_state[f"join_left_{i}"]
-            right_col = st.session_state[f"join_right_{i}"]
-            join_conditions.append((left_col, right_col))
+            # DataFrame 변환
+            left_df = notion_to_dataframe(left_columns, left_db_rows)
+            right_df = notion_to_dataframe(right_columns, right_db_rows)
         
-        # INNER JOIN 수행
-        result_df = perform_inner_join(left_df, right_df, join_conditions)
+            # 필터 적용 후 필터에만 쓰인 칼럼은 조인 전에 제거
+            left_df = apply_local_filters(left_df, left_local_filters)
+            right_df = apply_local_filters(right_df, right_local_filters)
+            left_df = left_df[get_required_columns(left_columns_types, st.session_state.get("left_columns_selected"), left_keys)]
+            right_df = right_df[get_required_columns(right_columns_types, st.session_state.get("right_columns_selected"), right_keys)]
+            if relation_join:
+                # 다대다 관계: relation 칼럼을 관계 하나당 한 행으로 펼친 뒤 페이지 ID와 조인
+                try:
+                    for column in relation_columns(join_conditions, left_columns_types, "left"):
+                        left_df = explode_relation(left_df, column)
+                    for column in relation_columns(join_conditions, right_columns_types, "right"):
+                        right_df = explode_relation(right_df, column)
+                except ValueError as e:
+                    st.error(str(e))
+                    return
         
+            # JOIN 수행 (결과를 만들기 전에 예상 행 수를 먼저 표시)
+            plan = None
+            if join_conditions:
+                try:
+                    plan = plan_join(left_df, right_df, join_conditions, how=join_type)
+                except Exception as e:
+                    st.error(f"조인 계획 수립 중 오류 발생: {e}")
+                    return
+                build_side = f", 해시 테이블: {plan['build_side']}" if plan["strategy"] == "hash" else ""
+                st.info(
+                    f"{JOIN_LABELS[join_type]} 예상 결과: {plan['estimated_rows']:,}행 "
+                    f"(왼쪽 {plan['left_rows']:,}행 / 키 {plan['left_distinct_keys']:,}개, "
+                    f"오른쪽 {plan['right_rows']:,}행 / 키 {plan['right_distinct_keys']:,}개, "
+                    f"전략: {plan['strategy']}{build_side})"
+                )
+            result_df = join_dataframes(left_df, right_df, join_conditions, how=join_type, plan=plan)
+
+        # GROUP BY: 조인 결과를 집계해 Notion에 쓸 행 수를 줄임
+        result_types = None
+        if result_df is not None and st.session_state.get("use_group_by"):
+            group_by = [_result_column(result_df, side, col) for side, col in st.session_state.get("group_by_columns", [])]
+            aggregates = [
+                (None if source is None else _result_column(result_df, *source), func)
+                for source, func in st.session_state.get("aggregates", [])
+            ]
+            try:
+                grouped_df = group_dataframe(result_df, group_by, aggregates)
+            except ValueError as e:
+                st.error(f"GROUP BY 집계 중 오류 발생: {e}")
+                return
+            st.info(f"GROUP BY: 조인 결과 {len(result_df):,}행 → {len(grouped_df):,}행")
+            column_types = {}
+            for source_types, suffix in ((left_columns_types, "_left"), (right_columns_types, "_right")):
+                for col, col_type in source_types.items():
+                    column_types.setdefault(col, col_type)
+                    column_types[col + suffix] = col_type
+            # create_notion_database는 '_right' 접미사를 떼고 타입을 찾음
+            result_types = {
+                name.replace('_right', ''): col_type
+                for name, col_type in aggregate_column_types(group_by, aggregates, column_types).items()
+            }
+            result_df = grouped_df
+
         if result_df is not None:
             # 결과 표시
-            st.subheader("📊 INNER JOIN 결과")
+            st.subheader(f"📊 {JOIN_LABELS[join_type]} 결과")
             st.dataframe(result_df)
             st.success(f"총 {len(result_df)}개의 행이 조인되었습니다.")
             
@@ -78,35 +382,34 @@ def main(notion):
             save_container = st.empty()
             
             try:
+                if st.session_state.get("save_mode") == "merge":
+                    # 기존 데이터베이스에 바뀐 행만 추가·수정·보관
+                    merge_db_id = st.session_state.merge_db[1]
+                    save_container.info("기존 데이터베이스와 비교하는 중...")
+                    summary = merge_rows_with_progress(
+                        notion, merge_db_id, result_df, st.session_state.merge_key,
+                        archive_missing=st.session_state.get("merge_archive", True),
+                    )
+                    changed = summary["create"] + summary["update"] + summary["archive"]
+                    save_container.success(
+                        f"✅ MERGE 완료: {changed - summary['failed']}/{changed}개 변경 반영 "
+                        f"(변경 없음 {summary['unchanged']}행)"
+                    )
+                    db_url = f"https://notion.so/{merge_db_id.replace('-', '')}"
+                    st.markdown(f"[데이터베이스 보기]({db_url})")
                 # 세션 상태에서 미리 선택한 페이지와 DB 이름 가져오기
-                if "save_page" in st.session_state and "save_db_name" in st.session_state:
+                elif "save_page" in st.session_state and "save_db_name" in st.session_state:
                     save_container.info("Notion 데이터베이스에 결과 저장 중...")
                     
-                    parent_page_id = st.session_state.save_page[1]  # 튜플의 두 번째 항목은 페이지 ID
-                    result_name = st.session_state.save_db_name
-                    
-                    # 새 데이터베이스 생성
-                    new_db_id = create_notion_database(
-                        notion, 
-                        parent_page_id, 
-                        result_name, 
-                        result_df.columns,
-                        left_columns_types,
-                        right_columns_types
+                    _save_new_database(
+                        notion, save_container, result_df,
+                        st.session_state.save_page[1],  # 튜플의 두 번째 항목은 페이지 ID
+                        st.session_state.save_db_name,
+                        (left_db_id, right_db_id, join_conditions,
+                         st.session_state.get("left_filters", []), st.session_state.get("right_filters", [])),
+                        result_types or left_columns_types, None if result_types else right_columns_types,
+                        source_name=left_db_name, restart=st.session_state.get("restart_export", False),
                     )
-                    
-                    if new_db_id:
-                        # 행 추가 (왼쪽 데이터베이스 이름을 함께 전달)
-                        success_count, total_count = add_rows_to_notion_database(
-                            notion, new_db_id, result_df, left_db_name
-                        )
-                        save_container.success(f"✅ {success_count}/{total_count} 행이 Notion 데이터베이스에 성공적으로 저장되었습니다!")
-                        
-                        # 생성된 DB로 이동할 수 있는 링크 제공
-                        db_url = f"https://notion.so/{new_db_id.replace('-', '')}"
-                        st.markdown(f"[새 데이터베이스 보기]({db_url})")
-                    else:
-                        save_container.error("데이터베이스 생성에 실패했습니다.")
                 else:
                     st.error("저장할 페이지와 데이터베이스 이름 설정이 없습니다. JOIN 결과를 저장하려면 먼저 저장 설정을 확인해주세요.")
             except Exception as e:
@@ -117,4 +420,245 @@ def main(notion):
     
     except Exception as e:
         st.error(f"JOIN 실행 중 오류 발생: {e}")
-        st.exception(e)
\ No newline at end of file
+        st.exception(e)
+
+def main_explain(notion):
+    """EXPLAIN: JOIN을 실행하지 않고 계획과 예상 행 수·API 호출 수·소요 시간 표시 (각 DB의 첫 페이지만 조회)"""
+    try:
+        left_db_name, left_db_id = st.session_state.left_db_label
+        right_db_name, right_db_id = st.session_state.right_db_label
+        use_row_cache = st.session_state.get("use_row_cache", False)
+        row_cache = RowCache(notion.options.auth) if use_row_cache else None
+        _apply_rate_limit(notion)
+        requests_per_second = st.session_state.get("requests_per_second", NOTION_REQUESTS_PER_SECOND)
+
+        join_conditions = _join_conditions()
+        left_keys, right_keys = _key_columns(join_conditions)
+        join_type = st.session_state.get("join_type", "inner")
+        save_mode = st.session_state.get("save_mode", "create")
+
+        sides = []
+        for name, db_id, side, keys in (
+            (left_db_name, left_db_id, "left", left_keys),
+            (right_db_name, right_db_id, "right", right_keys),
+        ):
+            db, columns_types = cached_database_info(notion, db_id)
+            notion_filter, local_filters = build_notion_filter(st.session_state.get(f"{side}_filters", []))
+            sides.append({
+                "name": name,
+                "database_id": db_id,
+                "db": db,
+                "columns_types": columns_types,
+                "columns": get_required_columns(
+                    columns_types, st.session_state.get(f"{side}_columns_selected"), keys, local_filters,
+                ),
+                "filter": notion_filter,
+                "local_filters": local_filters,
+            })
+
+        merge_rows = None
+        if save_mode == "merge" and "merge_db" in st.session_state:
+            merge_rows = estimate_row_count(notion, st.session_state.merge_db[1], row_cache=row_cache)["rows"]
+
+        with st.spinner("각 데이터베이스의 첫 페이지로 비용을 추정하는 중..."):
+            explained = explain_join(
+                notion, sides[0], sides[1], join_conditions, how=join_type, save_mode=save_mode,
+                merge_rows=merge_rows, requests_per_second=requests_per_second, row_cache=row_cache,
+            )
+    except Exception as e:
+        st.error(f"EXPLAIN 중 오류 발생: {e}")
+        st.exception(e)
+        return
+
+    join = explained["join"]
+    source_labels = {"cache": "로컬 캐시", "exact": "정확", "sample": "첫 페이지로 추정"}
+    lines = []
+    for table in explained["tables"]:
+        lines.append(f"SCAN {table['name']}  (~{table['rows']:,}행, {source_labels[table['source']]})")
+        lines.append(f"  └ 칼럼: {table['columns']}")
+        if table["server_filter"]:
+            lines.append("  └ Notion 필터: 서버에서 적용")
+        if table["local_filters"]:
+            lines.append(f"  └ 로컬 필터: {table['local_filters']}개")
+        lines.append(f"  └ 읽기 API 호출: {table['read_calls']:,}")
+    on = " AND ".join(f"{left} = {right}" for left, right in join["on"])
+    approx = "" if join["exact"] else "~"
+    lines.append(f"{join['label']} ON {on}  ({approx}{join['output_rows']:,}행)")
+    if st.session_state.get("use_group_by"):
+        lines.append("  └ GROUP BY (저장 행 수는 그룹 수 이하)")
+    if save_mode == "merge":
+        lines.append(f"MERGE → 기존 데이터베이스 (~{merge_rows or 0:,}행과 비교, 바뀐 행만 쓰기)")
+    else:
+        lines.append("CREATE DATABASE + 행 추가")
+    lines.append(f"  └ 쓰기 API 호출: 최대 {explained['write_calls']:,}")
+    st.code("\n".join(lines), language=None)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("예상 결과 행", f"{approx}{join['output_rows']:,}")
+    col2.metric("읽기 호출", f"{explained['read_calls']:,}")
+    col3.metric("쓰기 호출", f"{explained['write_calls']:,}")
+    col4.metric("예상 소요 시간", format_duration(explained["total_seconds"]))
+    st.caption(
+        f"초당 {requests_per_second:g}회 요청 한도 기준 (읽기 {format_duration(explained['read_seconds'])}, "
+        f"쓰기 {format_duration(explained['write_seconds'])}). 추정에 API 호출 {explained['sample_calls']}회 사용"
+    )
+    if explained["total_seconds"] > 30 * 60:
+        st.warning(
+            f"실행에 {format_duration(explained['total_seconds'])} 이상 걸릴 수 있습니다. "
+            "필터나 SELECT 칼럼을 줄이거나 MERGE 저장을 고려해 보세요."
+        )
+
+
+def main_multi(notion):
+    """
+    다중 테이블 JOIN: 선택한 데이터베이스를 가져와 비용이 가장 작은 순서로 조인
+    테이블마다 WHERE 필터는 Notion 필터로 내려 보내고, SELECT 칼럼 + 조인 키 + 로컬 필터 칼럼만 조회
+    """
+    try:
+        tables = dict(st.session_state.multi_db_labels)  # {이름: 데이터베이스 ID}
+        conditions = st.session_state.multi_join_conditions
+        all_filters = st.session_state.get("multi_filters", {})  # {이름: 필터 조건 목록}
+        all_selected = st.session_state.get("multi_columns_selected", {})  # {이름: SELECT 칼럼}
+        use_row_cache = st.session_state.get("use_row_cache", False)
+        row_cache = RowCache(notion.options.auth) if use_row_cache else None
+        parallel_fetch = st.session_state.get("parallel_fetch", False)
+        _apply_rate_limit(notion)
+
+        # 테이블별 Notion 필터·로컬 필터와 조회할 칼럼
+        sides = {}
+        for name in tables:
+            filters = all_filters.get(name, [])
+            notion_filter, local_filters = build_notion_filter(filters)
+            if use_row_cache:
+                # 캐시에는 전체 row가 있으므로 필터는 모두 로컬에서 적용
+                notion_filter, local_filters = None, filters
+            keys = [column for table, column in _condition_columns(conditions) if table == name]
+
+            def required(columns_types, name=name, keys=keys, local_filters=local_filters):
+                return get_required_columns(columns_types, all_selected.get(name), keys, local_filters)
+
+            sides[name] = {"filters": filters, "notion_filter": notion_filter, "local_filters": local_filters,
+                           "keys": keys, "required": required}
+
+        # 캐시·구간 병렬 조회를 쓰지 않으면 모든 DB를 비동기로 동시에 조회
+        loaded = {}
+        if not use_row_cache and not parallel_fetch:
+            results = load_databases(notion, [
+                {"database_id": db_id, "filter": sides[name]["notion_filter"], "columns": sides[name]["required"]}
+                for name, db_id in tables.items()
+            ])
+            loaded = {name: (db, columns_types, rows) for name, (db, columns_types, rows) in zip(tables, results)}
+
+        frames = {}
+        stats = {}
+        result_types = {}
+        for name, db_id in tables.items():
+            side = sides[name]
+            if name in loaded:
+                db, columns_types, rows = loaded[name]
+            elif use_row_cache:
+                db, columns_types = load_database_info_cached(notion, db_id, row_cache)
+                rows = get_database_rows_cached(notion, db_id, row_cache, side["required"](columns_types))
+            else:
+                db, columns_types = cached_database_info(notion, db_id)
+                columns = side["required"](columns_types)
+                properties = get_property_ids(db, columns) if len(columns) < len(columns_types) else None
+                rows, _ = get_database_rows_parallel(
+                    notion, db_id, filter=side["notion_filter"], filter_properties=properties
+                )
+            columns = side["required"](columns_types)
+            _complete_properties(notion, name, rows, columns, db)
+            frame = apply_local_filters(notion_to_dataframe(columns, rows), side["local_filters"])
+            # 필터에만 쓰인 칼럼은 조인 전에 제거
+            frames[name] = frame[get_required_columns(columns_types, all_selected.get(name), side["keys"])]
+            result_types.update((qualify(name, column), kind) for column, kind in columns_types.items())
+            # 캐시를 쓰고 필터가 없으면 저장된 행 수를 그대로 사용
+            row_count = row_cache.count_pages(db_id) if use_row_cache and not side["filters"] else None
+            stats[name] = table_stats(frames[name], side["keys"], row_count)
+
+        order = None if st.session_state.get("optimize_join_order", True) else list(tables)
+        plan = plan_join_order(stats, conditions, order=order)
+        st.info(f"조인 순서: {' → '.join(plan['order'])} (예상 중간 결과 합계: {plan['estimated_cost']:,}행)")
+
+        result_df, plan = execute_join_plan(frames, conditions, plan)
+        with st.expander("🧭 단계별 행 수"):
+            st.dataframe(pd.DataFrame([
+                {
+                    "table": step["table"],
+                    "on": ", ".join(f"{left} = {right}" for left, right in step["conditions"]),
+                    "estimated_rows": step["estimated_rows"],
+                    "actual_rows": step["actual_rows"],
+                }
+                for step in plan["steps"]
+            ]))
+
+        st.subheader("📊 다중 테이블 JOIN 결과")
+        st.dataframe(result_df)
+        st.success(f"총 {len(result_df)}개의 행이 조인되었습니다.")
+
+        if st.session_state.get("multi_save") and st.session_state.get("multi_save_page"):
+            st.subheader("📋 Notion에 결과 저장")
+            save_container = st.empty()
+            save_container.info("Notion 데이터베이스에 결과 저장 중...")
+            _save_new_database(
+                notion, save_container, result_df,
+                st.session_state.multi_save_page[1], st.session_state.multi_save_db_name,
+                (tables, conditions, all_filters),
+                result_types, source_name=next(iter(tables)),
+                restart=st.session_state.get("multi_restart_export", False),
+            )
+    except Exception as e:
+        st.error(f"다중 테이블 JOIN 실행 중 오류 발생: {e}")
+        st.exception(e)
+
+
+def _condition_columns(conditions):
+    """(테이블1, 칼럼1, 테이블2, 칼럼2) 조건 목록에 나오는 (테이블, 칼럼) 쌍"""
+    for left_table, left_col, right_table, right_col in conditions:
+        yield left_table, left_col
+        yield right_table, right_col
+
+
+def main_sql(notion):
+    """SQL 쿼리 모드: 쿼리를 실행 계획으로 바꿔 필요한 칼럼과 행만 Notion에서 가져와 실행"""
+    try:
+        query = parse_sql(st.session_state.sql_query)
+        database_ids = resolve_tables(query, cached_user_databases(notion))
+        use_row_cache = st.session_state.get("use_row_cache", False)
+        row_cache = RowCache(notion.options.auth) if use_row_cache else None
+        _apply_rate_limit(notion)
+
+        dbs = {}
+        schemas = {}
+        for alias, db_id in database_ids.items():
+            if use_row_cache:
+                dbs[alias], schemas[alias] = load_database_info_cached(notion, db_id, row_cache)
+            else:
+                dbs[alias], schemas[alias] = cached_database_info(notion, db_id)
+        plan = build_plan(query, schemas)
+        with st.expander("🧾 실행 계획", expanded=True):
+            st.code("\n".join(explain_plan(plan)), language="text")
+
+        frames = {}
+        for alias, table in plan["tables"].items():
+            if use_row_cache:
+                # 캐시에는 전체 row가 있으므로 조건은 모두 로컬에서 적용
+                rows = get_database_rows_cached(notion, database_ids[alias], row_cache, table["columns"])
+            else:
+                # 쿼리에 필요한 속성만 응답에 포함
+                properties = get_property_ids(dbs[alias], table["columns"]) if len(table["columns"]) < len(schemas[alias]) else None
+                rows = get_database_rows(notion, database_ids[alias], filter=table["notion_filter"], filter_properties=properties)
+            _complete_properties(notion, alias, rows, table["columns"], dbs[alias])
+            frames[alias] = notion_to_dataframe(table["columns"], rows)
+
+        result_df, join_order = execute_plan(plan, frames, server_filtered=not use_row_cache)
+        if join_order:
+            st.caption(f"조인 순서: {' → '.join(join_order['order'])}")
+        st.subheader("📊 쿼리 결과")
+        st.dataframe(result_df)
+        st.success(f"총 {len(result_df)}개의 행이 반환되었습니다.")
+    except SQLError as e:
+        st.error(f"SQL 오류: {e}")
+    except Exception as e:
+        st.error(f"쿼리 실행 중 오류 발생: {e}")
+        st.exception(e)
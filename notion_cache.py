@@ -0,0 +1,67 @@
+import threading
+
+import streamlit as st
+
+from notion_transport import token_key
+from utils import get_user_databases, load_database_info
+
+
+# 데이터베이스 목록·페이지 목록·스키마를 재실행 간에 재사용하는 시간 (초)
+METADATA_TTL = 5 * 60
+
+# 토큰별 캐시 세대 {토큰 해시: 세대}. 세대를 올리면 그 토큰의 캐시만 무효화됨
+# (st.cache_data의 clear()는 모든 사용자의 캐시를 지우므로 사용하지 않음)
+_generations = {}
+_generation_lock = threading.Lock()
+
+
+def _cache_key(notion):
+    key = token_key(notion.options.auth)
+    with _generation_lock:
+        return key, _generations.get(key, 0)
+
+
+def invalidate_metadata(notion):
+    """이 토큰의 데이터베이스 목록·페이지 목록·스키마 캐시를 무효화 (다음 호출 때 다시 조회)"""
+    key = token_key(notion.options.auth)
+    with _generation_lock:
+        _generations[key] = _generations.get(key, 0) + 1
+
+
+@st.cache_data(ttl=METADATA_TTL, show_spinner=False)
+def _user_databases(cache_key, _notion):
+    return get_user_databases(_notion)
+
+
+@st.cache_data(ttl=METADATA_TTL, show_spinner=False)
+def _user_pages(cache_key, _notion):
+    pages = _notion.search(filter={"property": "object", "value": "page"})["results"]
+    options = []
+    for i, page in enumerate(pages):
+        # 페이지 제목 추출 (title 속성이 있는 경우)
+        if "properties" in page and "title" in page["properties"] and page["properties"]["title"]["title"]:
+            title = page["properties"]["title"]["title"][0]["plain_text"]
+        else:
+            title = f"Untitled Page {i+1}"
+        options.append((title, page["id"]))
+    return options
+
+
+@st.cache_data(ttl=METADATA_TTL, show_spinner=False)
+def _database_info(cache_key, database_id, _notion):
+    return load_database_info(_notion, database_id)
+
+
+def cached_user_databases(notion):
+    """get_user_databases의 캐시 버전 [(이름, ID), ...]"""
+    return _user_databases(_cache_key(notion), notion)
+
+
+def cached_user_pages(notion):
+    """결과를 저장할 수 있는 페이지 목록 [(제목, ID), ...] (캐시)"""
+    return _user_pages(_cache_key(notion), notion)
+
+
+def cached_database_info(notion, database_id):
+    """load_database_info의 캐시 버전 (database_obj, column_types_dict)"""
+    return _database_info(_cache_key(notion), database_id, notion)
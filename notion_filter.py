@@ -0,0 +1,234 @@
+import pandas as pd
+from datetime import date, datetime, timedelta
+
+
+# Notion 필터 JSON에서 사용하는 속성 타입별 지원 연산자
+NOTION_FILTER_OPERATORS = {
+    "title": {"equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty"},
+    "rich_text": {"equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty"},
+    "url": {"equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty"},
+    "email": {"equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty"},
+    "phone_number": {"equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty"},
+    "number": {"equals", "does_not_equal", "greater_than", "less_than", "greater_than_or_equal_to", "less_than_or_equal_to", "is_empty", "is_not_empty"},
+    "select": {"equals", "does_not_equal", "is_empty", "is_not_empty"},
+    "status": {"equals", "does_not_equal", "is_empty", "is_not_empty"},
+    "multi_select": {"contains", "does_not_contain", "is_empty", "is_not_empty"},
+    "date": {"equals", "before", "after", "on_or_before", "on_or_after", "this_week", "past_week", "past_month", "past_year", "next_week", "next_month", "next_year", "is_empty", "is_not_empty"},
+    "checkbox": {"equals", "does_not_equal"},
+}
+
+# 속성이 아닌 페이지 타임스탬프로 필터링하는 타입
+TIMESTAMP_TYPES = {"created_time", "last_edited_time"}
+
+# 값 입력이 필요 없는 연산자
+NO_VALUE_OPERATORS = {"is_empty", "is_not_empty", "this_week", "past_week", "past_month", "past_year", "next_week", "next_month", "next_year"}
+
+TEXT_TYPES = {"title", "rich_text", "url", "email", "phone_number"}
+DATE_TYPES = {"date"} | TIMESTAMP_TYPES
+
+
+def _filter_value(column_type, operator, value):
+    """필터 값을 Notion API가 받는 JSON 값으로 변환"""
+    if operator in {"is_empty", "is_not_empty"}:
+        return True
+    if operator in NO_VALUE_OPERATORS:
+        return {}
+    if column_type in DATE_TYPES:
+        return value.isoformat() if isinstance(value, (date, datetime)) else value
+    if column_type == "number":
+        return float(value)
+    if column_type == "checkbox":
+        return bool(value)
+    return value
+
+
+def compile_filter_condition(condition):
+    """
+    UI 필터 조건 하나를 Notion 필터 JSON으로 변환
+    Args:
+        condition (dict): render_filter_condition이 반환한 {column, operator, value, type}
+    Returns:
+        dict | None: Notion 필터 객체. Notion이 표현할 수 없는 조건이면 None
+    """
+    column = condition["column"]
+    operator = condition["operator"]
+    value = condition.get("value")
+    column_type = condition.get("type")
+
+    if column_type in TIMESTAMP_TYPES:
+        if operator not in NOTION_FILTER_OPERATORS["date"] or (operator not in NO_VALUE_OPERATORS and not value):
+            return None
+        return {"timestamp": column_type, column_type: {operator: _filter_value(column_type, operator, value)}}
+
+    if operator not in NOTION_FILTER_OPERATORS.get(column_type, set()):
+        return None
+
+    if operator not in NO_VALUE_OPERATORS:
+        # 빈 값 비교는 Notion에서 검증 오류가 나므로 로컬에서 처리
+        if value is None or (column_type in TEXT_TYPES | {"select", "status"} and value == ""):
+            return None
+
+    if column_type == "multi_select" and isinstance(value, (list, tuple)):
+        # 여러 옵션은 옵션별 조건을 and로 묶음
+        if not value:
+            return None
+        parts = [{"property": column, "multi_select": {operator: str(option)}} for option in value]
+        return parts[0] if len(parts) == 1 else {"and": parts}
+
+    return {"property": column, column_type: {operator: _filter_value(column_type, operator, value)}}
+
+
+def build_notion_filter(conditions):
+    """
+    필터 조건 목록을 서버 측 Notion 필터와 로컬 처리용 조건으로 분리
+    Args:
+        conditions (list[dict]): 필터 조건 목록 (모두 AND로 결합)
+    Returns:
+        tuple: (notion_filter 또는 None, local_conditions)
+    """
+    compiled = []
+    local_conditions = []
+    for condition in conditions or []:
+        notion_condition = compile_filter_condition(condition)
+        if notion_condition is None:
+            local_conditions.append(condition)
+        elif "and" in notion_condition:
+            compiled.extend(notion_condition["and"])
+        else:
+            compiled.append(notion_condition)
+
+    if not compiled:
+        return None, local_conditions
+    if len(compiled) == 1:
+        return compiled[0], local_conditions
+    # Notion은 compound 필터 하나에 최대 100개 조건까지 허용
+    return {"and": compiled}, local_conditions
+
+
+def _relative_range(operator, now):
+    """this_week, past_month 등 상대 날짜 연산자의 [시작, 끝] 범위"""
+    today = now.normalize()
+    if operator == "this_week":
+        start = today - timedelta(days=(today.weekday() + 1) % 7)  # Notion 주는 일요일 시작
+        return start, start + timedelta(days=7)
+    if operator == "past_week":
+        return today - timedelta(days=7), now
+    if operator == "past_month":
+        return today - pd.DateOffset(months=1), now
+    if operator == "past_year":
+        return today - pd.DateOffset(years=1), now
+    if operator == "next_week":
+        return now, today + timedelta(days=8)
+    if operator == "next_month":
+        return now, today + pd.DateOffset(months=1) + timedelta(days=1)
+    if operator == "next_year":
+        return now, today + pd.DateOffset(years=1) + timedelta(days=1)
+    return None, None
+
+
+def _to_datetime(series):
+    """날짜 칼럼을 UTC 기준 datetime으로 변환 (파싱 불가 값은 NaT)"""
+    return pd.to_datetime(series, errors="coerce", utc=True, format="ISO8601")
+
+
+def _empty_mask(series):
+    """비어 있는 값(None, NaN, 빈 문자열, 빈 목록) 마스크"""
+    mask = series.isna()
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+        mask = mask | series.astype(object).map(lambda v: v == "" or v == [] or v == ()).fillna(False).astype(bool)
+    return mask
+
+
+def _condition_mask(df, condition):
+    """로컬 필터 조건 하나에 대한 불리언 마스크"""
+    column = condition["column"]
+    operator = condition["operator"]
+    value = condition.get("value")
+    column_type = condition.get("type")
+    series = df[column]
+
+    if operator == "is_empty":
+        return _empty_mask(series)
+    if operator == "is_not_empty":
+        return ~_empty_mask(series)
+
+    if column_type in DATE_TYPES:
+        dates = _to_datetime(series)
+        if operator in NO_VALUE_OPERATORS:
+            start, end = _relative_range(operator, pd.Timestamp.now(tz="UTC"))
+            return (dates >= start) & (dates <= end)
+        if value is None or value == "":
+            return pd.Series(True, index=df.index)
+        target = _to_datetime(pd.Series([value])).iloc[0]
+        day = dates.dt.normalize()
+        target_day = target.normalize()
+        comparisons = {
+            "equals": day == target_day,
+            "before": day < target_day,
+            "after": day > target_day,
+            "on_or_before": day <= target_day,
+            "on_or_after": day >= target_day,
+        }
+        return comparisons[operator].fillna(False)
+
+    if column_type == "number":
+        numbers = pd.to_numeric(series, errors="coerce")
+        comparisons = {
+            "equals": numbers == value,
+            "does_not_equal": numbers != value,
+            "greater_than": numbers > value,
+            "less_than": numbers < value,
+            "greater_than_or_equal_to": numbers >= value,
+            "less_than_or_equal_to": numbers <= value,
+        }
+        return comparisons[operator].fillna(False)
+
+    if column_type == "checkbox":
+        flags = series.fillna(False).astype(bool)
+        return flags == bool(value) if operator == "equals" else flags != bool(value)
+
+    if column_type == "multi_select" or isinstance(value, (list, tuple)):
+        options = value if isinstance(value, (list, tuple)) else [value]
+        if not options:
+            return pd.Series(True, index=df.index)
+        selected = series.map(
+            lambda v: set(v) if isinstance(v, (list, tuple)) else {s.strip() for s in str(v).split(",")} if isinstance(v, str) else set()
+        )
+        has_all = selected.map(lambda s: all(str(o) in s for o in options))
+        has_any = selected.map(lambda s: any(str(o) in s for o in options))
+        return (~has_any if operator == "does_not_contain" else has_all).astype(bool)
+
+    if value is None:
+        return pd.Series(True, index=df.index)
+    text = series.astype("string")
+    value = str(value)
+    comparisons = {
+        "equals": lambda: text == value,
+        "does_not_equal": lambda: text != value,
+        "contains": lambda: text.str.contains(value, regex=False),
+        "does_not_contain": lambda: ~text.str.contains(value, regex=False),
+        "starts_with": lambda: text.str.startswith(value),
+        "ends_with": lambda: text.str.endswith(value),
+    }
+    if operator not in comparisons:
+        raise ValueError(f"지원하지 않는 필터 연산자: {operator}")
+    return comparisons[operator]().fillna(False).astype(bool)
+
+
+def apply_local_filters(df, conditions):
+    """
+    Notion 필터로 표현할 수 없는 조건을 pandas로 적용 (모두 AND로 결합)
+    Args:
+        df (DataFrame): notion_to_dataframe 결과
+        conditions (list[dict]): 로컬 필터 조건 목록
+    Returns:
+        DataFrame: 조건을 만족하는 행만 남긴 DataFrame
+    """
+    if not conditions or df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for condition in conditions:
+        if condition["column"] not in df.columns:
+            continue
+        mask &= _condition_mask(df, condition).to_numpy(dtype=bool)
+    return df[mask].reset_index(drop=True)
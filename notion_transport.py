@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+
+import httpx
+from notion_client import AsyncClient, Client
+
+from tracing import current_span, record
+
+
+NOTION_API_URL = "https://api.notion.com"
+NOTION_VERSION = "2022-06-28"
+
+# Notion API 한도: 통합(integration)당 평균 초당 3회, 짧은 버스트 허용
+NOTION_REQUESTS_PER_SECOND = 3.0
+NOTION_BURST = 3
+
+# 재시도할 HTTP 상태 코드 (429: rate limit, 409: 충돌, 5xx: 서버 오류)
+RETRYABLE_STATUS = {409, 429, 500, 502, 503, 504}
+# 다시 보내면 중복 생성될 수 있는 요청은 서버가 처리하지 않은 것이 확실한 429만 재시도
+# 5xx는 페이지가 만들어진 뒤에도 올 수 있고, Notion에는 멱등 키가 없어 재시도하면 같은 행이 두 번 생길 수 있음
+# 저장 기록(write_journal)은 응답을 받은 행만 기록하므로 이런 중복을 막지 못함
+# 그래서 생성의 5xx는 재시도하지 않고, notion_writer가 처리 여부를 알 수 없는 실패(UNCERTAIN_ERROR)로 돌려줌
+NON_IDEMPOTENT_RETRYABLE_STATUS = {429}
+# 요청을 보내기 전에 난 연결 오류 (요청이 서버에 닿지 않았으므로 어떤 요청이든 재시도 가능)
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+DEFAULT_MAX_ATTEMPTS = 8
+
+# keep-alive 연결 풀 크기 (토큰별 클라이언트 하나가 읽기 스레드 전체와 공유)
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+
+
+def backoff(attempt, base=0.5, cap=30.0):
+    """지수 백오프 + full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    초당 요청 수를 제한하는 토큰 버킷 (스레드와 이벤트 루프에서 함께 사용 가능)
+    토큰을 먼저 예약하고 기다릴 시간을 계산하므로, 동기 읽기와 비동기 쓰기가 같은 한도를 나눠 씀
+    """
+
+    def __init__(self, rate=NOTION_REQUESTS_PER_SECOND, burst=NOTION_BURST):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = float(rate)
+
+    def _reserve(self):
+        """토큰 하나를 예약하고 기다려야 할 시간(초) 반환"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def _blocked_for(self):
+        return self.blocked_until - time.monotonic()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기 (스레드용)"""
+        time.sleep(self._reserve())
+        while self._blocked_for() > 0:
+            time.sleep(self._blocked_for())
+
+    async def acquire_async(self):
+        """토큰 하나를 얻을 때까지 대기 (이벤트 루프용)"""
+        await asyncio.sleep(self._reserve())
+        while self._blocked_for() > 0:
+            await asyncio.sleep(self._blocked_for())
+
+    def pause(self, seconds):
+        """Retry-After 동안 모든 요청을 멈춤 (버킷도 비움)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+
+# 통합 토큰별 공유 버킷 {토큰 해시: TokenBucket}
+_buckets = {}
+_clients = {}
+_registry_lock = threading.Lock()
+
+
+def token_key(token):
+    """토큰 원문 대신 쓰는 짧은 해시 (레지스트리·캐시 키)"""
+    return hashlib.sha256((token or "").encode()).hexdigest()[:16]
+
+
+def get_bucket(token):
+    """통합 토큰의 공유 토큰 버킷 (같은 토큰을 쓰는 읽기·쓰기가 모두 이 한도를 따름)"""
+    key = token_key(token)
+    with _registry_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket()
+        return _buckets[key]
+
+
+def is_idempotent(request):
+    """
+    같은 요청을 다시 보내도 결과가 같은지
+    POST 중 데이터베이스 조회·검색은 읽기이므로 포함 (페이지 PATCH는 값을 덮어쓰므로 다시 보내도 같음)
+    """
+    if request.method != "POST":
+        return True
+    path = request.url.path.rstrip("/")
+    return path.endswith("/query") or path.endswith("/v1/search")
+
+
+def retryable_status(request):
+    """요청을 재시도할 HTTP 상태 코드"""
+    return RETRYABLE_STATUS if is_idempotent(request) else NON_IDEMPOTENT_RETRYABLE_STATUS
+
+
+def retryable_error(request, error):
+    """읽기 시간 초과처럼 요청이 전송된 뒤의 오류는 멱등 요청만 재시도"""
+    return is_idempotent(request) or isinstance(error, NOT_SENT_ERRORS)
+
+
+def _record_wait(attempt, seconds):
+    """토큰 버킷 대기 시간 기록 (재시도 요청의 대기는 Retry-After로 멈춘 시간이므로 재시도 대기로 기록)"""
+    record("rate_limit_wait_seconds" if attempt == 0 else "retry_wait_seconds", seconds)
+
+
+def _record_retry(delay):
+    record("retries")
+    record("retry_wait_seconds", delay)
+    return delay
+
+
+def _retry_delay(response, attempt, bucket, on_throttled):
+    """재시도 전 대기 시간. 429는 Retry-After만큼 버킷 전체를 멈춤"""
+    if response.status_code == 429:
+        record("throttled")
+        retry_after = response.headers.get("Retry-After")
+        delay = float(retry_after) if retry_after else backoff(attempt)
+        if on_throttled:
+            on_throttled()
+        if bucket:
+            bucket.pause(delay)
+            return 0.0
+        return delay
+    return backoff(attempt)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    요청마다 공유 버킷에서 토큰을 얻고, 429/5xx/연결 오류는 백오프 후 재시도하는 httpx transport
+    페이지 생성 같은 멱등이 아닌 요청은 429와 전송 전 연결 오류만 재시도 (중복 생성 방지)
+    """
+
+    def __init__(self, bucket=None, max_attempts=DEFAULT_MAX_ATTEMPTS, transport=None, on_throttled=None):
+        self.bucket = bucket
+        self.max_attempts = max_attempts
+        self.transport = transport or httpx.HTTPTransport(limits=POOL_LIMITS)
+        self.on_throttled = on_throttled
+
+    def handle_request(self, request):
+        for attempt in range(self.max_attempts):
+            last = attempt == self.max_attempts - 1
+            waited = time.monotonic()
+            if self.bucket:
+                self.bucket.acquire()
+            _record_wait(attempt, time.monotonic() - waited)
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as error:
+                if last or not retryable_error(request, error):
+                    raise
+                time.sleep(_record_retry(backoff(attempt)))
+                continue
+            record("api_calls")
+            if response.status_code not in retryable_status(request) or last:
+                if current_span() is not None:
+                    response.read()
+                    record("bytes_received", response.num_bytes_downloaded)
+                return response
+            delay = _retry_delay(response, attempt, self.bucket, self.on_throttled)
+            response.close()
+            time.sleep(_record_retry(delay))
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """RateLimitedTransport의 비동기 버전 (같은 토큰 버킷 공유)"""
+
+    def __init__(self, bucket=None, max_attempts=DEFAULT_MAX_ATTEMPTS, transport=None, on_throttled=None):
+        self.bucket = bucket
+        self.max_attempts = max_attempts
+        self.transport = transport or httpx.AsyncHTTPTransport(limits=POOL_LIMITS)
+        self.on_throttled = on_throttled
+
+    async def handle_async_request(self, request):
+        for attempt in range(self.max_attempts):
+            last = attempt == self.max_attempts - 1
+            waited = time.monotonic()
+            if self.bucket:
+                await self.bucket.acquire_async()
+            _record_wait(attempt, time.monotonic() - waited)
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as error:
+                if last or not retryable_error(request, error):
+                    raise
+                await asyncio.sleep(_record_retry(backoff(attempt)))
+                continue
+            record("api_calls")
+            if response.status_code not in retryable_status(request) or last:
+                if current_span() is not None:
+                    await response.aread()
+                    record("bytes_received", response.num_bytes_downloaded)
+                return response
+            delay = _retry_delay(response, attempt, self.bucket, self.on_throttled)
+            await response.aclose()
+            await asyncio.sleep(_record_retry(delay))
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def get_client(token, base_url=None, notion_version=None):
+    """
+    토큰별로 재사용되는 notion_client.Client (keep-alive 연결 풀 + 공유 토큰 버킷 + 재시도)
+    Args:
+        token (str): Notion API 토큰
+        base_url (str, optional): API 루트 URL (기본값: https://api.notion.com)
+        notion_version (str, optional): Notion-Version 헤더 값
+    """
+    base_url = base_url or NOTION_API_URL
+    notion_version = notion_version or NOTION_VERSION
+    key = (token_key(token), base_url, notion_version)
+    with _registry_lock:
+        client = _clients.get(key)
+    if client is None:
+        http_client = httpx.Client(transport=RateLimitedTransport(get_bucket(token)))
+        client = Client(auth=token, client=http_client, base_url=base_url, notion_version=notion_version)
+        with _registry_lock:
+            client = _clients.setdefault(key, client)
+    return client
+
+
+def async_notion_client(token, base_url=None, notion_version=None):
+    """
+    비동기 읽기용 notion_client.AsyncClient (get_client와 같은 토큰 버킷·재시도 사용)
+    이벤트 루프마다 새로 만들고 aclose()로 닫음
+    (async with는 내부 httpx 클라이언트를 기본 클라이언트로 바꾸므로 쓰지 않음)
+    """
+    http_client = httpx.AsyncClient(transport=AsyncRateLimitedTransport(get_bucket(token)))
+    return AsyncClient(
+        auth=token, client=http_client, base_url=base_url or NOTION_API_URL, notion_version=notion_version or NOTION_VERSION,
+    )
+
+
+def async_client(token, base_url=None, notion_version=None, max_attempts=DEFAULT_MAX_ATTEMPTS, on_throttled=None,
+                 timeout=60):
+    """
+    쓰기 엔진용 httpx.AsyncClient (get_client와 같은 토큰 버킷 사용)
+    이벤트 루프마다 새로 만들어야 하므로 async with로 사용
+    """
+    return httpx.AsyncClient(
+        base_url=f"{(base_url or NOTION_API_URL).rstrip('/')}/",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Notion-Version": notion_version or NOTION_VERSION,
+        },
+        transport=AsyncRateLimitedTransport(get_bucket(token), max_attempts=max_attempts, on_throttled=on_throttled),
+        timeout=timeout,
+    )
+
+
+_oauth_client = None
+
+
+def exchange_oauth_code(client_id, client_secret, code, redirect_uri):
+    """
+    OAuth 인증 코드를 access token으로 교환 (공유 연결 풀 사용)
+    인증 코드는 한 번만 쓸 수 있으므로 재시도하지 않음 (처리된 요청을 다시 보내면 invalid_grant)
+    Returns:
+        httpx.Response: 토큰 엔드포인트 응답
+    """
+    global _oauth_client
+    with _registry_lock:
+        if _oauth_client is None:
+            _oauth_client = httpx.Client(limits=POOL_LIMITS, timeout=30)
+    return _oauth_client.post(
+        f"{NOTION_API_URL}/v1/oauth/token",
+        auth=(client_id, client_secret),
+        json={"grant_type": "authorization_code", "code": code, "redirect_uri": redirect_uri},
+    )
@@ -0,0 +1,366 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from notion_transport import (
+    DEFAULT_MAX_ATTEMPTS, NOTION_API_URL, NOTION_VERSION, RETRYABLE_STATUS, async_client, is_idempotent,
+    retryable_error, retryable_status,
+)
+from property_decoders import decode_property
+
+
+# MERGE에서 비교·기록하는 속성 타입 (나머지는 읽기 전용이거나 텍스트로 쓸 수 없는 타입)
+MERGE_PROPERTY_TYPES = ("title", "rich_text", "number", "date", "select", "multi_select", "checkbox")
+
+# 처리되었는지 알 수 없는 실패의 오류 메시지 앞부분
+# (페이지 생성처럼 재시도하지 않는 요청이 서버에 닿은 뒤 409/5xx를 받았거나 응답 없이 끊긴 경우)
+UNCERTAIN_ERROR = "처리 여부 알 수 없음"
+
+
+def is_uncertain(error):
+    """send_requests의 실패 메시지가 처리 여부를 알 수 없는 실패인지"""
+    return error.startswith(UNCERTAIN_ERROR)
+
+
+def run_async(coro):
+    """Streamlit 스크립트 스레드처럼 이벤트 루프가 없는 곳에서 코루틴 실행"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AdaptiveConcurrency:
+    """
+    동시 요청 수를 AIMD 방식으로 조절
+    성공이 이어지면 1씩 늘리고, 429를 받으면 절반으로 줄임
+    작업자는 maximum개만 만들고, 번호가 limit보다 작은 작업자만 요청을 보냄
+    """
+
+    def __init__(self, initial=3, minimum=1, maximum=10):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.successes = 0
+        self.closed = False
+        self._raised = asyncio.Event()
+
+    async def wait_active(self, worker):
+        """worker번째 작업자가 요청을 보낼 수 있을 때까지 대기 (대기자는 작업자 수만큼만 있음)"""
+        while worker >= self.limit and not self.closed:
+            await self._raised.wait()
+
+    def _wake(self):
+        raised, self._raised = self._raised, asyncio.Event()
+        raised.set()
+
+    def close(self):
+        """대기 중인 작업자를 모두 깨워 종료시킴 (더 보낼 요청이 없을 때)"""
+        self.closed = True
+        self._wake()
+
+    def on_success(self):
+        self.successes += 1
+        if self.successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self.successes = 0
+            self._wake()
+
+    def on_throttled(self):
+        self.limit = max(self.minimum, self.limit // 2)
+        self.successes = 0
+
+
+async def send_requests(token, requests, base_url=NOTION_API_URL, notion_version=NOTION_VERSION,
+                        max_attempts=DEFAULT_MAX_ATTEMPTS, progress=None, on_success=None):
+    """
+    Notion API 요청을 동시에 보내는 쓰기 엔진
+    요청 한도와 재시도는 notion_transport의 공유 토큰 버킷이 맡으므로, 같은 토큰의 읽기와 한도를 나눠 씀
+    요청은 큐에 넣고 고정된 수의 작업자가 꺼내 보냄 (요청마다 코루틴을 만들지 않음)
+    Args:
+        token (str): Notion API 토큰
+        requests (list): (key, method, path, body) 목록. path는 "v1/pages"처럼 base_url 이후 경로
+        base_url (str): API 루트 URL
+        notion_version (str): Notion-Version 헤더 값
+        max_attempts (int): 요청당 최대 시도 횟수
+        progress (callable, optional): progress(완료 수, 전체 수) 콜백
+        on_success (callable, optional): 요청이 성공할 때마다 on_success(key, 응답 JSON) 호출
+    Returns:
+        tuple: (성공 {key: 응답 JSON}, 실패 {key: 오류 메시지})
+            서버에서 처리되었을 수도 있는 실패는 메시지가 UNCERTAIN_ERROR로 시작 (is_uncertain 참고)
+    """
+    concurrency = AdaptiveConcurrency()
+    succeeded = {}
+    failed = {}
+    done = 0
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def send(client, key, method, path, body):
+        nonlocal done
+        try:
+            response = await client.request(method, path, json=body)
+            if response.status_code < 300:
+                concurrency.on_success()
+                succeeded[key] = response.json()
+                if on_success:
+                    on_success(key, succeeded[key])
+            else:
+                error = f"HTTP {response.status_code}: {response.text}"
+                if response.status_code in retryable_status(response.request):
+                    error = f"{max_attempts}회 재시도 후 실패 - {error}"
+                elif response.status_code in RETRYABLE_STATUS and not is_idempotent(response.request):
+                    error = f"{UNCERTAIN_ERROR} - {error}"
+                failed[key] = error
+        except httpx.TransportError as e:
+            error = f"{type(e).__name__}: {e}"
+            if retryable_error(e.request, e):
+                error = f"{max_attempts}회 재시도 후 실패 - {error}"
+            else:
+                error = f"{UNCERTAIN_ERROR} - {error}"
+            failed[key] = error
+
+        done += 1
+        if progress:
+            progress(done, len(requests))
+
+    async def worker(client, index):
+        while True:
+            await concurrency.wait_active(index)
+            try:
+                request = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                concurrency.close()
+                return
+            await send(client, *request)
+
+    async with async_client(token, base_url, notion_version, max_attempts=max_attempts,
+                            on_throttled=concurrency.on_throttled) as client:
+        await asyncio.gather(*(worker(client, index) for index in range(concurrency.maximum)))
+    return succeeded, failed
+
+
+def build_page_properties(row, columns, db_properties):
+    """DataFrame 한 행을 Notion 페이지 properties JSON으로 변환 (Name 제외)"""
+    properties = {}
+    for col in columns:
+        if col == "Name" or col not in db_properties:
+            continue
+
+        value = row[col]
+        if pd.api.types.is_scalar(value) and pd.isna(value):
+            value = None
+        prop_type = db_properties[col]["type"]
+
+        if prop_type in ("title", "rich_text"):
+            properties[col] = {prop_type: [{"text": {"content": str(value) if value is not None else ""}}]}
+        elif prop_type == "number":
+            try:
+                properties[col] = {"number": float(value) if value is not None and value != "" else None}
+            except (ValueError, TypeError):
+                properties[col] = {"number": None}
+        elif prop_type == "date":
+            if isinstance(value, pd.Timestamp) and value.tzinfo is None and value == value.normalize():
+                # 날짜만 있던 칼럼(시간대 없는 자정)은 날짜로 기록
+                properties[col] = {"date": {"start": value.date().isoformat()}}
+            elif isinstance(value, (pd.Timestamp, datetime)):
+                properties[col] = {"date": {"start": value.isoformat()}}
+            elif isinstance(value, str) and value:
+                # 문자열에서 날짜 파싱 시도
+                try:
+                    date_obj = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                    start = date_obj.date().isoformat() if len(value) == 10 else date_obj.isoformat()
+                    properties[col] = {"date": {"start": start}}
+                except ValueError:
+                    properties[col] = {"date": None}
+            else:
+                properties[col] = {"date": None}
+        elif prop_type == "select":
+            properties[col] = {"select": {"name": str(value)} if value else None}
+        elif prop_type == "multi_select":
+            # 다중 선택 (decode_property가 ", "로 이어 붙인 문자열을 쉼표로 분리)
+            if isinstance(value, str) and value:
+                properties[col] = {"multi_select": [{"name": option.strip()} for option in value.split(',')]}
+            else:
+                properties[col] = {"multi_select": []}
+        elif prop_type == "checkbox":
+            properties[col] = {"checkbox": bool(value) if value is not None else False}
+        else:
+            # 기타 타입은 텍스트로 변환
+            properties[col] = {"rich_text": [{"text": {"content": str(value) if value is not None else ""}}]}
+    return properties
+
+
+def build_row_name(row, columns, index, left_db_name=None):
+    """결과 페이지 제목: '<왼쪽 DB 이름> #<번호>: <첫 번째 열 값>'"""
+    name_value = ""
+    if len(columns) > 0:
+        first_col = columns[0]
+        # 왼쪽 테이블 값 우선 사용
+        if not first_col.endswith('_right') and not (pd.api.types.is_scalar(row[first_col]) and pd.isna(row[first_col])):
+            name_value = str(row[first_col])
+    return f"{left_db_name or 'Row'} #{index+1}: {name_value}"
+
+
+def build_create_requests(database_id, dataframe, db_properties, left_db_name=None):
+    """DataFrame 행마다 pages.create 요청 (key는 행 인덱스)"""
+    columns = list(dataframe.columns)
+    requests = []
+    for position, (idx, row) in enumerate(dataframe.iterrows()):
+        # 이어서 저장할 때도 번호가 바뀌지 않도록 정수 인덱스가 있으면 사용
+        number = idx if isinstance(idx, (int, np.integer)) else position
+        properties = {"Name": {"title": [{"text": {"content": build_row_name(row, columns, number, left_db_name)}}]}}
+        properties.update(build_page_properties(row, columns, db_properties))
+        requests.append((idx, "POST", "v1/pages", {"parent": {"database_id": database_id}, "properties": properties}))
+    return requests
+
+
+def build_update_requests(page_values, column):
+    """{페이지 ID: 숫자 값}마다 pages.update 요청 (key는 페이지 ID)"""
+    return [
+        (page_id, "PATCH", f"v1/pages/{page_id}", {"properties": {column: {"number": value}}})
+        for page_id, value in page_values.items()
+    ]
+
+
+# 날짜로 비교하는 MERGE 키 타입
+DATE_KEY_TYPES = ("date", "created_time", "last_edited_time")
+
+
+def _date_key(value):
+    """날짜 키를 UTC 기준 문자열로 (자정이면 날짜만, "2024-01-05"와 Timestamp("2024-01-05")가 같은 키)"""
+    timestamp = pd.Timestamp(value)
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+    if timestamp == timestamp.normalize():
+        return timestamp.date().isoformat()
+    return timestamp.isoformat()
+
+
+def merge_key(value, prop_type=None):
+    """MERGE 키 비교용 문자열 (값이 없으면 None, 정수인 실수는 정수로, 날짜는 _date_key 형식으로)"""
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    if isinstance(value, (pd.Timestamp, datetime)) or prop_type in DATE_KEY_TYPES:
+        try:
+            return _date_key(value)
+        except (ValueError, TypeError):
+            pass
+    return str(value).strip() or None
+
+
+def _payload_value(payload, prop_type):
+    """build_page_properties가 만든 속성 JSON을 decode_property와 같은 형식의 값으로"""
+    value = payload[prop_type]
+    if prop_type in ("title", "rich_text"):
+        return "".join(part["text"]["content"] for part in value) or None
+    if prop_type == "date":
+        return value["start"] if value else None
+    if prop_type == "select":
+        return value["name"] if value else None
+    if prop_type == "multi_select":
+        return ", ".join(option["name"] for option in value) or None
+    return value
+
+
+def _same_value(current, new, prop_type):
+    """현재 페이지 값과 새 값이 같은지 (날짜는 시각으로, 숫자는 오차 범위로 비교)"""
+    if current is None or new is None:
+        return current is None and new is None
+    if prop_type == "number":
+        return bool(np.isclose(float(current), float(new), rtol=1e-12, atol=1e-9))
+    if prop_type == "date":
+        # 날짜만 있는 값과 시각이 있는 값은 같은 날 자정이어도 다른 값
+        if (len(current) == 10) != (len(new) == 10):
+            return False
+        return pd.to_datetime(current, utc=True) == pd.to_datetime(new, utc=True)
+    return current == new
+
+
+def build_merge_requests(database_id, dataframe, key_column, current_pages, db_properties, archive_missing=True):
+    """
+    기존 데이터베이스와 새 결과를 키 칼럼으로 비교해 바뀐 행만 요청으로 만듦
+    Args:
+        database_id (str): MERGE 대상 데이터베이스 ID
+        dataframe (DataFrame): 새 결과
+        key_column (str): 행을 식별하는 칼럼 (결과와 대상 데이터베이스에 모두 있어야 함)
+        current_pages (list): 대상 데이터베이스의 현재 페이지
+        db_properties (dict): 대상 데이터베이스 스키마의 properties
+        archive_missing (bool): 새 결과에 없는 키의 페이지를 보관(archive)할지 여부
+    Returns:
+        tuple: (요청 목록, {"create", "update", "archive", "unchanged", "skipped"} 행 수)
+            skipped는 키가 없거나 중복인 결과 행과 키가 비어 있는 대상 페이지 수
+            요청 key는 ("create", 키) 또는 ("update"/"archive", 페이지 ID)
+    """
+    if key_column not in dataframe.columns or key_column not in db_properties:
+        raise ValueError(f"키 칼럼 '{key_column}'이(가) 결과와 대상 데이터베이스에 모두 있어야 합니다.")
+    columns = [
+        col for col in dataframe.columns
+        if col in db_properties and db_properties[col]["type"] in MERGE_PROPERTY_TYPES
+    ]
+    title_name = next((name for name, prop in db_properties.items() if prop["type"] == "title"), None)
+
+    # 같은 키의 페이지가 여러 개면 첫 페이지만 갱신하고 나머지는 중복으로 보관
+    # 키가 비어 있는 페이지는 결과의 어느 행과도 대응하지 않으므로 건드리지 않고 건너뜀
+    key_type = db_properties[key_column]["type"]
+    pages_by_key = {}
+    duplicates = []
+    summary = {"create": 0, "update": 0, "archive": 0, "unchanged": 0, "skipped": 0}
+    for page in current_pages:
+        properties = page["properties"]
+        key = merge_key(decode_property(properties[key_column]), key_type) if key_column in properties else None
+        if key is None:
+            summary["skipped"] += 1
+        elif key in pages_by_key:
+            duplicates.append(page)
+        else:
+            pages_by_key[key] = page
+
+    requests = []
+    seen = set()
+    for _, row in dataframe.iterrows():
+        key = merge_key(row[key_column], key_type)
+        # 키가 없거나 같은 키가 이미 나온 행은 어느 페이지인지 정할 수 없으므로 건너뜀
+        if key is None or key in seen:
+            summary["skipped"] += 1
+            continue
+        seen.add(key)
+        properties = build_page_properties(row, columns, db_properties)
+        if "Name" in columns and title_name == "Name":
+            value = row["Name"]
+            text = "" if pd.api.types.is_scalar(value) and pd.isna(value) else str(value)
+            properties["Name"] = {"title": [{"text": {"content": text}}]}
+
+        page = pages_by_key.get(key)
+        if page is None:
+            if title_name and title_name not in properties:
+                properties[title_name] = {"title": [{"text": {"content": key}}]}
+            requests.append((("create", key), "POST", "v1/pages",
+                             {"parent": {"database_id": database_id}, "properties": properties}))
+            summary["create"] += 1
+            continue
+
+        changed = {}
+        for name, payload in properties.items():
+            prop_type = db_properties[name]["type"]
+            current = decode_property(page["properties"][name]) if name in page["properties"] else None
+            if not _same_value(current, _payload_value(payload, prop_type), prop_type):
+                changed[name] = payload
+        if changed:
+            requests.append((("update", page["id"]), "PATCH", f"v1/pages/{page['id']}", {"properties": changed}))
+            summary["update"] += 1
+        else:
+            summary["unchanged"] += 1
+
+    if archive_missing:
+        stale = [page for key, page in pages_by_key.items() if key not in seen] + duplicates
+        for page in stale:
+            requests.append((("archive", page["id"]), "PATCH", f"v1/pages/{page['id']}", {"archived": True}))
+        summary["archive"] = len(stale)
+    return requests, summary
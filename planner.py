@@ -0,0 +1,181 @@
+import itertools
+
+from join import perform_join
+from tracing import traced
+
+
+# 이 수 이하의 테이블은 동적 계획법으로 최적 순서를 찾고, 그보다 많으면 탐욕법 사용
+DP_TABLE_LIMIT = 10
+
+
+def qualify(table, column):
+    """다중 테이블 결과의 칼럼 이름: '<테이블>.<칼럼>'"""
+    return f"{table}.{column}"
+
+
+def table_stats(df, key_columns, row_count=None):
+    """
+    조인 순서 계획에 쓰는 테이블 통계
+    Args:
+        df (DataFrame): 필터까지 적용한 테이블
+        key_columns (iterable): 조인 키로 쓰이는 칼럼
+        row_count (int, optional): 캐시에 저장된 행 수 등 외부에서 알고 있는 행 수
+    Returns:
+        dict: {"rows": 행 수, "ndv": {칼럼: 고유 값 수}}
+    """
+    rows = len(df) if row_count is None else row_count
+    ndv = {column: max(int(df[column].nunique(dropna=True)), 1) for column in set(key_columns) if column in df.columns}
+    return {"rows": rows, "ndv": ndv}
+
+
+def _key_columns(conditions, table):
+    columns = []
+    for left_table, left_col, right_table, right_col in conditions:
+        if left_table == table:
+            columns.append(left_col)
+        if right_table == table:
+            columns.append(right_col)
+    return columns
+
+
+def _connecting(conditions, joined, table):
+    """이미 조인된 테이블 집합과 새 테이블을 잇는 조건 ((joined 쪽 테이블, 칼럼), (새 테이블 칼럼))"""
+    edges = []
+    for left_table, left_col, right_table, right_col in conditions:
+        if left_table in joined and right_table == table:
+            edges.append(((left_table, left_col), right_col))
+        elif right_table in joined and left_table == table:
+            edges.append(((right_table, right_col), left_col))
+    return edges
+
+
+def _estimate_step(rows, ndv, table, table_stat, edges):
+    """
+    중간 결과(rows, ndv)에 table을 붙였을 때의 행 수와 칼럼별 고유 값 수 추정
+    등호 조건 하나당 선택도 1 / max(ndv 왼쪽, ndv 오른쪽)을 곱함 (조건 간 독립 가정)
+    """
+    estimate = float(rows) * table_stat["rows"]
+    for (joined_table, joined_col), col in edges:
+        left_ndv = ndv.get((joined_table, joined_col), 1)
+        right_ndv = table_stat["ndv"].get(col, 1)
+        estimate /= max(left_ndv, right_ndv, 1)
+    new_ndv = {key: min(value, max(estimate, 1)) for key, value in ndv.items()}
+    for col, value in table_stat["ndv"].items():
+        new_ndv[(table, col)] = min(value, max(estimate, 1))
+    # 조인 키는 양쪽 중 작은 고유 값 수만 남음
+    for (joined_table, joined_col), col in edges:
+        shared = min(new_ndv.get((joined_table, joined_col), 1), new_ndv.get((table, col), 1))
+        new_ndv[(joined_table, joined_col)] = new_ndv[(table, col)] = shared
+    return estimate, new_ndv
+
+
+def _initial(table, stats):
+    return float(stats[table]["rows"]), {(table, col): value for col, value in stats[table]["ndv"].items()}
+
+
+def _plan_dp(tables, stats, conditions):
+    """
+    left-deep 조인 순서를 부분집합 동적 계획법으로 탐색 (비용 = 중간 결과 행 수의 합)
+    조건 없이 붙는 교차곱은 연결된 순서가 없을 때만 허용
+    """
+    # best[부분집합] = (비용, 행 수, ndv, 순서)
+    best = {}
+    for table in tables:
+        rows, ndv = _initial(table, stats)
+        best[frozenset([table])] = (0.0, rows, ndv, [table])
+
+    for size in range(2, len(tables) + 1):
+        for subset in itertools.combinations(tables, size):
+            subset = frozenset(subset)
+            candidates = []
+            for table in subset:
+                rest = subset - {table}
+                if rest not in best:
+                    continue
+                cost, rows, ndv, order = best[rest]
+                edges = _connecting(conditions, rest, table)
+                estimate, new_ndv = _estimate_step(rows, ndv, table, stats[table], edges)
+                candidates.append((not edges, cost + estimate, estimate, new_ndv, order + [table]))
+            if candidates:
+                _, cost, rows, ndv, order = min(candidates, key=lambda c: (c[0], c[1]))
+                best[subset] = (cost, rows, ndv, order)
+    return best[frozenset(tables)][3]
+
+
+def _plan_greedy(tables, stats, conditions):
+    """가장 작은 결과를 만드는 테이블을 하나씩 붙이는 탐욕법"""
+    start = min(tables, key=lambda t: stats[t]["rows"])
+    order = [start]
+    rows, ndv = _initial(start, stats)
+    remaining = [t for t in tables if t != start]
+    while remaining:
+        scored = []
+        for table in remaining:
+            edges = _connecting(conditions, set(order), table)
+            estimate, new_ndv = _estimate_step(rows, ndv, table, stats[table], edges)
+            scored.append((not edges, estimate, table, new_ndv))
+        _, rows, table, ndv = min(scored, key=lambda s: (s[0], s[1]))
+        order.append(table)
+        remaining.remove(table)
+    return order
+
+
+def plan_join_order(stats, conditions, order=None):
+    """
+    N개 테이블의 조인 순서 결정
+    Args:
+        stats (dict): {테이블 이름: table_stats 결과}
+        conditions (list): (테이블1, 칼럼1, 테이블2, 칼럼2) 등호 조건 목록
+        order (list, optional): 지정하면 순서를 바꾸지 않고 추정치만 계산
+    Returns:
+        dict: {"order": 테이블 순서, "steps": 단계별 조건과 추정 행 수, "estimated_cost": 중간 결과 행 수 합}
+    """
+    tables = list(stats)
+    if order is None:
+        if len(tables) <= DP_TABLE_LIMIT:
+            order = _plan_dp(tables, stats, conditions)
+        else:
+            order = _plan_greedy(tables, stats, conditions)
+
+    rows, ndv = _initial(order[0], stats)
+    steps = [{"table": order[0], "conditions": [], "estimated_rows": int(rows)}]
+    cost = 0.0
+    for position, table in enumerate(order[1:], start=1):
+        edges = _connecting(conditions, set(order[:position]), table)
+        rows, ndv = _estimate_step(rows, ndv, table, stats[table], edges)
+        cost += rows
+        steps.append({
+            "table": table,
+            "conditions": [(qualify(*joined), qualify(table, col)) for joined, col in edges],
+            "estimated_rows": int(round(rows)),
+        })
+    return {"order": list(order), "steps": steps, "estimated_cost": int(round(cost))}
+
+
+@traced(rows=lambda result: len(result[0]))
+def execute_join_plan(frames, conditions, plan=None):
+    """
+    계획한 순서대로 inner join 수행
+    Args:
+        frames (dict): {테이블 이름: DataFrame}
+        conditions (list): (테이블1, 칼럼1, 테이블2, 칼럼2) 등호 조건 목록
+        plan (dict, optional): plan_join_order 결과. 없으면 frames로 통계를 계산해 계획
+    Returns:
+        tuple: (결과 DataFrame, 단계별 실제 행 수가 추가된 plan)
+    """
+    if plan is None:
+        stats = {name: table_stats(df, _key_columns(conditions, name)) for name, df in frames.items()}
+        plan = plan_join_order(stats, conditions)
+
+    first = plan["order"][0]
+    result = frames[first].rename(columns=lambda col: qualify(first, col))
+    plan["steps"][0]["actual_rows"] = len(result)
+    for step in plan["steps"][1:]:
+        table = step["table"]
+        right = frames[table].rename(columns=lambda col, table=table: qualify(table, col))
+        if step["conditions"]:
+            result = perform_join(result, right, step["conditions"], how="inner")
+        else:
+            result = result.merge(right, how="cross")
+        step["actual_rows"] = len(result)
+    return result, plan
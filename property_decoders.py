@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+
+# 속성이 아닌 페이지 자체의 ID를 담는 가상 칼럼 (relation 속성과 조인할 때 사용)
+PAGE_ID_COLUMN = "page_id"
+
+
+class _DateString(str):
+    """formula/rollup 안의 날짜 값을 일반 문자열과 구분하기 위한 표식"""
+
+
+def _plain_text(parts):
+    """rich_text 배열의 모든 조각을 이어 붙인 텍스트 (비어 있으면 None)"""
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0]["plain_text"]
+    return "".join([part["plain_text"] for part in parts])
+
+
+def _user_name(user):
+    return user.get("name") or user["id"]
+
+
+# --- 셀 디코더: 속성 객체 하나 → 파이썬 값 (값이 없으면 None) ---
+
+def _decode_title(prop):
+    return _plain_text(prop["title"])
+
+def _decode_rich_text(prop):
+    return _plain_text(prop["rich_text"])
+
+def _decode_number(prop):
+    return prop["number"]
+
+def _decode_select(prop):
+    return prop["select"]["name"] if prop["select"] else None
+
+def _decode_status(prop):
+    return prop["status"]["name"] if prop["status"] else None
+
+def _decode_multi_select(prop):
+    # 옵션 목록을 ", "로 이어 붙인 텍스트로 (list는 조인·그룹 키로 쓸 수 없음)
+    # Notion 옵션 이름에는 쉼표를 쓸 수 없으므로 notion_writer에서 쉼표로 나누면 원래 목록으로 복원됨
+    return ", ".join(option["name"] for option in prop["multi_select"]) or None
+
+def _decode_date(prop):
+    return prop["date"]["start"] if prop["date"] else None
+
+def _decode_checkbox(prop):
+    return prop["checkbox"]
+
+def _decode_relation(prop):
+    return ", ".join(item["id"] for item in prop["relation"]) or None
+
+def _decode_people(prop):
+    return ", ".join(_user_name(user) for user in prop["people"]) or None
+
+def _decode_files(prop):
+    return ", ".join(item["name"] for item in prop["files"]) or None
+
+def _decode_url(prop):
+    return prop["url"] or None
+
+def _decode_email(prop):
+    return prop["email"] or None
+
+def _decode_phone_number(prop):
+    return prop["phone_number"] or None
+
+def _decode_created_time(prop):
+    return prop["created_time"]
+
+def _decode_last_edited_time(prop):
+    return prop["last_edited_time"]
+
+def _decode_created_by(prop):
+    return _user_name(prop["created_by"]) if prop["created_by"] else None
+
+def _decode_last_edited_by(prop):
+    return _user_name(prop["last_edited_by"]) if prop["last_edited_by"] else None
+
+def _decode_unique_id(prop):
+    unique_id = prop["unique_id"]
+    if unique_id["number"] is None:
+        return None
+    return f"{unique_id['prefix']}-{unique_id['number']}" if unique_id.get("prefix") else unique_id["number"]
+
+def _decode_formula(prop):
+    formula = prop["formula"]
+    value = formula.get(formula["type"])
+    if formula["type"] == "date":
+        return _DateString(value["start"]) if value else None
+    return value
+
+def _decode_rollup(prop):
+    rollup = prop["rollup"]
+    typ = rollup["type"]
+    if typ == "number":
+        return rollup["number"]
+    if typ == "date":
+        return _DateString(rollup["date"]["start"]) if rollup["date"] else None
+    if typ == "array":
+        values = [decode_property(item) for item in rollup["array"]]
+        return ", ".join(str(value) for value in values if value is not None) or None
+    return None
+
+def _decode_unsupported(prop):
+    return None
+
+
+# --- 칼럼 생성 함수: 값 목록 → nullable dtype 배열 ---
+
+def _build_string(values):
+    return pd.array(values, dtype="string")
+
+def _build_category(values):
+    return pd.Categorical(values)
+
+def _build_boolean(values):
+    return pd.array(values, dtype="boolean")
+
+def _build_number(values):
+    """모든 값이 정수면 Int64, 아니면 Float64 (None은 결측값)"""
+    numbers = np.array(values, dtype=np.float64)
+    mask = np.isnan(numbers)
+    present = numbers[~mask]
+    if np.array_equal(present, np.trunc(present)) and np.abs(present).max(initial=0) < 2**53:
+        return pd.arrays.IntegerArray(np.where(mask, 0, numbers).astype(np.int64), mask)
+    return pd.arrays.FloatingArray(numbers, mask)
+
+def _build_datetime(values):
+    """날짜 문자열 목록을 datetime64[ns, UTC] 배열로 변환 (중복 값은 한 번만 파싱)"""
+    codes, uniques = pd.factorize(np.array(values, dtype=object))
+    parsed = pd.to_datetime(uniques, utc=True, format="ISO8601", errors="coerce").astype("datetime64[ns, UTC]").array
+    return parsed.take(codes, allow_fill=True)
+
+def _is_date_only(value):
+    """시각 없이 날짜만 있는 값인지 ("2024-05-01")"""
+    return len(value) == 10
+
+def _build_date(values):
+    """
+    date 속성 칼럼: 모든 값이 날짜만 있으면 시간대 없는 datetime64[ns] (자정), 아니면 datetime64[ns, UTC]
+    날짜만 있는 값을 UTC 자정 시각으로 바꾸지 않으므로 다시 기록할 때 날짜로 기록됨 (notion_writer 참고)
+    날짜와 시각이 섞인 칼럼에서는 날짜만 있는 값도 UTC 자정 시각이 됨
+    """
+    present = [value for value in values if value is not None]
+    if not present or not all(_is_date_only(value) for value in present):
+        return _build_datetime(values)
+    codes, uniques = pd.factorize(np.array(values, dtype=object))
+    parsed = pd.to_datetime(uniques, format="%Y-%m-%d", errors="coerce").astype("datetime64[ns]").array
+    return parsed.take(codes, allow_fill=True)
+
+def _build_inferred(values):
+    """formula/rollup/unique_id처럼 결과 타입이 속성 설정에 따라 달라지는 칼럼"""
+    present = [value for value in values if value is not None]
+    if not present:
+        return _build_string(values)
+    if all(isinstance(value, bool) for value in present):
+        return _build_boolean(values)
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return _build_number(values)
+    if all(isinstance(value, _DateString) for value in present):
+        return _build_date(values)
+    return _build_string([None if value is None else str(value) for value in values])
+
+
+# 속성 타입별 (셀 디코더, 칼럼 생성 함수)
+PROPERTY_DECODERS = {
+    "title": (_decode_title, _build_string),
+    "rich_text": (_decode_rich_text, _build_string),
+    "number": (_decode_number, _build_number),
+    "select": (_decode_select, _build_category),
+    "status": (_decode_status, _build_category),
+    "multi_select": (_decode_multi_select, _build_string),
+    "date": (_decode_date, _build_date),
+    "checkbox": (_decode_checkbox, _build_boolean),
+    "relation": (_decode_relation, _build_string),
+    "people": (_decode_people, _build_string),
+    "files": (_decode_files, _build_string),
+    "url": (_decode_url, _build_string),
+    "email": (_decode_email, _build_string),
+    "phone_number": (_decode_phone_number, _build_string),
+    "created_time": (_decode_created_time, _build_datetime),
+    "last_edited_time": (_decode_last_edited_time, _build_datetime),
+    "created_by": (_decode_created_by, _build_string),
+    "last_edited_by": (_decode_last_edited_by, _build_string),
+    "unique_id": (_decode_unique_id, _build_inferred),
+    "formula": (_decode_formula, _build_inferred),
+    "rollup": (_decode_rollup, _build_inferred),
+}
+UNSUPPORTED_DECODER = (_decode_unsupported, _build_string)
+
+
+def get_decoder(prop_type):
+    """속성 타입의 (셀 디코더, 칼럼 생성 함수) 반환"""
+    return PROPERTY_DECODERS.get(prop_type, UNSUPPORTED_DECODER)
+
+
+def decode_property(prop):
+    """속성 객체 하나를 파이썬 값으로 변환 (값이 없으면 None)"""
+    return get_decoder(prop["type"])[0](prop)
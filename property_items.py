@@ -0,0 +1,131 @@
+from urllib.parse import quote
+
+from notion_writer import run_async, send_requests
+from tracing import traced
+
+
+# Notion이 페이지 객체(조회 결과 포함)에 담아 주는 배열 속성의 최대 항목 수
+PROPERTY_ITEM_LIMIT = 25
+# 페이지 속성 조회 결과에서 배열 항목 하나가 결과 항목 하나가 되는 속성
+LIST_PROPERTY_TYPES = ("title", "rich_text", "people", "relation")
+# 페이지 속성 조회 한 번에 받을 수 있는 최대 항목 수
+PROPERTY_PAGE_SIZE = 100
+
+
+def is_truncated(prop):
+    """
+    조회 결과의 속성 값이 잘렸을 수 있는지
+    relation은 has_more로 알 수 있고, 그 밖의 배열 속성은 항목이 한도만큼 있으면 잘렸다고 봄
+    (complete_properties로 채운 속성은 has_more가 False)
+    """
+    if "has_more" in prop:
+        return bool(prop["has_more"])
+    kind = prop["type"]
+    if kind in LIST_PROPERTY_TYPES:
+        return len(prop[kind]) >= PROPERTY_ITEM_LIMIT
+    if kind == "rollup":
+        rollup = prop["rollup"]
+        return rollup["type"] == "array" and len(rollup["array"]) >= PROPERTY_ITEM_LIMIT
+    return False
+
+
+def find_truncated(pages, columns, db=None):
+    """
+    잘렸을 수 있는 (페이지, 칼럼) 목록 (columns에 있는 속성만 확인)
+    db(스키마)를 주면 relation이 잘린 페이지의 rollup도 포함 (숫자·날짜 rollup은 값만으로 알 수 없음)
+    """
+    rollup_relations = {}
+    for column in columns:
+        info = (db or {}).get("properties", {}).get(column, {})
+        if info.get("type") == "rollup":
+            rollup_relations[column] = info["rollup"].get("relation_property_name")
+
+    truncated = []
+    for page in pages:
+        properties = page["properties"]
+        for column in columns:
+            prop = properties.get(column)
+            if prop is None:
+                continue
+            relation = properties.get(rollup_relations.get(column))
+            if is_truncated(prop) or ("has_more" not in prop and relation is not None and is_truncated(relation)):
+                truncated.append((page, column))
+    return truncated
+
+
+def _as_property(item):
+    """rollup 배열의 속성 항목을 페이지 객체의 속성 모양으로 (배열 속성은 항목 하나짜리 배열)"""
+    kind = item["type"]
+    value = item[kind]
+    return {"type": kind, kind: [value] if kind in LIST_PROPERTY_TYPES else value}
+
+
+def merge_property_items(prop, responses):
+    """페이지 속성 조회 응답(페이지네이션 순서)으로 잘리지 않은 속성 객체를 다시 구성"""
+    kind = prop["type"]
+    if responses[0].get("object") == "property_item":
+        return {**prop, kind: responses[0][kind], "has_more": False}
+    items = [item for response in responses for item in response["results"]]
+    if kind in LIST_PROPERTY_TYPES:
+        return {**prop, kind: [item[kind] for item in items], "has_more": False}
+    # rollup은 마지막 응답의 property_item에 최종 값이 있음
+    rollup = dict(responses[-1].get("property_item", {}).get("rollup") or prop["rollup"])
+    if rollup.get("type") == "array":
+        rollup["array"] = [_as_property(item) for item in items]
+    return {**prop, "rollup": rollup, "has_more": False}
+
+
+async def fetch_property_items(notion, targets):
+    """
+    (페이지 ID, 속성 ID)마다 페이지 속성 조회의 모든 페이지를 가져옴
+    한 속성의 다음 페이지는 이전 응답의 커서가 필요하므로, 모든 속성의 같은 차례 요청을 한 번에 동시에 보냄
+    Returns:
+        tuple: ({(페이지 ID, 속성 ID): 응답 목록}, {(페이지 ID, 속성 ID): 오류 메시지})
+    """
+    responses = {target: [] for target in targets}
+    failed = {}
+    cursors = dict.fromkeys(targets)
+    while cursors:
+        requests = []
+        for (page_id, property_id), cursor in cursors.items():
+            path = f"v1/pages/{page_id}/properties/{property_id}?page_size={PROPERTY_PAGE_SIZE}"
+            if cursor:
+                path += f"&start_cursor={quote(cursor)}"
+            requests.append(((page_id, property_id), "GET", path, None))
+        succeeded, errors = await send_requests(
+            notion.options.auth, requests,
+            base_url=notion.options.base_url,
+            notion_version=notion.options.notion_version,
+        )
+        failed.update(errors)
+        cursors = {}
+        for key, response in succeeded.items():
+            responses[key].append(response)
+            if response.get("has_more"):
+                cursors[key] = response["next_cursor"]
+    return {key: value for key, value in responses.items() if key not in failed}, failed
+
+
+@traced(rows=lambda result: len(result[0]))
+def complete_properties(notion, pages, columns, db=None):
+    """
+    25개가 넘어 잘린 relation/rollup/rich_text/title/people 값을 페이지 속성 조회로 채움 (pages를 직접 수정)
+    columns에 있는 속성 중 잘린 것만 조회하므로 대부분의 페이지는 추가 요청이 없음
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        pages (list): 데이터베이스 조회 결과 페이지 목록
+        columns (list): 쿼리에 쓰는 칼럼
+        db (dict, optional): 데이터베이스 스키마 (rollup이 잘렸는지 relation으로 판단할 때 사용)
+    Returns:
+        tuple: (채운 (페이지 ID, 칼럼) 목록, 실패한 {(페이지 ID, 칼럼): 오류 메시지})
+    """
+    truncated = find_truncated(pages, columns, db)
+    if not truncated:
+        return [], {}
+    targets = {(page["id"], page["properties"][column]["id"]): (page, column) for page, column in truncated}
+    responses, failed = run_async(fetch_property_items(notion, list(targets)))
+    for key, page_responses in responses.items():
+        page, column = targets[key]
+        page["properties"][column] = merge_property_items(page["properties"][column], page_responses)
+    completed = [(targets[key][0]["id"], targets[key][1]) for key in responses]
+    return completed, {(targets[key][0]["id"], targets[key][1]): error for key, error in failed.items()}
@@ -1,8 +1,15 @@
 import streamlit as st
-from notion_client import Client
 from datetime import datetime
-import requests
-import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion_transport import exchange_oauth_code, get_client
+from notion_writer import build_update_requests, run_async, send_requests
+from sumifs import changed_values, compute_sumifs
+from sumifs_state import SumifsState, run_incremental_sumifs
 
 # OAuth 인증 처리
 CLIENT_ID = "1dcd872b-594c-80b7-9644-0037a0db3ca0"
@@ -21,20 +28,7 @@ if "access_token" not in st.session_state:
         st.stop()
 
     # access_token 요청
-    auth_token = base64.b64encode(f"{CLIENT_ID}:{CLIENT_SECRET}".encode()).decode()
-    
-    response = requests.post(
-        "https://api.notion.com/v1/oauth/token",
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {auth_token}"
-        },
-        json={
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": REDIRECT_URI
-        }
-    )
+    response = exchange_oauth_code(CLIENT_ID, CLIENT_SECRET, code, REDIRECT_URI)
 
     if response.status_code != 200:
         st.error("❌ 인증 토큰 요청 실패")
@@ -45,7 +39,7 @@ if "access_token" not in st.session_state:
     st.session_state.access_token = token_data["access_token"]
 
 # Notion 클라이언트 생성 (세션에서 토큰 사용)
-notion = Client(auth=st.session_state.access_token)
+notion = get_client(st.session_state.access_token)
 
 # Notion 유틸
 def format_database_id(raw_id: str) -> str:
@@ -142,6 +136,11 @@ with st.form("sumifs_form"):
 
     target_column = st.selectbox("📥 결과 입력 칼럼", target_cols)
     sum_range_column = st.selectbox("💰 합계 대상 칼럼 (Source)", src_cols)
+    aggregate = st.selectbox(
+        "🧮 집계 방식",
+        ["sum", "count", "average"],
+        format_func=lambda a: {"sum": "SUMIFS (합계)", "count": "COUNTIFS (개수)", "average": "AVERAGEIFS (평균)"}[a],
+    )
 
     st.markdown("### ✅ 조건 설정")
     dynamic_conditions = []
@@ -160,68 +159,68 @@ with st.form("sumifs_form"):
             "is_range": is_range
         })
 
+    col1, col2 = st.columns(2)
+    with col1:
+        incremental = st.checkbox(
+            "⚡ 증분 모드", value=True,
+            help="지난 실행 이후 수정된 Source/Target 페이지만 조회해 바뀐 합계만 갱신합니다. (하루에 한 번은 전체 재계산)",
+        )
+    with col2:
+        full_refresh = st.checkbox("🔄 전체 재계산", help="저장된 증분 상태를 무시하고 모든 페이지를 다시 계산합니다.")
+
     submitted = st.form_submit_button("🚀 SUMIFS 실행")
 
 if submitted:
-    target_rows = get_database_rows(target_database_id)
-    src_rows = get_database_rows(src_database_id)
-
-    src_data = []
-    for row in src_rows:
-        props = row["properties"]
-        row_dict = {}
-        for cond in dynamic_conditions:
-            row_dict[cond["src_col"]] = extract_text_value(props[cond["src_col"]]).strip()
-        row_dict["value"] = props[sum_range_column]["number"]
-        src_data.append(row_dict)
-
-    updated_count = 0
-    for row in target_rows:
-        props = row["properties"]
-        page_id = row["id"]
-
-        target_criteria = {
-            cond["tgt_col"]: extract_text_value(props[cond["tgt_col"]]).strip()
-            for cond in dynamic_conditions
-        }
-
-        matched_vals = []
-        for src_row in src_data:
-            is_match = True
-            for cond in dynamic_conditions:
-                src_val = src_row[cond["src_col"]]
-                tgt_val = target_criteria[cond["tgt_col"]]
-
-                if cond["is_range"]:
-                    try:
-                        src_date = datetime.fromisoformat(src_val)
-                        tgt_start, tgt_end = extract_date_range(props[cond["tgt_col"]])
-                        if not (tgt_start and tgt_end):
-                            is_match = False
-                            break
-                        start = datetime.fromisoformat(tgt_start)
-                        end = datetime.fromisoformat(tgt_end)
-                        if not (start <= src_date <= end):
-                            is_match = False
-                            break
-                    except:
-                        is_match = False
-                        break
-                else:
-                    if src_val != tgt_val:
-                        is_match = False
-                        break
-
-            if is_match:
-                matched_vals.append(src_row["value"])
-
-        total = sum(matched_vals)
-        #st.write(f"📌 조건: {target_criteria}, 합계: {total}")
-
-        notion.pages.update(
-            page_id=page_id,
-            properties={target_column: {"number": total}}
+    sumifs_state = None
+    if incremental:
+        # 저장된 기여분에 변경된 Source 페이지만 빼고 더해 영향을 받는 Target만 계산
+        sumifs_state = SumifsState()
+        state_id, updates, info = run_incremental_sumifs(
+            notion, src_database_id, target_database_id, dynamic_conditions, sum_range_column, aggregate,
+            target_column, state=sumifs_state, full=full_refresh,
         )
-        updated_count += 1
+        target_total = len(sumifs_state.load_targets(state_id))
+        st.info(
+            f"{'전체 계산' if info['mode'] == 'full' else '증분 계산'}: "
+            f"Source {info['source_changed']}개, Target {info['target_changed']}개 페이지 조회 → "
+            f"Target {info['affected']}개 재계산"
+        )
+    else:
+        target_rows = get_database_rows(target_database_id)
+        src_rows = get_database_rows(src_database_id)
+
+        # 조건 칼럼 해시 인덱스 + 날짜 정렬 배열로 Target 전체를 한 번에 계산
+        results = compute_sumifs(src_rows, target_rows, dynamic_conditions, sum_range_column, aggregate)
+
+        # 이미 조회한 Target 값과 비교해 바뀐 페이지만 비동기로 갱신
+        updates = changed_values(target_rows, results, target_column)
+        target_total = len(target_rows)
 
-    st.success(f"✅ {updated_count} rows updated successfully!")
\ No newline at end of file
+    if not updates:
+        st.success(f"✅ 변경된 값이 없습니다. ({target_total}개 행 모두 최신)")
+        st.stop()
+
+    progress_bar = st.progress(0.0, text=f"{len(updates)}개 행 갱신 중...")
+
+    def on_progress(done, total):
+        progress_bar.progress(done / total, text=f"행 갱신 중... ({done}/{total})")
+
+    start_time = time.time()
+    succeeded, failed = run_async(send_requests(
+        st.session_state.access_token,
+        build_update_requests(updates, target_column),
+        progress=on_progress,
+    ))
+    progress_bar.empty()
+    if sumifs_state is not None:
+        # 기록에 성공한 값만 상태에 반영 (실패한 페이지는 다음 실행에서 다시 기록)
+        sumifs_state.mark_written(state_id, {page_id: updates[page_id] for page_id in succeeded})
+
+    st.success(
+        f"✅ {len(succeeded)} rows updated successfully! "
+        f"(변경 없음 {target_total - len(updates)}개 건너뜀, 소요 시간: {time.time() - start_time:.2f}초)"
+    )
+    if failed:
+        st.warning(f"⚠️ {len(failed)}개 행 갱신 실패")
+        with st.expander("실패한 행 보기"):
+            st.dataframe([{"page_id": page_id, "error": error} for page_id, error in failed.items()])
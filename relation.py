@@ -0,0 +1,89 @@
+from explain import estimate_row_count, read_calls
+from notion_writer import run_async, send_requests
+from tracing import traced
+
+
+def _normalize_id(page_id):
+    return page_id.replace("-", "").lower()
+
+
+def relation_target(db, column):
+    """relation 속성이 가리키는 데이터베이스 ID (relation 속성이 아니면 None)"""
+    prop = db.get("properties", {}).get(column, {})
+    if prop.get("type") != "relation":
+        return None
+    return prop["relation"].get("database_id")
+
+
+def same_database(first_id, second_id):
+    """하이픈 유무와 상관없이 같은 Notion ID인지"""
+    return _normalize_id(first_id) == _normalize_id(second_id)
+
+
+def related_page_ids(pages, columns):
+    """페이지들의 relation 속성이 가리키는 페이지 ID (중복 제거, 처음 나온 순서 유지)"""
+    ids = {}
+    for page in pages:
+        properties = page["properties"]
+        for column in columns:
+            for item in properties[column]["relation"] if column in properties else ():
+                ids.setdefault(item["id"], None)
+    return list(ids)
+
+
+def retrieve_pages(notion, page_ids):
+    """
+    페이지를 ID로 동시에 조회 (쓰기 엔진과 같은 동시 요청·공유 요청 한도 사용)
+    보관된 페이지는 제외
+    Returns:
+        tuple: (페이지 목록, 조회하지 못한 {페이지 ID: 오류 메시지})
+    """
+    requests = [(page_id, "GET", f"v1/pages/{page_id}", None) for page_id in page_ids]
+    succeeded, failed = run_async(send_requests(
+        notion.options.auth, requests,
+        base_url=notion.options.base_url,
+        notion_version=notion.options.notion_version,
+    ))
+    pages = [succeeded[page_id] for page_id in page_ids
+             if page_id in succeeded and not succeeded[page_id].get("archived")]
+    return pages, failed
+
+
+@traced(rows=lambda result: len(result[0]) if result[0] is not None else 0)
+def load_related_pages(notion, pages, columns, database_id, filter=None, known_pages=()):
+    """
+    relation 속성을 따라 관계된 페이지만 가져옴 (이미 가져온 페이지는 다시 조회하지 않음)
+    관계된 페이지 수가 데이터베이스 전체를 조회하는 호출 수보다 적을 때만 ID로 개별 조회
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        pages (list): relation 속성이 있는 쪽 페이지 목록
+        columns (list): 따라갈 relation 칼럼
+        database_id (str): 관계된 페이지가 있는 데이터베이스 ID
+        filter (dict, optional): 그 데이터베이스의 Notion 필터 (행 수 추정에만 사용)
+        known_pages (iterable): 이미 가져온 그 데이터베이스의 페이지 (전체 속성 포함)
+    Returns:
+        tuple: (페이지 목록, 전략 "known"/"retrieve"/"query", 조회하지 못한 {페이지 ID: 오류 메시지})
+            "query"는 데이터베이스 조회 결과로, 첫 페이지에서 끝났으면 그 결과이고 아니면 None (호출한 쪽에서 전체 조회)
+            "known"/"retrieve"는 필터를 적용하지 않은 결과이므로 호출한 쪽에서 필터를 로컬로 적용
+    """
+    known = {page["id"]: page for page in known_pages}
+    page_ids = related_page_ids(pages, columns)
+    missing = [page_id for page_id in page_ids if page_id not in known]
+    if not missing:
+        return [known[page_id] for page_id in page_ids], "known", {}
+
+    estimate = estimate_row_count(notion, database_id, filter)
+    if estimate["source"] == "exact":
+        # 첫 페이지에 (필터를 통과한) 모든 행이 있음
+        return estimate["sample"], "query", {}
+    known.update((page["id"], page) for page in estimate["sample"])
+    missing = [page_id for page_id in missing if page_id not in known]
+    if len(missing) >= read_calls(estimate["rows"]):
+        return None, "query", {}
+
+    pages, failed = retrieve_pages(notion, missing)
+    known.update(
+        (page["id"], page) for page in pages
+        if same_database(page.get("parent", {}).get("database_id", ""), database_id)
+    )
+    return [known[page_id] for page_id in page_ids if page_id in known], "retrieve", failed
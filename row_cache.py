@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import time
+
+from notion_transport import token_key
+from property_items import complete_properties
+from utils import get_database_rows
+
+
+DEFAULT_CACHE_DIR = ".notion_cache"
+
+# 마지막 전체 동기화 이후 이 시간(초)이 지나면 삭제/보관된 페이지를 찾기 위해 전체 재조회
+DEFAULT_RECONCILE_INTERVAL = 60 * 60
+
+# 같은 프로세스(Streamlit 서버)에서 재실행할 때 JSON 디코딩을 건너뛰기 위한 메모리 사본
+# {(토큰 해시, 캐시 경로, database_id): {page_id: page}}
+_loaded_pages = {}
+
+
+def cache_path(token):
+    """토큰별 캐시 파일 경로 (다른 통합 토큰의 사용자와 페이지를 공유하지 않음)"""
+    return os.path.join(DEFAULT_CACHE_DIR, f"rows-{token_key(token)}.sqlite")
+
+
+class RowCache:
+    """데이터베이스 ID별로 Notion 페이지 원본과 스키마를 저장하는 SQLite 캐시 (통합 토큰별로 분리)"""
+
+    def __init__(self, token=None, path=None):
+        self.token_key = token_key(token)
+        self.path = path or cache_path(token)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS databases (
+                    database_id TEXT PRIMARY KEY,
+                    schema_json TEXT,
+                    schema_sync REAL,
+                    high_water TEXT,
+                    last_sync REAL,
+                    last_full_sync REAL
+                );
+                CREATE TABLE IF NOT EXISTS pages (
+                    database_id TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    last_edited_time TEXT NOT NULL,
+                    page_json TEXT NOT NULL,
+                    PRIMARY KEY (database_id, page_id)
+                );
+            """)
+            # schema_sync가 없던 이전 버전의 캐시 파일
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(databases)")]
+            if "schema_sync" not in columns:
+                conn.execute("ALTER TABLE databases ADD COLUMN schema_sync REAL")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_state(self, database_id):
+        """(high_water, last_sync, last_full_sync) 반환. 캐시가 없으면 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT high_water, last_sync, last_full_sync FROM databases WHERE database_id = ?",
+                (database_id,),
+            ).fetchone()
+        return row if row and row[2] is not None else None
+
+    def get_schema(self, database_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT schema_json FROM databases WHERE database_id = ?", (database_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def schema_due(self, database_id, reconcile_interval, now=None):
+        """
+        스키마를 다시 조회해야 하는지
+        저장된 스키마가 없거나, 행 전체 재조회 주기가 돌아온 뒤로 스키마를 조회하지 않았으면 True
+        """
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT schema_json, schema_sync, last_full_sync FROM databases WHERE database_id = ?", (database_id,)
+            ).fetchone()
+        if not row or not row[0]:
+            return True
+        schema_sync, last_full_sync = row[1] or 0, row[2]
+        return last_full_sync is not None and now - last_full_sync >= reconcile_interval \
+            and schema_sync < last_full_sync + reconcile_interval
+
+    def save_schema(self, database_id, db):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO databases (database_id, schema_json, schema_sync) VALUES (?, ?, ?) "
+                "ON CONFLICT(database_id) DO UPDATE SET schema_json = excluded.schema_json, "
+                "schema_sync = excluded.schema_sync",
+                (database_id, json.dumps(db, ensure_ascii=False), time.time()),
+            )
+
+    def load_pages(self, database_id):
+        key = (self.token_key, self.path, database_id)
+        if key not in _loaded_pages:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT page_id, page_json FROM pages WHERE database_id = ? ORDER BY rowid", (database_id,)
+                ).fetchall()
+            _loaded_pages[key] = {page_id: json.loads(page_json) for page_id, page_json in rows}
+        return list(_loaded_pages[key].values())
+
+    def count_pages(self, database_id):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM pages WHERE database_id = ?", (database_id,)).fetchone()[0]
+
+    def write_pages(self, database_id, pages, full=False):
+        """
+        페이지를 저장하고 high-water mark를 갱신
+        Args:
+            database_id (str): 데이터베이스 ID
+            pages (list): 조회한 페이지 객체 목록
+            full (bool): True면 기존 페이지를 모두 교체 (전체 동기화)
+        """
+        now = time.time()
+        live = [p for p in pages if not p.get("archived") and not p.get("in_trash")]
+        removed = [p["id"] for p in pages if p.get("archived") or p.get("in_trash")]
+        with self._connect() as conn:
+            if full:
+                conn.execute("DELETE FROM pages WHERE database_id = ?", (database_id,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO pages (database_id, page_id, last_edited_time, page_json) VALUES (?, ?, ?, ?)",
+                [(database_id, p["id"], p["last_edited_time"], json.dumps(p, ensure_ascii=False)) for p in live],
+            )
+            conn.executemany(
+                "DELETE FROM pages WHERE database_id = ? AND page_id = ?",
+                [(database_id, page_id) for page_id in removed],
+            )
+            high_water = conn.execute(
+                "SELECT MAX(last_edited_time) FROM pages WHERE database_id = ?", (database_id,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO databases (database_id, high_water, last_sync, last_full_sync) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(database_id) DO UPDATE SET high_water = excluded.high_water, last_sync = excluded.last_sync, "
+                "last_full_sync = COALESCE(excluded.last_full_sync, databases.last_full_sync)",
+                (database_id, high_water, now, now if full else None),
+            )
+
+        key = (self.token_key, self.path, database_id)
+        if full:
+            _loaded_pages[key] = {p["id"]: p for p in live}
+        elif key in _loaded_pages:
+            memory = _loaded_pages[key]
+            memory.update((p["id"], p) for p in live)
+            for page_id in removed:
+                memory.pop(page_id, None)
+
+    def invalidate(self, database_id=None):
+        """캐시 삭제 (database_id가 없으면 전체)"""
+        for key in [k for k in _loaded_pages if k[:2] == (self.token_key, self.path) and database_id in (None, k[2])]:
+            del _loaded_pages[key]
+        with self._connect() as conn:
+            if database_id is None:
+                conn.execute("DELETE FROM pages")
+                conn.execute("DELETE FROM databases")
+            else:
+                conn.execute("DELETE FROM pages WHERE database_id = ?", (database_id,))
+                conn.execute("DELETE FROM databases WHERE database_id = ?", (database_id,))
+
+
+def load_database_info_cached(notion, database_id, cache=None, refresh=False,
+                              reconcile_interval=DEFAULT_RECONCILE_INTERVAL):
+    """
+    load_database_info와 같은 결과를 반환하되 스키마는 캐시에서 재사용
+    행을 전체 재조회할 때가 되면 스키마도 다시 조회 (칼럼 추가·이름 변경 반영)
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        database_id (str): 데이터베이스 ID
+        cache (RowCache, optional): 사용할 캐시 (없으면 이 토큰의 캐시)
+        refresh (bool): True면 캐시를 무시하고 다시 조회
+        reconcile_interval (float): 행 전체 재조회 주기 (초)
+    Returns:
+        tuple: (database_obj, column_types_dict)
+    """
+    cache = cache or RowCache(notion.options.auth)
+    stale = refresh or cache.schema_due(database_id, reconcile_interval)
+    db = None if stale else cache.get_schema(database_id)
+    if db is None:
+        db = notion.databases.retrieve(database_id=database_id)
+        cache.save_schema(database_id, db)
+    columns_types = {name: info.get("type") for name, info in db.get("properties", {}).items()}
+    return db, columns_types
+
+
+def _fetch_complete_pages(notion, database_id, cache, columns=None, filter=None):
+    """
+    조회한 페이지에서 columns의 잘린 속성(25개 초과)을 채워서 반환 (columns가 없으면 모든 속성)
+    채우지 않은 속성은 잘린 채로 저장되며, 나중에 그 칼럼을 쓰는 쿼리에서 is_truncated로 다시 찾아 채움
+    """
+    pages = get_database_rows(notion, database_id, filter=filter)
+    if pages:
+        columns = list(pages[0]["properties"]) if columns is None else columns
+        complete_properties(notion, pages, columns, cache.get_schema(database_id))
+    return pages
+
+
+def get_database_rows_cached(notion, database_id, cache=None, columns=None,
+                             reconcile_interval=DEFAULT_RECONCILE_INTERVAL, max_staleness=0):
+    """
+    캐시된 페이지에 last_edited_time 이후 변경분만 병합해 데이터베이스 전체 row를 반환
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        database_id (str): 데이터베이스 ID
+        cache (RowCache, optional): 사용할 캐시 (없으면 이 토큰의 캐시)
+        columns (list, optional): 잘린 값을 채울 칼럼 (get_required_columns 참고). 없으면 모든 칼럼
+        reconcile_interval (float): 전체 재조회 주기 (초). 삭제·보관된 페이지는 이때 반영됨
+        max_staleness (float): 마지막 동기화 후 이 시간(초) 이내면 API 호출 없이 캐시 반환
+    Returns:
+        list: 페이지 객체 목록 (필터는 적용되지 않음)
+    """
+    cache = cache or RowCache(notion.options.auth)
+    state = cache.get_state(database_id)
+    now = time.time()
+
+    if state is None or now - state[2] >= reconcile_interval:
+        # 최초 로드 또는 주기적 전체 동기화 (스키마도 이 주기로 다시 조회)
+        load_database_info_cached(notion, database_id, cache, reconcile_interval=reconcile_interval)
+        cache.write_pages(database_id, _fetch_complete_pages(notion, database_id, cache, columns), full=True)
+    elif now - state[1] >= max_staleness:
+        high_water = state[0]
+        if high_water:
+            # last_edited_time은 분 단위로 기록되므로 같은 분의 페이지도 다시 가져옴
+            changed = _fetch_complete_pages(notion, database_id, cache, columns, filter={
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": high_water},
+            })
+        else:
+            changed = _fetch_complete_pages(notion, database_id, cache, columns)
+        cache.write_pages(database_id, changed)
+
+    return cache.load_pages(database_id)
@@ -0,0 +1,736 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from join import perform_join
+from notion_filter import NOTION_FILTER_OPERATORS, TIMESTAMP_TYPES, apply_local_filters, build_notion_filter
+from planner import execute_join_plan, plan_join_order, table_stats
+
+
+class SQLError(ValueError):
+    """SQL 구문 또는 의미 오류"""
+
+
+KEYWORDS = {
+    "SELECT", "FROM", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "ON", "WHERE", "AND", "OR",
+    "GROUP", "BY", "ORDER", "ASC", "DESC", "LIMIT", "AS", "IS", "NOT", "NULL", "LIKE", "IN",
+    "TRUE", "FALSE", "DISTINCT",
+}
+AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX"}
+
+# 집계 함수 → pandas 집계 이름
+_PANDAS_AGGREGATES = {"COUNT": "count", "SUM": "sum", "AVG": "mean", "MIN": "min", "MAX": "max"}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<op><=|>=|<>|!=|=|<|>)
+  | (?P<punct>[(),.*;-])
+  | (?P<word>[^\s'"`\[\](),.*;<>=!-]+)
+""", re.VERBOSE)
+
+
+def tokenize(sql):
+    """SQL 문자열을 (종류, 값, 위치) 토큰 목록으로 분리"""
+    tokens = []
+    position = 0
+    while position < len(sql):
+        match = _TOKEN_RE.match(sql, position)
+        if not match:
+            raise SQLError(f"{position}번째 문자를 해석할 수 없습니다: {sql[position:position + 10]!r}")
+        kind, text = match.lastgroup, match.group()
+        if kind == "string":
+            tokens.append(("string", text[1:-1].replace("''", "'"), position))
+        elif kind == "quoted":
+            tokens.append(("ident", text[1:-1].replace('""', '"'), position))
+        elif kind == "number":
+            tokens.append(("number", float(text) if "." in text else int(text), position))
+        elif kind == "word":
+            upper = text.upper()
+            if upper in KEYWORDS:
+                tokens.append(("keyword", upper, position))
+            else:
+                tokens.append(("ident", text, position))
+        elif kind != "space":
+            tokens.append((kind, text, position))
+        position = match.end()
+    tokens.append(("end", None, len(sql)))
+    return tokens
+
+
+class _Parser:
+    """SELECT ... FROM ... [JOIN ... ON ...] [WHERE ...] [GROUP BY ...] [ORDER BY ...] [LIMIT n] 파서"""
+
+    def __init__(self, sql):
+        self.tokens = tokenize(sql)
+        self.index = 0
+
+    def peek(self, offset=0):
+        return self.tokens[min(self.index + offset, len(self.tokens) - 1)]
+
+    def next(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def accept(self, kind, value=None):
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.index += 1
+            return token
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.accept(kind, value)
+        if token is None:
+            found = self.peek()
+            raise SQLError(f"{found[2]}번째 문자: {value or kind}이(가) 필요하지만 {found[1]!r}을(를) 찾았습니다")
+        return token
+
+    def identifier(self):
+        token = self.peek()
+        if token[0] == "ident":
+            self.index += 1
+            return token[1]
+        raise SQLError(f"{token[2]}번째 문자: 이름이 필요하지만 {token[1]!r}을(를) 찾았습니다")
+
+    def column_ref(self):
+        name = self.identifier()
+        if self.accept("punct", "."):
+            if self.accept("punct", "*"):
+                return {"table": name, "column": "*"}
+            return {"table": name, "column": self.identifier()}
+        return {"table": None, "column": name}
+
+    def alias(self):
+        if self.accept("keyword", "AS"):
+            return self.identifier()
+        if self.peek()[0] == "ident":
+            return self.next()[1]
+        return None
+
+    def literal(self):
+        negative = self.accept("punct", "-")
+        token = self.next()
+        if token[0] == "number":
+            return {"value": -token[1] if negative else token[1]}
+        if negative:
+            raise SQLError(f"{token[2]}번째 문자: '-' 뒤에는 숫자가 필요합니다")
+        if token[0] == "string":
+            return {"value": token[1]}
+        if token[0] == "keyword" and token[1] in ("TRUE", "FALSE"):
+            return {"value": token[1] == "TRUE"}
+        if token[0] == "keyword" and token[1] == "NULL":
+            return {"value": None}
+        raise SQLError(f"{token[2]}번째 문자: 값이 필요하지만 {token[1]!r}을(를) 찾았습니다")
+
+    def select_item(self):
+        if self.accept("punct", "*"):
+            return {"kind": "star", "table": None}
+        token = self.peek()
+        if token[0] == "ident" and token[1].upper() in AGGREGATES and self.peek(1)[:2] == ("punct", "("):
+            self.index += 2
+            distinct = bool(self.accept("keyword", "DISTINCT"))
+            if self.accept("punct", "*"):
+                ref = {"table": None, "column": "*"}
+            else:
+                ref = self.column_ref()
+            self.expect("punct", ")")
+            func = token[1].upper()
+            if ref["column"] == "*" and func != "COUNT":
+                raise SQLError(f"{func}(*)는 지원하지 않습니다")
+            return {"kind": "aggregate", "func": func, "distinct": distinct, **ref, "alias": self.alias()}
+        ref = self.column_ref()
+        if ref["column"] == "*":
+            return {"kind": "star", "table": ref["table"]}
+        return {"kind": "column", **ref, "alias": self.alias()}
+
+    def predicate(self):
+        left = self.column_ref()
+        if self.accept("keyword", "IS"):
+            negate = bool(self.accept("keyword", "NOT"))
+            self.expect("keyword", "NULL")
+            return {"left": left, "op": "is_not_null" if negate else "is_null", "right": None}
+        negate = bool(self.accept("keyword", "NOT"))
+        if self.accept("keyword", "LIKE"):
+            return {"left": left, "op": "not_like" if negate else "like", "right": self.literal()}
+        if self.accept("keyword", "IN"):
+            self.expect("punct", "(")
+            values = [self.literal()["value"]]
+            while self.accept("punct", ","):
+                values.append(self.literal()["value"])
+            self.expect("punct", ")")
+            return {"left": left, "op": "not_in" if negate else "in", "right": {"value": values}}
+        if negate:
+            raise SQLError(f"{self.peek()[2]}번째 문자: NOT 뒤에는 LIKE 또는 IN이 필요합니다")
+        op = self.expect("op")[1]
+        op = "!=" if op == "<>" else op
+        token = self.peek()
+        right = self.column_ref() if token[0] == "ident" else self.literal()
+        return {"left": left, "op": op, "right": right}
+
+    def conjunction(self):
+        predicates = [self.predicate()]
+        while self.accept("keyword", "AND"):
+            predicates.append(self.predicate())
+        if self.peek()[:2] == ("keyword", "OR"):
+            raise SQLError("OR 조건은 지원하지 않습니다 (AND만 사용 가능)")
+        return predicates
+
+    def table(self):
+        name = self.identifier()
+        return {"name": name, "alias": self.alias() or name}
+
+    def parse(self):
+        self.expect("keyword", "SELECT")
+        select = [self.select_item()]
+        while self.accept("punct", ","):
+            select.append(self.select_item())
+
+        self.expect("keyword", "FROM")
+        source = self.table()
+        joins = []
+        while True:
+            how = "inner"
+            if self.accept("keyword", "INNER"):
+                pass
+            elif self.accept("keyword", "LEFT"):
+                how = "left"
+            elif self.accept("keyword", "RIGHT"):
+                how = "right"
+            elif self.accept("keyword", "FULL"):
+                how = "full"
+            elif self.peek()[:2] != ("keyword", "JOIN"):
+                break
+            if how != "inner":
+                self.accept("keyword", "OUTER")
+            self.expect("keyword", "JOIN")
+            table = self.table()
+            self.expect("keyword", "ON")
+            joins.append({"how": how, **table, "on": self.conjunction()})
+
+        where = self.conjunction() if self.accept("keyword", "WHERE") else []
+
+        group_by = []
+        if self.accept("keyword", "GROUP"):
+            self.expect("keyword", "BY")
+            group_by.append(self.column_ref())
+            while self.accept("punct", ","):
+                group_by.append(self.column_ref())
+
+        order_by = []
+        if self.accept("keyword", "ORDER"):
+            self.expect("keyword", "BY")
+            while True:
+                ref = self.column_ref()
+                descending = bool(self.accept("keyword", "DESC"))
+                if not descending:
+                    self.accept("keyword", "ASC")
+                order_by.append((ref, not descending))
+                if not self.accept("punct", ","):
+                    break
+
+        limit = None
+        if self.accept("keyword", "LIMIT"):
+            token = self.expect("number")
+            if not isinstance(token[1], int):
+                raise SQLError("LIMIT에는 정수가 필요합니다")
+            limit = token[1]
+
+        self.accept("punct", ";")
+        token = self.peek()
+        if token[0] != "end":
+            raise SQLError(f"{token[2]}번째 문자: 해석할 수 없는 부분이 남아 있습니다: {token[1]!r}")
+        return {"select": select, "from": source, "joins": joins, "where": where,
+                "group_by": group_by, "order_by": order_by, "limit": limit}
+
+
+def parse_sql(sql):
+    """
+    SQL 문을 쿼리 구조(dict)로 변환
+    지원 구문: SELECT 칼럼/집계 FROM 테이블 [INNER|LEFT|RIGHT|FULL] JOIN 테이블 ON 등호조건
+              WHERE 조건 AND ... GROUP BY ... ORDER BY ... LIMIT n
+    테이블 이름은 Notion 데이터베이스 제목이며, 공백이 있으면 "..." 또는 `...`로 감쌈
+    """
+    return _Parser(sql).parse()
+
+
+def query_tables(query):
+    """쿼리에 나오는 (별칭, 테이블 이름) 목록 (FROM, JOIN 순서)"""
+    return [(query["from"]["alias"], query["from"]["name"])] + [(j["alias"], j["name"]) for j in query["joins"]]
+
+
+def resolve_tables(query, databases):
+    """
+    테이블 이름을 Notion 데이터베이스 ID로 변환 (대소문자 무시)
+    Args:
+        query (dict): parse_sql 결과
+        databases (list): get_user_databases 결과 [(제목, ID)]
+    Returns:
+        dict: {별칭: 데이터베이스 ID}
+    """
+    by_name = {}
+    for title, db_id in databases:
+        by_name.setdefault(title.lower(), []).append(db_id)
+    resolved = {}
+    for alias, name in query_tables(query):
+        if alias in resolved:
+            raise SQLError(f"테이블 별칭이 중복되었습니다: {alias}")
+        matches = by_name.get(name.lower(), [])
+        if not matches:
+            raise SQLError(f"데이터베이스를 찾을 수 없습니다: {name}")
+        if len(matches) > 1:
+            raise SQLError(f"같은 이름의 데이터베이스가 여러 개 있습니다: {name}")
+        resolved[alias] = matches[0]
+    return resolved
+
+
+def _resolve_column(ref, schemas):
+    """칼럼 참조를 (별칭, 칼럼)으로 변환. 테이블을 생략하면 칼럼 이름으로 찾음"""
+    if ref["table"] is not None:
+        if ref["table"] not in schemas:
+            raise SQLError(f"알 수 없는 테이블: {ref['table']}")
+        if ref["column"] not in schemas[ref["table"]]:
+            raise SQLError(f"{ref['table']}에 {ref['column']} 칼럼이 없습니다")
+        return ref["table"], ref["column"]
+    owners = [alias for alias, columns_types in schemas.items() if ref["column"] in columns_types]
+    if not owners:
+        raise SQLError(f"알 수 없는 칼럼: {ref['column']}")
+    if len(owners) > 1:
+        raise SQLError(f"칼럼 이름이 모호합니다: {ref['column']} ({', '.join(owners)} 중 지정 필요)")
+    return owners[0], ref["column"]
+
+
+def _qualified(alias, column):
+    return f"{alias}.{column}"
+
+
+def _like_operator(pattern, negate):
+    """LIKE 패턴을 Notion 텍스트 연산자로 변환 (양 끝의 %만 허용)"""
+    if not isinstance(pattern, str) or "_" in pattern or "%" in pattern.strip("%"):
+        return None
+    if negate:
+        return "does_not_contain" if pattern.startswith("%") and pattern.endswith("%") and len(pattern) > 1 else None
+    if pattern.startswith("%") and pattern.endswith("%") and len(pattern) > 1:
+        return "contains"
+    if pattern.endswith("%"):
+        return "starts_with"
+    if pattern.startswith("%"):
+        return "ends_with"
+    return "equals"
+
+
+_COMPARISON_OPERATORS = {
+    "number": {"=": "equals", "!=": "does_not_equal", ">": "greater_than", "<": "less_than",
+               ">=": "greater_than_or_equal_to", "<=": "less_than_or_equal_to"},
+    "date": {"=": "equals", "<": "before", ">": "after", "<=": "on_or_before", ">=": "on_or_after"},
+    "text": {"=": "equals", "!=": "does_not_equal"},
+    "multi_select": {"=": "contains", "!=": "does_not_contain"},
+}
+
+
+def _to_condition(pred, column, column_type):
+    """
+    단일 테이블 조건을 필터 조건 dict({column, operator, value, type})로 변환
+    필터 조건으로 표현할 수 없으면 None (그 조건은 pandas로 직접 평가)
+    """
+    op = pred["op"]
+    value = pred["right"]["value"] if pred["right"] is not None else None
+    if op in ("is_null", "is_not_null"):
+        operator = "is_empty" if op == "is_null" else "is_not_empty"
+        if column_type in ("checkbox",) or column_type in TIMESTAMP_TYPES:
+            return None
+        return {"column": column, "operator": operator, "value": None, "type": column_type}
+    if value is None or op in ("in", "not_in"):
+        return None
+
+    if op in ("like", "not_like"):
+        if column_type not in ("title", "rich_text", "url", "email", "phone_number"):
+            return None
+        operator = _like_operator(value, op == "not_like")
+        if operator is None:
+            return None
+        return {"column": column, "operator": operator, "value": value.strip("%"), "type": column_type}
+
+    if column_type == "number":
+        operators = _COMPARISON_OPERATORS["number"]
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return None
+    elif column_type == "date" or column_type in TIMESTAMP_TYPES:
+        operators = _COMPARISON_OPERATORS["date"]
+        if not isinstance(value, str):
+            return None
+    elif column_type == "checkbox":
+        operators = {"=": "equals", "!=": "does_not_equal"}
+        if not isinstance(value, bool):
+            return None
+    elif column_type == "multi_select":
+        operators = _COMPARISON_OPERATORS["multi_select"]
+    elif column_type in NOTION_FILTER_OPERATORS:
+        operators = _COMPARISON_OPERATORS["text"]
+    else:
+        return None
+    if op not in operators:
+        return None
+    if column_type not in ("number", "checkbox"):
+        value = str(value)
+    return {"column": column, "operator": operators[op], "value": value, "type": column_type}
+
+
+def build_plan(query, schemas):
+    """
+    쿼리를 실행 계획으로 변환
+    - WHERE 조건 중 테이블 하나만 참조하는 조건은 그 테이블 조회 단계로 내림
+      (Notion 필터로 표현 가능하면 서버에서, 아니면 조인 전에 로컬에서 적용)
+    - 외부 조인에서 NULL로 채워지는 쪽의 조건은 조인 뒤에 적용
+    - 테이블마다 쿼리에 필요한 칼럼만 디코딩
+    Args:
+        query (dict): parse_sql 결과
+        schemas (dict): {별칭: {칼럼: 타입}}
+    Returns:
+        dict: 실행 계획
+    """
+    aliases = [alias for alias, _ in query_tables(query)]
+    names = dict(query_tables(query))
+    needed = {alias: set() for alias in aliases}
+
+    def resolve(ref):
+        alias, column = _resolve_column(ref, schemas)
+        needed[alias].add(column)
+        return alias, column
+
+    # 외부 조인에서 NULL로 채워질 수 있는 테이블
+    null_supplying = set()
+    joins = []
+    for position, join in enumerate(query["joins"], start=1):
+        if join["how"] in ("left", "full"):
+            null_supplying.add(join["alias"])
+        if join["how"] in ("right", "full"):
+            null_supplying.update(aliases[:position])
+        conditions = []
+        for pred in join["on"]:
+            if pred["op"] != "=" or "column" not in pred["right"]:
+                raise SQLError("ON 절에는 두 테이블 칼럼 간의 등호 조건만 사용할 수 있습니다")
+            left_alias, left_col = resolve(pred["left"])
+            right_alias, right_col = resolve(pred["right"])
+            if join["alias"] == left_alias:
+                left_alias, left_col, right_alias, right_col = right_alias, right_col, left_alias, left_col
+            if right_alias != join["alias"] or left_alias not in aliases[:position]:
+                raise SQLError(f"ON 조건은 {join['alias']}와 앞서 나온 테이블을 연결해야 합니다")
+            conditions.append((left_alias, left_col, right_alias, right_col))
+        joins.append({"alias": join["alias"], "how": join["how"], "conditions": conditions})
+
+    tables = {alias: {"name": names[alias], "conditions": [], "predicates": []} for alias in aliases}
+    post_predicates = []
+    for pred in query["where"]:
+        alias, column = resolve(pred["left"])
+        if pred["right"] is not None and "column" in pred["right"]:
+            right_alias, right_col = resolve(pred["right"])
+            post_predicates.append({**pred, "left": (alias, column), "right": (right_alias, right_col)})
+            continue
+        resolved = {**pred, "left": (alias, column)}
+        if alias in null_supplying:
+            post_predicates.append(resolved)
+            continue
+        condition = _to_condition(pred, column, schemas[alias][column])
+        if condition is not None:
+            tables[alias]["conditions"].append(condition)
+            if pred["op"] == "!=" and "is_not_empty" in NOTION_FILTER_OPERATORS.get(condition["type"], ()):
+                # SQL의 x != 'a'는 NULL을 제외하지만 Notion의 does_not_equal/does_not_contain은 빈 값도 포함
+                tables[alias]["conditions"].append(
+                    {"column": column, "operator": "is_not_empty", "value": None, "type": condition["type"]}
+                )
+        else:
+            tables[alias]["predicates"].append(resolved)
+
+    select = []
+    for item in query["select"]:
+        if item["kind"] == "star":
+            targets = aliases if item["table"] is None else [item["table"]]
+            for alias in targets:
+                if alias not in schemas:
+                    raise SQLError(f"알 수 없는 테이블: {alias}")
+                for column in schemas[alias]:
+                    needed[alias].add(column)
+                    select.append({"kind": "column", "source": (alias, column), "alias": None})
+        elif item["kind"] == "aggregate" and item["column"] == "*":
+            select.append({"kind": "aggregate", "func": "COUNT", "distinct": False, "source": None, "alias": item["alias"]})
+        else:
+            select.append({**{k: v for k, v in item.items() if k not in ("table", "column")},
+                           "source": resolve(item)})
+    group_by = [resolve(ref) for ref in query["group_by"]]
+
+    aggregated = group_by or any(item["kind"] == "aggregate" for item in select)
+    if aggregated:
+        for item in select:
+            if item["kind"] == "column" and item["source"] not in group_by:
+                raise SQLError(f"{_qualified(*item['source'])}는 GROUP BY에 없거나 집계 함수로 감싸야 합니다")
+
+    for alias in aliases:
+        table = tables[alias]
+        if not needed[alias]:
+            # 행 수만 필요해도 칼럼이 하나는 있어야 하므로 제목 칼럼을 사용
+            title = [column for column, typ in schemas[alias].items() if typ == "title"]
+            needed[alias].add(title[0] if title else next(iter(schemas[alias])))
+        # 스키마 순서 유지
+        table["columns"] = [column for column in schemas[alias] if column in needed[alias]]
+        table["notion_filter"], table["local_conditions"] = build_notion_filter(table["conditions"])
+
+    return {
+        "tables": tables,
+        "joins": joins,
+        "post_predicates": post_predicates,
+        "select": select,
+        "group_by": group_by,
+        "aggregated": bool(aggregated),
+        "order_by": query["order_by"],
+        "limit": query["limit"],
+        "schemas": schemas,
+    }
+
+
+def explain_plan(plan):
+    """실행 계획을 사람이 읽을 수 있는 단계 목록으로 정리"""
+    lines = []
+    for alias, table in plan["tables"].items():
+        scan = f"SCAN {table['name']}" + (f" AS {alias}" if alias != table["name"] else "")
+        scan += f" [칼럼 {len(table['columns'])}/{len(plan['schemas'][alias])}개: {', '.join(table['columns'])}]"
+        lines.append(scan)
+        if table["notion_filter"]:
+            lines.append(f"  └ Notion 필터: {table['notion_filter']}")
+        for condition in table["local_conditions"]:
+            lines.append(f"  └ 로컬 필터: {condition['column']} {condition['operator']} {condition['value']}")
+        for pred in table["predicates"]:
+            lines.append(f"  └ 로컬 조건: {_describe_predicate(pred)}")
+    for join in plan["joins"]:
+        on = " AND ".join(f"{_qualified(a, b)} = {_qualified(c, d)}" for a, b, c, d in join["conditions"])
+        lines.append(f"{join['how'].upper()} JOIN {join['alias']} ON {on}")
+    if plan["joins"] and all(join["how"] == "inner" for join in plan["joins"]):
+        lines.append("  └ 조인 순서는 행 수와 키 고유 값 수로 추정해 결정")
+    for pred in plan["post_predicates"]:
+        lines.append(f"FILTER {_describe_predicate(pred)}")
+    if plan["aggregated"]:
+        keys = ", ".join(_qualified(*key) for key in plan["group_by"]) or "(전체)"
+        lines.append(f"AGGREGATE BY {keys}")
+    if plan["order_by"]:
+        lines.append("ORDER BY " + ", ".join(
+            f"{ref['column'] if ref['table'] is None else _qualified(ref['table'], ref['column'])} {'ASC' if asc else 'DESC'}"
+            for ref, asc in plan["order_by"]))
+    if plan["limit"] is not None:
+        lines.append(f"LIMIT {plan['limit']}")
+    return lines
+
+
+def _describe_predicate(pred):
+    left = _qualified(*pred["left"])
+    if pred["right"] is None:
+        right = ""
+    elif isinstance(pred["right"], tuple):
+        right = _qualified(*pred["right"])
+    else:
+        right = repr(pred["right"]["value"])
+    return f"{left} {pred['op']} {right}".strip()
+
+
+def _like_regex(pattern):
+    parts = [".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern]
+    return "^" + "".join(parts) + "$"
+
+
+def _as_utc(values):
+    """시간대 없는 날짜 칼럼(날짜만 있는 date 속성)을 UTC 자정으로"""
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_dtype(values.dtype) \
+            and not isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_localize("UTC")
+    return values
+
+
+def _comparable(series, other):
+    """비교할 값의 타입에 맞게 칼럼 변환 (날짜 문자열 ↔ datetime, 날짜만 있는 칼럼은 UTC 자정으로)"""
+    series, other = _as_utc(series), _as_utc(other)
+    if isinstance(series.dtype, pd.DatetimeTZDtype) and isinstance(other, str):
+        timestamp = pd.Timestamp(other)
+        return series, timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(series.cat.categories.dtype), other
+    return series, other
+
+
+def _predicate_mask(df, pred):
+    """필터 조건 dict로 표현할 수 없는 조건을 pandas 마스크로 평가 (NULL과의 비교는 거짓)"""
+    series = df[_qualified(*pred["left"])]
+    op = pred["op"]
+    if op == "is_null":
+        return series.isna().to_numpy(dtype=bool)
+    if op == "is_not_null":
+        return series.notna().to_numpy(dtype=bool)
+    if isinstance(pred["right"], tuple):
+        other = df[_qualified(*pred["right"])]
+        if isinstance(other.dtype, pd.CategoricalDtype):
+            other = other.astype(other.cat.categories.dtype)
+    else:
+        other = pred["right"]["value"]
+    if op in ("in", "not_in"):
+        mask = series.astype(object).isin(other)
+        return (mask if op == "in" else ~mask & series.notna()).to_numpy(dtype=bool)
+    if op in ("like", "not_like"):
+        mask = series.astype("string").str.match(_like_regex(str(other)), case=True)
+        mask = mask if op == "like" else ~mask
+        return mask.fillna(False).to_numpy(dtype=bool)
+    series, other = _comparable(series, other)
+    comparisons = {
+        "=": lambda: series == other,
+        "!=": lambda: series != other,
+        "<": lambda: series < other,
+        ">": lambda: series > other,
+        "<=": lambda: series <= other,
+        ">=": lambda: series >= other,
+    }
+    try:
+        result = comparisons[op]()
+    except TypeError as e:
+        raise SQLError(f"비교할 수 없는 값입니다: {_describe_predicate(pred)} ({e})")
+    return pd.Series(result).fillna(False).to_numpy(dtype=bool)
+
+
+def _apply_predicates(df, predicates):
+    if not predicates or df.empty:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for pred in predicates:
+        mask &= _predicate_mask(df, pred)
+    return df[mask].reset_index(drop=True)
+
+
+def _output_names(select):
+    """SELECT 항목별 결과 칼럼 이름 (별칭 > 고유한 칼럼 이름 > '테이블.칼럼')"""
+    base = []
+    for item in select:
+        if item["alias"]:
+            base.append(item["alias"])
+        elif item["kind"] == "aggregate":
+            inner = "*" if item["source"] is None else item["source"][1]
+            base.append(f"{item['func']}({'DISTINCT ' if item['distinct'] else ''}{inner})")
+        else:
+            base.append(item["source"][1])
+    names = []
+    for item, name in zip(select, base):
+        if not item["alias"] and item["kind"] == "column" and base.count(name) > 1:
+            name = _qualified(*item["source"])
+        names.append(name)
+    return names
+
+
+def _distinct_aggregate(func):
+    """SUM/AVG/MIN/MAX(DISTINCT x): 중복을 제거한 값에 집계 함수 적용"""
+    def aggregate(series):
+        return getattr(series.drop_duplicates(), func)()
+    return aggregate
+
+
+def _aggregate(df, plan, names):
+    keys = [_qualified(*key) for key in plan["group_by"]]
+    specs = {}
+    for item, name in zip(plan["select"], names):
+        if item["kind"] != "aggregate":
+            continue
+        if item["source"] is None:
+            specs[name] = (None, "size")
+        else:
+            func = _PANDAS_AGGREGATES[item["func"]]
+            if item["distinct"]:
+                func = "nunique" if item["func"] == "COUNT" else _distinct_aggregate(func)
+            specs[name] = (_qualified(*item["source"]), func)
+
+    if not keys:
+        row = {}
+        for name, (column, func) in specs.items():
+            if func == "size":
+                row[name] = len(df)
+            else:
+                row[name] = func(df[column]) if callable(func) else getattr(df[column], func)()
+        return pd.DataFrame([row], columns=names)
+
+    grouped = df.groupby(keys, dropna=False, observed=True, sort=False)
+    if specs:
+        size_source = keys[0]
+        result = grouped.agg(**{
+            name: (size_source if column is None else column, func) for name, (column, func) in specs.items()
+        }).reset_index()
+    else:
+        result = grouped.size().reset_index()[keys]
+    key_names = {_qualified(*item["source"]): name for item, name in zip(plan["select"], names) if item["kind"] == "column"}
+    result = result.rename(columns=key_names)
+    return result[[name for name in names]]
+
+
+def _join(frames, plan):
+    """테이블을 계획대로 조인. 모두 inner join이면 추정 비용이 가장 작은 순서로 실행"""
+    aliases = list(plan["tables"])
+    qualified = {alias: frames[alias].rename(columns=lambda col, alias=alias: _qualified(alias, col)) for alias in aliases}
+    if not plan["joins"]:
+        return qualified[aliases[0]], None
+
+    if all(join["how"] == "inner" for join in plan["joins"]):
+        conditions = [condition for join in plan["joins"] for condition in join["conditions"]]
+        stats = {}
+        for alias in aliases:
+            keys = [c for a, c, _, _ in conditions if a == alias] + [c for _, _, a, c in conditions if a == alias]
+            stats[alias] = table_stats(frames[alias], keys)
+        order = plan_join_order(stats, conditions)
+        result, order = execute_join_plan(frames, conditions, order)
+        return result, order
+
+    result = qualified[aliases[0]]
+    for join in plan["joins"]:
+        conditions = [(_qualified(a, b), _qualified(c, d)) for a, b, c, d in join["conditions"]]
+        result = perform_join(result, qualified[join["alias"]], conditions, how=join["how"])
+    return result, None
+
+
+def execute_plan(plan, frames, server_filtered=True):
+    """
+    실행 계획을 디코딩된 테이블에 적용
+    Args:
+        plan (dict): build_plan 결과
+        frames (dict): {별칭: notion_to_dataframe 결과 (plan의 칼럼만 디코딩)}
+        server_filtered (bool): 테이블을 Notion 필터로 조회했으면 True, 캐시 등 전체 row면 False
+    Returns:
+        tuple: (결과 DataFrame, 조인 순서 계획 또는 None)
+    """
+    filtered = {}
+    for alias, table in plan["tables"].items():
+        df = apply_local_filters(frames[alias], table["local_conditions"] if server_filtered else table["conditions"])
+        filtered[alias] = _apply_predicates(
+            df.rename(columns=lambda col, alias=alias: _qualified(alias, col)), table["predicates"]
+        ).rename(columns=lambda col, alias=alias: col[len(alias) + 1:])
+
+    result, join_order = _join(filtered, plan)
+    result = _apply_predicates(result, plan["post_predicates"])
+
+    names = _output_names(plan["select"])
+    if plan["aggregated"]:
+        result = _aggregate(result, plan, names)
+    else:
+        result = result[[_qualified(*item["source"]) for item in plan["select"]]]
+        result.columns = names
+
+    if plan["order_by"]:
+        columns, ascending = [], []
+        for ref, asc in plan["order_by"]:
+            if ref["table"] is None and ref["column"] in result.columns:
+                columns.append(ref["column"])
+            else:
+                source = _resolve_column(ref, plan["schemas"])
+                matches = [name for item, name in zip(plan["select"], names) if item.get("source") == source]
+                if not matches:
+                    raise SQLError(f"ORDER BY 칼럼은 SELECT에 있어야 합니다: {ref['column']}")
+                columns.append(matches[0])
+            ascending.append(asc)
+        result = result.sort_values(columns, ascending=ascending, na_position="last", kind="stable")
+    if plan["limit"] is not None:
+        result = result.head(plan["limit"])
+    return result.reset_index(drop=True), join_order
@@ -1,10 +1,15 @@
+import json
 import streamlit as st
-from notion_client import Client
+import pandas as pd
 from datetime import datetime, timedelta
-from utils import format_database_id, get_user_databases, get_database_rows, get_database_columns, extract_text_value, load_database_info
-from main import main
-import requests
-import base64
+from utils import format_database_id, get_database_rows, get_database_columns, extract_text_value
+from main import main, main_explain, main_multi, main_sql
+from join import JOIN_LABELS, JOIN_TYPES
+from aggregate import AGGREGATE_FUNCTIONS, AGGREGATE_LABELS
+from property_decoders import PAGE_ID_COLUMN
+from notion_transport import NOTION_REQUESTS_PER_SECOND, exchange_oauth_code, get_client
+from notion_cache import METADATA_TTL, cached_database_info, cached_user_databases, cached_user_pages, invalidate_metadata
+from tracing import start_trace
 
 # OAuth 인증 처리
 CLIENT_ID = "1dfd872b-594c-8064-88b2-00370275a0d4"
@@ -22,20 +27,7 @@ if "access_token" not in st.session_state:
         st.stop()
 
     # access_token 요청
-    auth_token = base64.b64encode(f"{CLIENT_ID}:{CLIENT_SECRET}".encode()).decode()
-    
-    response = requests.post(
-        "https://api.notion.com/v1/oauth/token",
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {auth_token}"
-        },
-        json={
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": REDIRECT_URI
-        }
-    )
+    response = exchange_oauth_code(CLIENT_ID, CLIENT_SECRET, code, REDIRECT_URI)
 
     if response.status_code != 200:
         st.error("❌ 인증 토큰 요청 실패")
@@ -45,8 +37,15 @@ if "access_token" not in st.session_state:
     token_data = response.json()
     st.session_state.access_token = token_data["access_token"]
 
-# Notion 클라이언트 생성 (세션에서 토큰 사용)
-notion = Client(auth=st.session_state.access_token)
+# Notion 클라이언트 생성 (토큰별 연결 풀과 요청 한도를 재실행 간에도 공유)
+notion = get_client(st.session_state.access_token)
+
+
+def run_traced(name, func, **attributes):
+    """JOIN 실행의 단계별 시간·API 호출을 추적해 쿼리 프로필로 저장"""
+    with start_trace(name, **attributes) as trace:
+        func(notion)
+    st.session_state.query_profile = trace
 
 # 칼럼 타입에 따른 필터 옵션 정의
 def get_filter_options(column_type):
@@ -149,8 +148,17 @@ if "left_filter_count" not in st.session_state:
 if "right_filter_count" not in st.session_state:
     st.session_state.right_filter_count = 0
 
+if "aggregate_count" not in st.session_state:
+    st.session_state.aggregate_count = 1
+
+# 데이터베이스 목록·페이지 목록·스키마는 캐시해 두고 위젯을 바꿀 때마다 다시 조회하지 않음
+with st.sidebar:
+    if st.button("🔄 Notion 새로고침", help=f"데이터베이스·페이지 목록과 칼럼 정보를 다시 가져옵니다. "
+                                          f"(자동 갱신: {METADATA_TTL // 60}분)"):
+        invalidate_metadata(notion)
+
 # 데이터베이스 선택 섹션
-db_options = get_user_databases(notion)
+db_options = cached_user_databases(notion)
 if not db_options:
     st.warning("⚠️ 접근 가능한 데이터베이스가 없습니다.")
     st.stop()
@@ -173,8 +181,8 @@ with st.form("database_selection"):
             formatted_right_db_id = right_db_label[1]
             
             # 데이터베이스 정보 로드
-            left_db_info, left_columns_types = load_database_info(notion, formatted_left_db_id)
-            right_db_info, right_columns_types = load_database_info(notion, formatted_right_db_id)
+            left_db_info, left_columns_types = cached_database_info(notion, formatted_left_db_id)
+            right_db_info, right_columns_types = cached_database_info(notion, formatted_right_db_id)
             
             # 세션 상태에 저장 - 원본 ID를 다시 덮어쓰지 않도록 수정
             st.session_state.left_db_nm = left_db_label[0]
@@ -232,8 +240,8 @@ if st.session_state.db_selected:
     st.button("➕ 필터 추가", on_click=add_left_filter, key="add_left_filter")
     st.markdown("---")
 
-    # INNER JOIN section
-    st.markdown("# 🔗 INNER JOIN")
+    # JOIN section
+    st.markdown("# 🔗 JOIN")
     st.markdown(f"### {right_db_nm}")
 
     def add_right_filter():
@@ -255,59 +263,133 @@ if st.session_state.db_selected:
     st.markdown("## 🧩 ON")
     st.markdown(f"🔄 {left_db_nm}과 {right_db_nm} 사이의 키 칼럼")
 
+    # relation 속성은 반대쪽의 페이지 ID와 조인 (관계형 JOIN)
+    def join_column_label(column):
+        return "🔗 페이지 ID" if column == PAGE_ID_COLUMN else column
+
     join_conditions = []
     for i in range(st.session_state.join_condition_count):
         col1, col2, col3 = st.columns([4, 1, 4])
         with col1:
-            left_col = st.selectbox(f"{left_db_nm}", left_columns_types.keys(), key=f"join_left_{i}")
+            left_col = st.selectbox(f"{left_db_nm}", [*left_columns_types, PAGE_ID_COLUMN],
+                                    format_func=join_column_label, key=f"join_left_{i}")
         with col2:
             st.markdown("#### =")
         with col3:
-            right_col = st.selectbox(f"{right_db_nm}", right_columns_types.keys(), key=f"join_right_{i}")
+            right_col = st.selectbox(f"{right_db_nm}", [*right_columns_types, PAGE_ID_COLUMN],
+                                     format_func=join_column_label, key=f"join_right_{i}")
         join_conditions.append((left_col, right_col))
+        if left_columns_types.get(left_col) == "relation" and right_col != PAGE_ID_COLUMN:
+            st.caption(f"💡 '{left_col}'은 relation 속성입니다. 오른쪽에서 🔗 페이지 ID를 고르면 관계된 페이지끼리 "
+                       "ID로 조인하고, 관계된 페이지만 가져옵니다.")
 
     st.button("➕ JOIN 조건 추가", on_click=add_join_condition, key="add_join_condition")
+    st.selectbox("JOIN 종류", JOIN_TYPES, format_func=lambda how: JOIN_LABELS[how], key="join_type",
+                 help="SEMI/ANTI JOIN은 오른쪽에 매칭되는 행이 있는(없는) 왼쪽 행만 반환합니다.")
+    st.markdown("---")
+
+    # GROUP BY section
+    def add_aggregate():
+        st.session_state.aggregate_count += 1
+
+    st.markdown("## 📊 GROUP BY")
+    st.checkbox("조인 결과를 그룹별로 집계해서 저장", key="use_group_by",
+                help="상세 행 대신 그룹별 집계 행만 Notion에 저장하므로 저장 요청 수가 줄어듭니다.")
+    if st.session_state.use_group_by:
+        column_options = [("left", col) for col in left_columns_types] + [("right", col) for col in right_columns_types]
+        db_names = {"left": left_db_nm, "right": right_db_nm}
+
+        def format_column(option):
+            return "* (전체 행)" if option is None else f"{db_names[option[0]]}.{option[1]}"
+
+        group_by_columns = st.multiselect("그룹 키", column_options, format_func=format_column, key="group_by_select")
+        aggregates = []
+        for i in range(st.session_state.aggregate_count):
+            col1, col2 = st.columns([2, 4])
+            with col1:
+                func = st.selectbox(f"집계 {i+1}", AGGREGATE_FUNCTIONS, format_func=lambda f: AGGREGATE_LABELS[f],
+                                    key=f"aggregate_func_{i}")
+            with col2:
+                # COUNT만 '*'(전체 행 수) 선택 가능
+                options = ([None] if func == "count" else []) + column_options
+                source = st.selectbox(f"대상 칼럼 {i+1}", options, format_func=format_column, key=f"aggregate_column_{i}")
+            aggregates.append((source, func))
+        st.button("➕ 집계 추가", on_click=add_aggregate, key="add_aggregate")
+        st.session_state.group_by_columns = group_by_columns
+        st.session_state.aggregates = aggregates
     st.markdown("---")
 
     # JOIN 결과를 저장할 Notion 페이지 선택 section
     st.markdown("## 📋 결과 저장 설정")
 
-    # 사용자 페이지 목록 가져오기
-    user_pages = notion.search(filter={"property": "object", "value": "page"})["results"]
-    page_options = []
+    st.radio("저장 방식", ["create", "merge"], key="save_mode", horizontal=True,
+             format_func=lambda mode: {"create": "새 데이터베이스 생성", "merge": "기존 데이터베이스에 MERGE"}[mode],
+             help="MERGE는 키 칼럼으로 기존 행과 비교해 바뀐 행만 추가·수정·보관합니다.")
 
-    for i, page in enumerate(user_pages):
-        # 페이지 제목 추출 (title 속성이 있는 경우)
-        if "properties" in page and "title" in page["properties"] and page["properties"]["title"]["title"]:
-            page_title = page["properties"]["title"]["title"][0]["plain_text"]
-        else:
-            page_title = f"Untitled Page {i+1}"
-        
-        page_options.append((page_title, page["id"]))
-
-    # 페이지 선택 및 결과 DB 이름 입력
-    if page_options:
-        st.session_state.save_page = st.selectbox(
-            "결과를 저장할 Notion 페이지", 
-            options=page_options, 
-            format_func=lambda x: x[0],
-            key="save_page_select"
+    if st.session_state.save_mode == "create":
+        st.checkbox("중단된 저장을 이어가지 않고 처음부터 다시 저장", key="restart_export",
+                    help="같은 설정으로 중단된 저장 기록을 끝난 것으로 표시하고 새 데이터베이스를 만듭니다.")
+
+    if st.session_state.save_mode == "merge":
+        st.session_state.merge_db = st.selectbox(
+            "MERGE할 Notion 데이터베이스", db_options, format_func=lambda x: x[0], key="merge_db_select"
         )
-        
-        # 기본 이름 설정 - 현재 시간 포함
-        default_name = f"{left_db_nm}_{right_db_nm}_JOIN_{datetime.now().strftime('%Y%m%d')}"
-        st.session_state.save_db_name = st.text_input(
-            "저장할 데이터베이스 이름", 
-            value=default_name,
-            key="save_db_name_input"
+        merge_columns = list(cached_database_info(notion, st.session_state.merge_db[1])[1])
+        st.session_state.merge_key = st.selectbox(
+            "키 칼럼", merge_columns, key="merge_key_select",
+            help="결과와 대상 데이터베이스에 같은 이름으로 있어야 하며, 행마다 고유해야 합니다.",
         )
+        st.checkbox("결과에 없는 행 보관(삭제)", value=True, key="merge_archive")
     else:
-        st.warning("저장 가능한 Notion 페이지가 없습니다.")
+        # 사용자 페이지 목록 가져오기
+        page_options = cached_user_pages(notion)
+
+        # 페이지 선택 및 결과 DB 이름 입력
+        if page_options:
+            st.session_state.save_page = st.selectbox(
+                "결과를 저장할 Notion 페이지", 
+                options=page_options, 
+                format_func=lambda x: x[0],
+                key="save_page_select"
+            )
+        
+            # 기본 이름 설정 - 현재 시간 포함
+            default_name = f"{left_db_nm}_{right_db_nm}_JOIN_{datetime.now().strftime('%Y%m%d')}"
+            st.session_state.save_db_name = st.text_input(
+                "저장할 데이터베이스 이름", 
+                value=default_name,
+                key="save_db_name_input"
+            )
+        else:
+            st.warning("저장 가능한 Notion 페이지가 없습니다.")
 
     st.markdown("---")
 
+    # 대용량 DB 조회 옵션
+    st.checkbox("💾 로컬 캐시 사용 (변경된 행만 조회)", key="use_row_cache",
+                help="이전에 가져온 행을 로컬에 저장하고 마지막 수정 시각 이후 변경분만 가져옵니다.")
+    st.checkbox("⚡ 병렬 조회 (대용량 데이터베이스)", key="parallel_fetch",
+                help="created_time 구간별로 데이터베이스를 나누어 동시에 가져옵니다.")
+    st.checkbox("🌊 스트리밍 조인 (메모리 절약)", key="stream_join",
+                help="응답 페이지마다 바로 디코딩해 조인합니다. 작은 쪽만 메모리에 올리므로 매우 큰 데이터베이스도 조인할 수 있지만, "
+                     "양쪽을 순서대로 가져오므로 더 느릴 수 있습니다. 로컬 캐시를 사용하면 적용되지 않습니다.")
+    # 병렬 조회 여부와 관계없이 모든 조회·저장에 적용되므로 항상 표시
+    st.number_input("초당 최대 요청 수", min_value=1.0, max_value=10.0, value=NOTION_REQUESTS_PER_SECOND, step=0.5,
+                    key="requests_per_second", help="같은 Notion 토큰을 쓰는 조회와 저장이 이 한도를 함께 나눠 씁니다.")
+
     # Join
-    if st.button("🚀 INNER JOIN 실행", key="execute_join"):
+    execute_col, explain_col = st.columns([3, 1])
+    with explain_col:
+        explain_clicked = st.button("🧪 EXPLAIN", key="explain_join",
+                                    help="실행하지 않고 각 데이터베이스의 첫 페이지만 조회해 결과 행 수, "
+                                         "읽기·쓰기 API 호출 수, 예상 소요 시간을 보여줍니다.")
+    with execute_col:
+        execute_clicked = st.button(f"🚀 {JOIN_LABELS[st.session_state.join_type]} 실행", key="execute_join")
+    if explain_clicked:
+        st.session_state.left_filters = left_filters
+        st.session_state.right_filters = right_filters
+        main_explain(notion)
+    if execute_clicked:
         st.write("#### LEFT 필터:")
         for i, filter_condition in enumerate(left_filters):
             st.write(f"{i+1}. {filter_condition['column']} {filter_condition['operator']} {filter_condition['value']}")
@@ -324,4 +406,109 @@ if st.session_state.db_selected:
         st.session_state.left_filters = left_filters
         st.session_state.right_filters = right_filters
 
-        main(notion)
\ No newline at end of file
+        run_traced(JOIN_LABELS[st.session_state.join_type], main, left=left_db_nm, right=right_db_nm)
+# 다중 테이블 JOIN section (3개 이상의 데이터베이스를 체인으로 조인)
+st.markdown("---")
+with st.expander("🧭 다중 테이블 JOIN (3개 이상)"):
+    if "multi_join_condition_count" not in st.session_state:
+        st.session_state.multi_join_condition_count = 1
+
+    multi_db_labels = st.multiselect("📂 조인할 데이터베이스", db_options, format_func=lambda x: x[0], key="multi_db_select")
+    multi_names = [label[0] for label in multi_db_labels]
+    if len(set(multi_names)) < len(multi_names):
+        st.warning("이름이 같은 데이터베이스는 함께 선택할 수 없습니다.")
+    elif len(multi_db_labels) >= 2:
+        multi_columns_types = {db_id: cached_database_info(notion, db_id)[1] for _, db_id in multi_db_labels}
+        column_options = [
+            (name, column) for name, db_id in multi_db_labels for column in multi_columns_types[db_id].keys()
+        ]
+
+        def add_multi_join_condition():
+            st.session_state.multi_join_condition_count += 1
+
+        st.markdown("## 🧩 ON")
+        multi_join_conditions = []
+        for i in range(st.session_state.multi_join_condition_count):
+            col1, col2, col3 = st.columns([4, 1, 4])
+            with col1:
+                left = st.selectbox("칼럼", column_options, format_func=lambda x: f"{x[0]}.{x[1]}", key=f"multi_join_left_{i}")
+            with col2:
+                st.markdown("#### =")
+            with col3:
+                right = st.selectbox("칼럼", column_options, format_func=lambda x: f"{x[0]}.{x[1]}", key=f"multi_join_right_{i}")
+            if left[0] != right[0]:
+                multi_join_conditions.append((left[0], left[1], right[0], right[1]))
+
+        st.button("➕ JOIN 조건 추가", on_click=add_multi_join_condition, key="add_multi_join_condition")
+
+        # 테이블별 SELECT 칼럼과 WHERE 필터 (필터는 가능하면 Notion 필터로 서버에서 적용)
+        st.markdown("## 🔍 SELECT / WHERE")
+        multi_columns_selected = {}
+        multi_filters = {}
+        for index, (name, db_id) in enumerate(multi_db_labels):
+            columns_types = multi_columns_types[db_id]
+            st.markdown(f"### {name}")
+            multi_columns_selected[name] = st.multiselect(
+                f"{name} 칼럼", options=list(columns_types), default=list(columns_types), key=f"multi_columns_{index}",
+            )
+            count_key = f"multi_filter_count_{index}"
+            if count_key not in st.session_state:
+                st.session_state[count_key] = 0
+
+            def add_multi_filter(count_key=count_key):
+                st.session_state[count_key] += 1
+
+            multi_filters[name] = [
+                render_filter_condition(name, columns_types, i, f"multi_filter_{index}")
+                for i in range(st.session_state[count_key])
+            ]
+            st.button("➕ 필터 추가", on_click=add_multi_filter, key=f"add_multi_filter_{index}")
+
+        st.checkbox("결과를 새 Notion 데이터베이스로 저장", key="multi_save")
+        if st.session_state.multi_save:
+            page_options = cached_user_pages(notion)
+            if page_options:
+                st.selectbox("결과를 저장할 Notion 페이지", page_options, format_func=lambda x: x[0],
+                             key="multi_save_page")
+                st.text_input("저장할 데이터베이스 이름",
+                              value=f"{'_'.join(multi_names)}_JOIN_{datetime.now().strftime('%Y%m%d')}",
+                              key="multi_save_db_name")
+                st.checkbox("중단된 저장을 이어가지 않고 처음부터 다시 저장", key="multi_restart_export")
+            else:
+                st.warning("저장 가능한 Notion 페이지가 없습니다.")
+
+        st.checkbox("조인 순서 자동 최적화", value=True, key="optimize_join_order",
+                    help="행 수와 키의 고유 값 수로 중간 결과 크기를 추정해 가장 작은 순서로 조인합니다. 끄면 선택한 순서대로 조인합니다.")
+
+        if st.button("🚀 다중 테이블 JOIN 실행", key="execute_multi_join"):
+            st.session_state.multi_db_labels = multi_db_labels
+            st.session_state.multi_join_conditions = multi_join_conditions
+            st.session_state.multi_columns_selected = multi_columns_selected
+            st.session_state.multi_filters = multi_filters
+            run_traced("다중 테이블 JOIN", main_multi, tables=", ".join(multi_names))
+
+# SQL 쿼리 직접 편집 모드
+with st.expander("🧾 SQL 쿼리 모드"):
+    st.markdown("데이터베이스 제목을 테이블 이름으로 사용합니다. 공백이 있으면 `\"주문 목록\"`처럼 따옴표로 감싸세요.")
+    if "sql_query" not in st.session_state:
+        st.session_state.sql_query = "SELECT *\nFROM Orders o\nJOIN Products p ON o.Product = p.Name\nWHERE o.Qty >= 10"
+    st.text_area("SQL", height=180, key="sql_query")
+    if st.button("🚀 쿼리 실행", key="execute_sql"):
+        run_traced("SQL 쿼리", main_sql)
+
+# 쿼리 프로필: 마지막 실행의 단계별 시간, API 호출 수, 받은 바이트, 429·재시도 대기
+if st.session_state.get("query_profile") is not None:
+    trace = st.session_state.query_profile
+    with st.expander(f"⏱️ 쿼리 프로필 ({trace.root.name}, {trace.root.seconds:.2f}초)"):
+        st.dataframe(pd.DataFrame(trace.rows()), hide_index=True)
+        st.caption("상위 단계의 값은 하위 단계를 포함합니다. 대기 시간(rate_limit_wait_seconds: 요청 한도, "
+                   "retry_wait_seconds: 429·오류 후 재시도)은 동시 요청마다 합산하므로 실행 시간보다 클 수 있습니다.")
+        export_json, export_otlp = st.columns(2)
+        export_json.download_button(
+            "JSON 내보내기", json.dumps(trace.to_dict(), ensure_ascii=False, indent=2),
+            file_name=f"query_profile_{trace.trace_id[:8]}.json", mime="application/json",
+        )
+        export_otlp.download_button(
+            "OpenTelemetry(OTLP JSON) 내보내기", json.dumps(trace.to_otlp()),
+            file_name=f"query_profile_{trace.trace_id[:8]}.otlp.json", mime="application/json",
+        )
@@ -0,0 +1,267 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from property_decoders import decode_property
+
+
+AGGREGATIONS = ("sum", "count", "average")
+
+
+def criteria_value(prop):
+    """조건 비교용 값: 사람이 읽는 텍스트 (값이 없으면 빈 문자열, 앞뒤 공백 제거)"""
+    value = decode_property(prop) if prop else None
+    return "" if value is None else str(value).strip()
+
+
+def date_range(prop):
+    """날짜 속성의 (시작, 종료) 문자열. 종료일이 없으면 시작일과 같음"""
+    if not prop or prop.get("type") != "date" or not prop["date"]:
+        return None, None
+    start = prop["date"].get("start")
+    return start, prop["date"].get("end") or start
+
+
+def _to_seconds(values):
+    """ISO 날짜 문자열 목록을 UTC 기준 초 단위 정수 배열로 변환 (파싱 불가 값은 마스크)"""
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, format="ISO8601", errors="coerce")
+    valid = parsed.notna().to_numpy()
+    seconds = np.zeros(len(parsed), dtype=np.int64)
+    seconds[valid] = parsed[valid].astype("datetime64[s, UTC]").astype(np.int64).to_numpy()
+    return seconds, valid
+
+
+def _key_index(columns):
+    """조건 칼럼 값 목록으로 해시 인덱스(pandas Index) 생성"""
+    if len(columns) == 1:
+        return pd.Index(columns[0], dtype=object)
+    return pd.MultiIndex.from_arrays(columns)
+
+
+class SumifsIndex:
+    """
+    SUMIFS/COUNTIFS/AVERAGEIFS용 Source 인덱스
+    - 등호 조건 값 조합별로 그룹을 나눈 해시 인덱스 (그룹 → 정렬 구간)
+    - 날짜 범위 조건은 그룹 안에서 날짜순으로 정렬한 배열과 누적합으로 이진 탐색
+    Target 한 행당 O(log N)으로 합계/개수를 계산
+    """
+
+    def __init__(self, keys, values, dates=None):
+        """
+        Args:
+            keys (list): 등호 조건 칼럼별 값 목록 (조건이 없으면 빈 목록)
+            values (list): 합계 대상 값 (None/NaN은 합계·평균에서 제외)
+            dates (list, optional): 날짜 범위 조건에 쓰는 Source 날짜 (ISO 문자열)
+        """
+        values = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        n = len(values)
+        if keys:
+            codes, self.uniques = pd.factorize(_key_index(keys))
+            codes = codes.astype(np.int64)
+        else:
+            codes, self.uniques = np.zeros(n, dtype=np.int64), None
+        valid = codes >= 0
+
+        self.has_dates = dates is not None
+        if self.has_dates:
+            seconds, has_date = _to_seconds(dates)
+            # 날짜가 없는 Source 행은 범위 조건에 절대 매칭되지 않음
+            valid &= has_date
+            codes, seconds, values = codes[valid], seconds[valid], values[valid]
+            # (그룹, 날짜)를 정수 하나로 합쳐 정렬하면 그룹 내 날짜 범위도 전체 배열에서 이진 탐색 가능
+            self.base = int(seconds.min(initial=0))
+            self.span = int(seconds.max(initial=0)) - self.base + 2
+            keys_sorted = codes * self.span + (seconds - self.base)
+        else:
+            codes, values = codes[valid], values[valid]
+            keys_sorted = codes
+        order = np.argsort(keys_sorted, kind="stable")
+        self.sorted_keys = keys_sorted[order]
+        sorted_values = values[order]
+        present = ~np.isnan(sorted_values)
+        self.value_sums = np.concatenate([[0.0], np.cumsum(np.where(present, sorted_values, 0.0))])
+        self.value_counts = np.concatenate([[0], np.cumsum(present)])
+
+    def _codes_for(self, keys, size):
+        if self.uniques is None:
+            return np.zeros(size, dtype=np.int64)
+        return np.asarray(self.uniques.get_indexer(_key_index(keys)), dtype=np.int64)
+
+    def lookup(self, keys, starts=None, ends=None, size=None):
+        """
+        Target 조건 값으로 매칭되는 Source 구간의 합계/개수 계산
+        Args:
+            keys (list): 등호 조건 칼럼별 Target 값 목록 (인덱스를 만든 순서와 같게)
+            starts, ends (list, optional): Target 날짜 범위 (양 끝 포함). 인덱스에 날짜가 있으면 필수
+            size (int, optional): Target 수 (조건이 하나도 없을 때 사용)
+        Returns:
+            dict: {"sum": 합계, "count": 매칭 행 수, "value_count": 값이 있는 행 수, "average": 평균} 배열
+        """
+        if size is None:
+            size = len(keys[0]) if keys else len(starts)
+        codes = self._codes_for(keys, size)
+        found = codes >= 0
+
+        if self.has_dates:
+            start_seconds, has_start = _to_seconds(starts)
+            end_seconds, has_end = _to_seconds(ends)
+            found &= has_start & has_end
+            # 범위를 Source 날짜 구간으로 잘라 다른 그룹으로 넘어가지 않게 함 (종료 오프셋 -1은 빈 범위)
+            start_offset = np.clip(start_seconds - self.base, 0, self.span - 1)
+            end_offset = np.clip(end_seconds - self.base, -1, self.span - 2)
+            lo = np.searchsorted(self.sorted_keys, codes * self.span + start_offset, side="left")
+            hi = np.searchsorted(self.sorted_keys, codes * self.span + end_offset, side="right")
+            hi = np.maximum(hi, lo)
+        else:
+            lo = np.searchsorted(self.sorted_keys, codes, side="left")
+            hi = np.searchsorted(self.sorted_keys, codes, side="right")
+
+        lo = np.where(found, lo, 0)
+        hi = np.where(found, hi, 0)
+        total = self.value_sums[hi] - self.value_sums[lo]
+        value_count = self.value_counts[hi] - self.value_counts[lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = np.where(value_count > 0, total / np.maximum(value_count, 1), np.nan)
+        return {"sum": total, "count": hi - lo, "value_count": value_count, "average": average}
+
+
+def _prop(row, column):
+    return row["properties"].get(column)
+
+
+def source_columns(src_rows, conditions, sum_column, aggregate="sum"):
+    """
+    Source 페이지에서 조건 값·날짜·합계 값만 추출
+    Returns:
+        dict: {"page_id", "keys": 등호 조건별 값 목록, "dates": 범위 조건별 날짜 목록, "values": 합계 대상 값}
+    """
+    equal_conditions = [c for c in conditions if not c["is_range"]]
+    range_conditions = [c for c in conditions if c["is_range"]]
+    values = []
+    for row in src_rows:
+        prop = _prop(row, sum_column)
+        values.append(decode_property(prop) if prop and aggregate != "count" else 0)
+    return {
+        "page_id": [row["id"] for row in src_rows],
+        "keys": [[criteria_value(_prop(row, c["src_col"])) for row in src_rows] for c in equal_conditions],
+        "dates": [[date_range(_prop(row, c["src_col"]))[0] for row in src_rows] for c in range_conditions],
+        "values": values,
+    }
+
+
+def target_columns(target_rows, conditions):
+    """
+    Target 페이지에서 조건 값과 날짜 범위만 추출
+    Returns:
+        dict: {"page_id", "keys": 등호 조건별 값 목록, "ranges": 범위 조건별 (시작, 종료) 목록}
+    """
+    equal_conditions = [c for c in conditions if not c["is_range"]]
+    range_conditions = [c for c in conditions if c["is_range"]]
+    return {
+        "page_id": [row["id"] for row in target_rows],
+        "keys": [[criteria_value(_prop(row, c["tgt_col"])) for row in target_rows] for c in equal_conditions],
+        "ranges": [[date_range(_prop(row, c["tgt_col"])) for row in target_rows] for c in range_conditions],
+    }
+
+
+def aggregate_columns(source, target):
+    """
+    source_columns/target_columns 결과로 Target별 합계·개수 계산
+    Returns:
+        dict: {"sum", "count", "value_count", "average"} 배열 (Target 순서)
+    """
+    if len(source["dates"]) > 1:
+        # 날짜 범위 조건이 여러 개면 등호 조건 그룹 안에서 모든 범위를 함께 확인
+        return _aggregate_extra_ranges(source, target)
+    index = SumifsIndex(source["keys"], source["values"], source["dates"][0] if source["dates"] else None)
+    if target["ranges"]:
+        ranges = target["ranges"][0]
+        return index.lookup(target["keys"], [r[0] for r in ranges], [r[1] for r in ranges])
+    return index.lookup(target["keys"], size=len(target["page_id"]))
+
+
+def compute_sumifs(src_rows, target_rows, conditions, sum_column, aggregate="sum"):
+    """
+    Notion 페이지 목록으로 SUMIFS/COUNTIFS/AVERAGEIFS 계산
+    Args:
+        src_rows (list): Source 데이터베이스 페이지 목록
+        target_rows (list): Target 데이터베이스 페이지 목록
+        conditions (list): {"src_col", "tgt_col", "is_range"} 조건 목록
+            is_range가 True면 Source 날짜가 Target 날짜 범위(시작~종료) 안에 있어야 함
+        sum_column (str): Source의 합계 대상 숫자 칼럼 (COUNTIFS에는 쓰이지 않음)
+        aggregate (str): "sum", "count" 또는 "average"
+    Returns:
+        DataFrame: page_id, value 칼럼 (AVERAGEIFS에서 매칭 값이 없으면 value는 NaN)
+    """
+    if aggregate not in AGGREGATIONS:
+        raise ValueError(f"지원하지 않는 집계 방식: {aggregate}")
+    result = aggregate_columns(
+        source_columns(src_rows, conditions, sum_column, aggregate), target_columns(target_rows, conditions)
+    )
+    return pd.DataFrame({"page_id": [row["id"] for row in target_rows], "value": result[aggregate]})
+
+
+def _aggregate_extra_ranges(source, target):
+    """날짜 범위 조건이 둘 이상일 때: 등호 조건 그룹 안에서 모든 범위를 벡터 마스크로 확인"""
+    groups = {}
+    for position, key in enumerate(zip(*source["keys"]) if source["keys"] else [()] * len(source["values"])):
+        groups.setdefault(key, []).append(position)
+    groups = {key: np.asarray(members) for key, members in groups.items()}
+    src_seconds = [_to_seconds(dates) for dates in source["dates"]]
+    numbers = pd.to_numeric(pd.Series(source["values"], dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+    size = len(target["page_id"])
+    target_keys = list(zip(*target["keys"])) if target["keys"] else [()] * size
+    total = np.zeros(size)
+    count = np.zeros(size, dtype=np.int64)
+    value_count = np.zeros(size, dtype=np.int64)
+    for i, key in enumerate(target_keys):
+        members = groups.get(key)
+        if members is None:
+            continue
+        mask = np.ones(len(members), dtype=bool)
+        for (seconds, has_date), ranges in zip(src_seconds, target["ranges"]):
+            bounds, ok = _to_seconds(list(ranges[i]))
+            if not ok.all():
+                mask[:] = False
+                break
+            mask &= has_date[members] & (seconds[members] >= bounds[0]) & (seconds[members] <= bounds[1])
+        matched = numbers[members[mask]]
+        present = ~np.isnan(matched)
+        total[i] = matched[present].sum()
+        count[i] = mask.sum()
+        value_count[i] = present.sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average = np.where(value_count > 0, total / np.maximum(value_count, 1), np.nan)
+    return {"sum": total, "count": count, "value_count": value_count, "average": average}
+
+
+def changed_values(target_rows, results, column):
+    """
+    계산 결과 중 Target 페이지에 이미 저장된 값과 다른 것만 추림 (쓰기 요청을 변경분으로 제한)
+    Args:
+        target_rows (list): 결과를 계산할 때 조회한 Target 페이지 목록 (현재 값 비교에 사용)
+        results (DataFrame): compute_sumifs 결과
+        column (str): 결과를 기록할 Target의 숫자 칼럼
+    Returns:
+        dict: {페이지 ID: 새 값} (NaN은 None으로 기록)
+    """
+    # 숫자 속성이 아니거나 없으면 현재 값을 알 수 없으므로 항상 기록
+    current = {}
+    for row in target_rows:
+        prop = row["properties"].get(column)
+        if prop and prop.get("type") == "number":
+            current[row["id"]] = prop.get("number")
+
+    changed = {}
+    for page_id, value in zip(results["page_id"], results["value"].tolist()):
+        value = None if math.isnan(value) else value
+        if page_id in current:
+            old = current[page_id]
+            if old is None and value is None:
+                continue
+            if old is not None and value is not None and math.isclose(old, value, rel_tol=1e-12, abs_tol=1e-9):
+                continue
+        changed[page_id] = value
+    return changed
@@ -0,0 +1,371 @@
+import json
+import math
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from sumifs import AGGREGATIONS, aggregate_columns, source_columns, target_columns
+from utils import get_database_rows
+from write_journal import make_run_id
+
+
+# row_cache와 같은 로컬 캐시 디렉터리 사용
+DEFAULT_STATE_PATH = os.path.join(".notion_cache", "sumifs.sqlite")
+
+# 쿼리 결과에 나타나지 않는 삭제·보관 페이지를 반영하기 위해 이 시간(초)마다 전체 재계산
+DEFAULT_RECONCILE_INTERVAL = 24 * 60 * 60
+
+
+def make_state_id(src_database_id, target_database_id, conditions, sum_column, aggregate, target_column):
+    """SUMIFS 설정(DB, 조건, 칼럼, 집계 방식)으로 결정되는 상태 ID. 설정이 바뀌면 새 상태로 시작"""
+    return make_run_id("sumifs", src_database_id, target_database_id, conditions, sum_column, aggregate, target_column)
+
+
+def _high_water(pages, previous=None):
+    times = [p["last_edited_time"] for p in pages if p.get("last_edited_time")]
+    if previous:
+        times.append(previous)
+    return max(times) if times else None
+
+
+def _is_live(page):
+    return not page.get("archived") and not page.get("in_trash")
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def current_value(row, column):
+    """Target 페이지에 저장된 현재 값을 JSON으로 (숫자 속성이 아니면 None: 알 수 없음)"""
+    prop = row["properties"].get(column)
+    if not prop or prop.get("type") != "number":
+        return None
+    return json.dumps(prop.get("number"))
+
+
+def aggregate_value(aggregate, total, count, value_count):
+    """저장된 합계·개수로 집계 값 계산 (평균을 낼 값이 없으면 None)"""
+    if aggregate == "sum":
+        return float(total)
+    if aggregate == "count":
+        return int(count)
+    return float(total) / value_count if value_count else None
+
+
+class SumifsState:
+    """
+    증분 SUMIFS 상태를 저장하는 SQLite 저장소
+    - contributions: Source 페이지별 조건 값·날짜·합계 값 (변경 전 기여분을 빼기 위해 보관)
+    - targets: Target 페이지별 조건 값과 합계·개수, 마지막으로 Notion에 기록된 값
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS states (
+                    state_id TEXT PRIMARY KEY,
+                    source_high_water TEXT,
+                    target_high_water TEXT,
+                    last_full_sync REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS contributions (
+                    state_id TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    keys_json TEXT NOT NULL,
+                    dates_json TEXT NOT NULL,
+                    value REAL,
+                    PRIMARY KEY (state_id, page_id)
+                );
+                CREATE TABLE IF NOT EXISTS targets (
+                    state_id TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    keys_json TEXT NOT NULL,
+                    ranges_json TEXT NOT NULL,
+                    total REAL NOT NULL,
+                    count INTEGER NOT NULL,
+                    value_count INTEGER NOT NULL,
+                    written_json TEXT,
+                    PRIMARY KEY (state_id, page_id)
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_state(self, state_id):
+        """(source_high_water, target_high_water, last_full_sync) 반환. 상태가 없으면 None"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT source_high_water, target_high_water, last_full_sync FROM states WHERE state_id = ?",
+                (state_id,),
+            ).fetchone()
+
+    def load_contributions(self, state_id, page_ids=None):
+        """저장된 Source 기여분 (page_id, keys, dates, value) 목록 (page_ids를 주면 해당 페이지만)"""
+        with self._connect() as conn:
+            if page_ids is None:
+                rows = conn.execute(
+                    "SELECT page_id, keys_json, dates_json, value FROM contributions WHERE state_id = ?", (state_id,)
+                ).fetchall()
+            else:
+                rows = []
+                page_ids = list(page_ids)
+                # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+                for start in range(0, len(page_ids), 500):
+                    chunk = page_ids[start:start + 500]
+                    rows += conn.execute(
+                        f"SELECT page_id, keys_json, dates_json, value FROM contributions "
+                        f"WHERE state_id = ? AND page_id IN ({','.join('?' * len(chunk))})",
+                        [state_id, *chunk],
+                    ).fetchall()
+        return [(page_id, json.loads(keys), json.loads(dates), value) for page_id, keys, dates, value in rows]
+
+    def load_targets(self, state_id):
+        """{page_id: (keys, ranges, total, count, value_count, written_json)}"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT page_id, keys_json, ranges_json, total, count, value_count, written_json "
+                "FROM targets WHERE state_id = ? ORDER BY rowid",
+                (state_id,),
+            ).fetchall()
+        return {
+            page_id: (json.loads(keys), [tuple(r) for r in json.loads(ranges)], total, count, value_count, written)
+            for page_id, keys, ranges, total, count, value_count, written in rows
+        }
+
+    def save(self, state_id, contributions, removed_sources, targets, removed_targets, source_high_water,
+             target_high_water, full=False):
+        """
+        변경된 기여분과 Target 집계를 한 트랜잭션으로 저장
+        Args:
+            contributions (list): (page_id, keys, dates, value) 목록
+            removed_sources (list): 기여분을 지울 Source 페이지 ID
+            targets (dict): {page_id: (keys, ranges, total, count, value_count, written_json)}
+            removed_targets (list): 지울 Target 페이지 ID
+            full (bool): True면 기존 상태를 모두 교체
+        """
+        now = time.time()
+        with self._connect() as conn:
+            if full:
+                conn.execute("DELETE FROM contributions WHERE state_id = ?", (state_id,))
+                conn.execute("DELETE FROM targets WHERE state_id = ?", (state_id,))
+            conn.executemany(
+                "DELETE FROM contributions WHERE state_id = ? AND page_id = ?",
+                [(state_id, page_id) for page_id in removed_sources],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO contributions (state_id, page_id, keys_json, dates_json, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(state_id, page_id, json.dumps(keys, ensure_ascii=False), json.dumps(dates), value)
+                 for page_id, keys, dates, value in contributions],
+            )
+            conn.executemany(
+                "DELETE FROM targets WHERE state_id = ? AND page_id = ?",
+                [(state_id, page_id) for page_id in removed_targets],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO targets "
+                "(state_id, page_id, keys_json, ranges_json, total, count, value_count, written_json) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(state_id, page_id, json.dumps(keys, ensure_ascii=False), json.dumps(ranges), float(total),
+                  int(count), int(value_count), written)
+                 for page_id, (keys, ranges, total, count, value_count, written) in targets.items()],
+            )
+            conn.execute(
+                "INSERT INTO states (state_id, source_high_water, target_high_water, last_full_sync) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(state_id) DO UPDATE SET "
+                "source_high_water = excluded.source_high_water, target_high_water = excluded.target_high_water, "
+                "last_full_sync = CASE WHEN ? THEN excluded.last_full_sync ELSE states.last_full_sync END",
+                (state_id, source_high_water, target_high_water, now, full),
+            )
+
+    def mark_written(self, state_id, values):
+        """Notion에 기록이 끝난 값 저장 ({page_id: 값}). 실패한 페이지는 다음 실행에서 다시 기록됨"""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE targets SET written_json = ? WHERE state_id = ? AND page_id = ?",
+                [(json.dumps(value), state_id, page_id) for page_id, value in values.items()],
+            )
+
+    def invalidate(self, state_id=None):
+        """상태 삭제 (state_id가 없으면 전체). 다음 실행은 전체 재계산"""
+        with self._connect() as conn:
+            for table in ("contributions", "targets", "states"):
+                if state_id is None:
+                    conn.execute(f"DELETE FROM {table}")
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE state_id = ?", (state_id,))
+
+
+def _contributions(source):
+    """source_columns 결과를 페이지별 (page_id, keys, dates, value) 목록으로"""
+    keys = list(zip(*source["keys"])) if source["keys"] else [()] * len(source["page_id"])
+    dates = list(zip(*source["dates"])) if source["dates"] else [()] * len(source["page_id"])
+    return [
+        (page_id, list(k), list(d), _number(value))
+        for page_id, k, d, value in zip(source["page_id"], keys, dates, source["values"])
+    ]
+
+
+def _source_from(contributions, conditions):
+    """(page_id, keys, dates, value) 목록을 source_columns 형식으로"""
+    equal_count = sum(1 for c in conditions if not c["is_range"])
+    range_count = len(conditions) - equal_count
+    return {
+        "page_id": [c[0] for c in contributions],
+        "keys": [[c[1][i] for c in contributions] for i in range(equal_count)],
+        "dates": [[c[2][i] for c in contributions] for i in range(range_count)],
+        "values": [c[3] for c in contributions],
+    }
+
+
+def _target_from(page_ids, targets, conditions):
+    """저장된 Target 항목을 target_columns 형식으로"""
+    equal_count = sum(1 for c in conditions if not c["is_range"])
+    range_count = len(conditions) - equal_count
+    return {
+        "page_id": list(page_ids),
+        "keys": [[targets[p][0][i] for p in page_ids] for i in range(equal_count)],
+        "ranges": [[tuple(targets[p][1][i]) for p in page_ids] for i in range(range_count)],
+    }
+
+
+def _aggregate(contributions, target, conditions):
+    size = len(target["page_id"])
+    if not contributions or not size:
+        zeros = np.zeros(size, dtype=np.int64)
+        return {"sum": zeros.astype(np.float64), "count": zeros, "value_count": zeros}
+    return aggregate_columns(_source_from(contributions, conditions), target)
+
+
+def run_incremental_sumifs(notion, src_database_id, target_database_id, conditions, sum_column, aggregate,
+                           target_column, state=None, reconcile_interval=DEFAULT_RECONCILE_INTERVAL, full=False):
+    """
+    변경된 Source/Target 페이지만 조회해 저장된 집계 상태를 갱신하고, Notion에 기록할 값을 반환
+    - Source: last_edited_time 이후 바뀐 페이지의 이전 기여분을 빼고 새 기여분을 더함
+    - Target: 새로 생기거나 조건이 바뀐 페이지만 저장된 기여분 전체로 다시 계산
+    - reconcile_interval마다(또는 full=True) 전체 재계산으로 삭제된 페이지와 누적 오차를 정리
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        conditions (list): {"src_col", "tgt_col", "is_range"} 조건 목록
+        aggregate (str): "sum", "count" 또는 "average"
+        target_column (str): 결과를 기록할 Target의 숫자 칼럼
+        state (SumifsState, optional): 사용할 상태 저장소 (기본 경로 사용)
+    Returns:
+        tuple: (상태 ID, {페이지 ID: 기록할 값}, {"mode", "source_changed", "target_changed", "affected"})
+    """
+    if aggregate not in AGGREGATIONS:
+        raise ValueError(f"지원하지 않는 집계 방식: {aggregate}")
+    state = state or SumifsState()
+    state_id = make_state_id(src_database_id, target_database_id, conditions, sum_column, aggregate, target_column)
+    saved = state.get_state(state_id)
+
+    if full or saved is None or time.time() - saved[2] >= reconcile_interval:
+        src_rows = [p for p in get_database_rows(notion, src_database_id) if _is_live(p)]
+        target_rows = [p for p in get_database_rows(notion, target_database_id) if _is_live(p)]
+        target = target_columns(target_rows, conditions)
+        contributions = _contributions(source_columns(src_rows, conditions, sum_column, aggregate))
+        result = _aggregate(contributions, target, conditions)
+        targets = {}
+        for i, row in enumerate(target_rows):
+            targets[row["id"]] = (
+                [keys[i] for keys in target["keys"]], [ranges[i] for ranges in target["ranges"]],
+                result["sum"][i], result["count"][i], result["value_count"][i], current_value(row, target_column),
+            )
+        state.save(state_id, contributions, [], targets, [], _high_water(src_rows), _high_water(target_rows),
+                   full=True)
+        info = {"mode": "full", "source_changed": len(src_rows), "target_changed": len(target_rows),
+                "affected": len(target_rows)}
+    else:
+        source_high_water, target_high_water, _ = saved
+
+        def changed_since(database_id, high_water):
+            if not high_water:
+                return get_database_rows(notion, database_id)
+            # last_edited_time은 분 단위로 기록되므로 같은 분의 페이지도 다시 가져옴 (다시 반영해도 결과는 같음)
+            return get_database_rows(notion, database_id, filter={
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": high_water},
+            })
+
+        changed_src = changed_since(src_database_id, source_high_water)
+        changed_tgt = changed_since(target_database_id, target_high_water)
+
+        live_src = [p for p in changed_src if _is_live(p)]
+        new = _contributions(source_columns(live_src, conditions, sum_column, aggregate))
+        old = state.load_contributions(state_id, [p["id"] for p in changed_src])
+        # 다시 가져왔지만 조건·값이 그대로인 페이지는 빼고 더할 필요가 없음
+        new_by_id = {c[0]: c for c in new}
+        old_by_id = {c[0]: c for c in old}
+        removed = [c for c in old if new_by_id.get(c[0]) != c]
+        added = [c for c in new if old_by_id.get(c[0]) != c]
+
+        targets = state.load_targets(state_id)
+        changed_target_ids = {p["id"] for p in changed_tgt}
+        stored_ids = [page_id for page_id in targets if page_id not in changed_target_ids]
+        updated = {}
+        if removed or added:
+            stored = _target_from(stored_ids, targets, conditions)
+            plus = _aggregate(added, stored, conditions)
+            minus = _aggregate(removed, stored, conditions)
+            for i, page_id in enumerate(stored_ids):
+                if plus["count"][i] or minus["count"][i]:
+                    keys, ranges, total, count, value_count, written = targets[page_id]
+                    updated[page_id] = (
+                        keys, ranges,
+                        total + plus["sum"][i] - minus["sum"][i],
+                        count + plus["count"][i] - minus["count"][i],
+                        value_count + plus["value_count"][i] - minus["value_count"][i],
+                        written,
+                    )
+
+        live_tgt = [p for p in changed_tgt if _is_live(p)]
+        removed_targets = [p["id"] for p in changed_tgt if not _is_live(p)]
+        if live_tgt:
+            # 새로 생기거나 바뀐 Target은 갱신된 기여분 전체로 계산
+            stored_contributions = {c[0]: c for c in state.load_contributions(state_id)}
+            for page_id in [c[0] for c in removed]:
+                stored_contributions.pop(page_id, None)
+            stored_contributions.update((c[0], c) for c in added)
+            target = target_columns(live_tgt, conditions)
+            result = _aggregate(list(stored_contributions.values()), target, conditions)
+            for i, row in enumerate(live_tgt):
+                updated[row["id"]] = (
+                    [keys[i] for keys in target["keys"]], [ranges[i] for ranges in target["ranges"]],
+                    result["sum"][i], result["count"][i], result["value_count"][i],
+                    current_value(row, target_column),
+                )
+
+        state.save(
+            state_id, added, [c[0] for c in removed], updated, removed_targets,
+            _high_water(changed_src, source_high_water), _high_water(changed_tgt, target_high_water),
+        )
+        targets.update(updated)
+        for page_id in removed_targets:
+            targets.pop(page_id, None)
+        info = {"mode": "incremental", "source_changed": len(changed_src), "target_changed": len(changed_tgt),
+                "affected": len(updated)}
+
+    # 마지막으로 기록된 값과 다른 Target만 기록 (이전 실행에서 실패한 페이지도 포함)
+    updates = {}
+    for page_id, (_, _, total, count, value_count, written) in targets.items():
+        value = aggregate_value(aggregate, total, count, value_count)
+        if written is not None:
+            old = json.loads(written)
+            if old is None and value is None:
+                continue
+            if old is not None and value is not None and math.isclose(old, value, rel_tol=1e-12, abs_tol=1e-9):
+                continue
+        updates[page_id] = value
+    return state_id, updates, info
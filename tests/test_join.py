@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from join import perform_join, stream_join
+
+PANDAS_HOW = {"inner": "inner", "left": "left", "right": "right", "full": "outer"}
+
+
+def tables(seed=0, left_rows=60, right_rows=40):
+    rng = np.random.default_rng(seed)
+    left = pd.DataFrame({
+        "k": rng.integers(0, 15, left_rows),
+        "g": rng.choice(["a", "b"], left_rows),
+        "value": rng.integers(0, 100, left_rows),
+    })
+    right = pd.DataFrame({
+        "k": rng.integers(5, 25, right_rows),
+        "g": rng.choice(["a", "b"], right_rows),
+        "value": rng.integers(0, 100, right_rows),
+        "extra": rng.integers(0, 100, right_rows),
+    })
+    return left, right
+
+
+def canonical(df):
+    """행 순서와 정수/실수 차이를 무시하고 비교할 수 있도록 정렬"""
+    df = df.astype(object).where(df.notna(), None)
+    return sorted(map(tuple, df[sorted(df.columns)].itertuples(index=False)), key=repr)
+
+
+def chunks(df, size=7):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+CONDITIONS = [[("k", "k")], [("k", "k"), ("g", "g")]]
+
+
+@pytest.mark.parametrize("how", list(PANDAS_HOW))
+@pytest.mark.parametrize("conditions", CONDITIONS)
+@pytest.mark.parametrize("strategy", ["hash", "sort_merge"])
+def test_perform_join_matches_pandas_merge(how, conditions, strategy):
+    left, right = tables()
+    keys = [left_col for left_col, _ in conditions]
+    expected = pd.merge(left, right, on=keys, how=PANDAS_HOW[how], suffixes=("_left", "_right"))
+    result = perform_join(left, right, conditions, how=how, strategy=strategy)
+    assert list(result.columns) == list(expected.columns)
+    assert canonical(result) == canonical(expected)
+
+
+@pytest.mark.parametrize("how", list(PANDAS_HOW))
+@pytest.mark.parametrize("conditions", CONDITIONS)
+@pytest.mark.parametrize("build_side", ["left", "right"])
+def test_stream_join_matches_perform_join(how, conditions, build_side):
+    left, right = tables(seed=1)
+    expected = perform_join(left, right, conditions, how=how)
+    build, probe = (right, left) if build_side == "right" else (left, right)
+    result = pd.concat(list(stream_join(build, chunks(probe), conditions, how=how, build_side=build_side)))
+    assert canonical(result) == canonical(expected)
+
+
+@pytest.mark.parametrize("how", ["semi", "anti"])
+def test_semi_and_anti_join_filter_left_rows(how):
+    left, right = tables(seed=2)
+    exists = left["k"].isin(right["k"])
+    expected = left[exists if how == "semi" else ~exists]
+    result = perform_join(left, right, [("k", "k")], how=how)
+    assert list(result.columns) == list(left.columns)
+    assert canonical(result) == canonical(expected)
+    for build_side in ("left", "right"):
+        build, probe = (right, left) if build_side == "right" else (left, right)
+        streamed = pd.concat(list(stream_join(build, chunks(probe), [("k", "k")], how=how, build_side=build_side)))
+        assert canonical(streamed) == canonical(expected)
+
+
+def test_null_keys_never_match():
+    left = pd.DataFrame({"k": pd.array([1, None, 2], dtype="Int64"), "a": [1, 2, 3]})
+    right = pd.DataFrame({"k": pd.array([None, 1], dtype="Int64"), "b": [4, 5]})
+    assert perform_join(left, right, [("k", "k")]).to_dict("list") == {"k": [1], "a": [1], "b": [5]}
+    full = perform_join(left, right, [("k", "k")], how="full")
+    assert len(full) == 4
+    assert perform_join(left, right, [("k", "k")], how="anti")["a"].tolist() == [2, 3]
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+
+import notion_transport
+from notion_transport import RateLimitedTransport
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(notion_transport, "backoff", lambda attempt: 0.0)
+
+
+def counting_transport(handler):
+    calls = []
+
+    def handle(request):
+        calls.append(request)
+        return handler(request)
+
+    return calls, httpx.MockTransport(handle)
+
+
+def send(method, url, handler):
+    calls, inner = counting_transport(handler)
+    client = httpx.Client(transport=RateLimitedTransport(max_attempts=3, transport=inner))
+    try:
+        response = client.request(method, url, json={})
+    except httpx.TransportError as error:
+        response = error
+    return calls, response
+
+
+@pytest.mark.parametrize("method, url", [
+    ("GET", "https://api.notion.com/v1/pages/p1"),
+    ("PATCH", "https://api.notion.com/v1/pages/p1"),
+    ("POST", "https://api.notion.com/v1/databases/db/query"),
+])
+def test_idempotent_requests_retry_server_errors(method, url):
+    calls, response = send(method, url, lambda request: httpx.Response(503))
+    assert len(calls) == 3 and response.status_code == 503
+
+
+@pytest.mark.parametrize("status", [409, 500, 503])
+def test_create_is_not_retried_after_server_error(status):
+    calls, response = send("POST", "https://api.notion.com/v1/pages", lambda request: httpx.Response(status))
+    assert len(calls) == 1 and response.status_code == status
+
+
+def test_create_is_retried_on_rate_limit():
+    responses = iter([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={})])
+    calls, response = send("POST", "https://api.notion.com/v1/pages", lambda request: next(responses))
+    assert len(calls) == 2 and response.status_code == 200
+
+
+def test_create_is_retried_only_before_the_request_is_sent():
+    def connect_error(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    calls, _ = send("POST", "https://api.notion.com/v1/pages", connect_error)
+    assert len(calls) == 3
+
+    def read_timeout(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    calls, error = send("POST", "https://api.notion.com/v1/pages", read_timeout)
+    assert len(calls) == 1 and isinstance(error, httpx.ReadTimeout)
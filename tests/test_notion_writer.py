@@ -0,0 +1,113 @@
+import httpx
+import pandas as pd
+
+import notion_transport
+import notion_writer
+from notion_writer import build_merge_requests, build_page_properties, is_uncertain, merge_key, run_async, send_requests
+from property_decoders import get_decoder
+
+
+DB_PROPERTIES = {
+    "Name": {"id": "title", "type": "title"},
+    "Day": {"id": "day", "type": "date"},
+    "Qty": {"id": "qty", "type": "number"},
+}
+
+
+def page(page_id, day, qty):
+    return {
+        "id": page_id,
+        "properties": {
+            "Name": {"id": "title", "type": "title", "title": []},
+            "Day": {"id": "day", "type": "date", "date": {"start": day, "end": None, "time_zone": None} if day else None},
+            "Qty": {"id": "qty", "type": "number", "number": qty},
+        },
+    }
+
+
+def test_merge_key_normalizes_dates():
+    assert merge_key(pd.Timestamp("2024-01-05", tz="UTC"), "date") == merge_key("2024-01-05", "date") == "2024-01-05"
+    assert merge_key(pd.Timestamp("2024-01-05 10:30")) == merge_key("2024-01-05T19:30:00.000+09:00", "date")
+
+
+def test_merge_matches_rows_on_date_key():
+    current = [page("p1", "2024-01-05", 3), page("p2", "2024-01-06", 4)]
+    # 날짜만 있는 date 칼럼은 시간대 없는 datetime64[ns]
+    _, build = get_decoder("date")
+    result = pd.DataFrame({
+        "Day": build(["2024-01-05", "2024-01-06"]),
+        "Qty": pd.array([3, 5], dtype="Int64"),
+    })
+    requests, summary = build_merge_requests("db", result, "Day", current, DB_PROPERTIES)
+    assert summary["create"] == 0
+    assert summary["archive"] == 0
+    assert summary["unchanged"] == 1
+    assert summary["update"] == 1
+    assert [key for key, *_ in requests] == [("update", "p2")]
+
+
+def test_date_only_values_are_written_back_as_dates():
+    _, build = get_decoder("date")
+    row = {"Day": build(["2024-05-01"])[0]}
+    assert build_page_properties(row, ["Day"], DB_PROPERTIES)["Day"] == {"date": {"start": "2024-05-01"}}
+    assert build_page_properties({"Day": "2024-05-01"}, ["Day"], DB_PROPERTIES)["Day"] == {"date": {"start": "2024-05-01"}}
+    # 시각이 있는 값은 UTC 자정이어도 시각으로 기록
+    row = {"Day": build(["2024-05-01T00:00:00.000Z", "2024-05-02"])[0]}
+    assert build_page_properties(row, ["Day"], DB_PROPERTIES)["Day"] == {"date": {"start": "2024-05-01T00:00:00+00:00"}}
+
+
+def test_merge_updates_date_when_only_the_time_part_differs():
+    current = [page("p1", "2024-01-05T00:00:00.000Z", 3), page("p2", "2024-01-06", 4)]
+    _, build = get_decoder("date")
+    result = pd.DataFrame({"Day": build(["2024-01-05", "2024-01-06"]), "Qty": pd.array([3, 4], dtype="Int64")})
+    requests, summary = build_merge_requests("db", result, "Qty", current, DB_PROPERTIES)
+    # 같은 날 자정 시각과 날짜만 있는 값은 다른 값
+    assert [key for key, *_ in requests] == [("update", "p1")]
+    assert requests[0][3]["properties"]["Day"] == {"date": {"start": "2024-01-05"}}
+    assert summary["unchanged"] == 1
+
+
+def test_multi_select_text_round_trips_to_options():
+    decode, _ = get_decoder("multi_select")
+    options = [{"name": "a b"}, {"name": "c"}]
+    value = decode({"type": "multi_select", "multi_select": options})
+    db_properties = {"Tags": {"id": "tags", "type": "multi_select"}}
+    assert build_page_properties({"Tags": value}, ["Tags"], db_properties)["Tags"] == {"multi_select": options}
+
+
+def test_merge_never_archives_pages_without_key():
+    current = [page("p1", "2024-01-05", 3), page("p2", None, 1), page("p3", "2024-01-05", 3), page("p4", "2024-01-07", 2)]
+    _, build = get_decoder("date")
+    result = pd.DataFrame({"Day": build(["2024-01-05"]), "Qty": pd.array([3], dtype="Int64")})
+    requests, summary = build_merge_requests("db", result, "Day", current, DB_PROPERTIES)
+    # p3은 키 중복, p4는 결과에 없는 키라 보관하고, 키가 빈 p2는 건너뜀
+    assert sorted(key for key, *_ in requests) == [("archive", "p3"), ("archive", "p4")]
+    assert summary["archive"] == 2
+    assert summary["skipped"] == 1
+    assert summary["unchanged"] == 1
+
+
+def test_failed_creates_that_may_have_reached_the_server_are_uncertain(monkeypatch):
+    monkeypatch.setattr(notion_transport, "backoff", lambda attempt: 0.0)
+
+    def handle(request):
+        if request.url.path.endswith("/pages/p1"):
+            return httpx.Response(400, json={})
+        return httpx.Response(502 if b"first" in request.content else 429, headers={"Retry-After": "0"})
+
+    def client(token, base_url, notion_version, max_attempts, on_throttled):
+        transport = notion_transport.AsyncRateLimitedTransport(
+            max_attempts=max_attempts, transport=httpx.MockTransport(handle), on_throttled=on_throttled,
+        )
+        return httpx.AsyncClient(base_url="https://api.notion.com/", transport=transport)
+
+    monkeypatch.setattr(notion_writer, "async_client", client)
+    requests = [
+        ("first", "POST", "v1/pages", {"first": True}),
+        ("second", "POST", "v1/pages", {}),
+        ("update", "PATCH", "v1/pages/p1", {}),
+    ]
+    succeeded, failed = run_async(send_requests("token", requests, max_attempts=2))
+    assert succeeded == {}
+    # 502를 받은 생성만 처리 여부를 알 수 없음 (429는 처리되지 않았고, 400은 거부된 요청)
+    assert {key for key, error in failed.items() if is_uncertain(error)} == {"first"}
@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from planner import DP_TABLE_LIMIT, _plan_greedy, execute_join_plan, plan_join_order, table_stats
+
+
+def chain():
+    """작은 고객(A) - 큰 주문(B) - 상품(C) 체인: B⋈C를 먼저 하거나 A×C 교차곱을 만들면 중간 결과가 커짐"""
+    rng = np.random.default_rng(0)
+    customers = pd.DataFrame({"customer": np.arange(10)})
+    orders = pd.DataFrame({"customer": rng.integers(0, 100, 2000), "product": rng.integers(0, 500, 2000)})
+    products = pd.DataFrame({"product": np.arange(500), "price": rng.integers(1, 100, 500)})
+    frames = {"B": orders, "C": products, "A": customers}
+    conditions = [("A", "customer", "B", "customer"), ("B", "product", "C", "product")]
+    return frames, conditions
+
+
+def stats_for(frames, conditions):
+    keys = {name: [] for name in frames}
+    for left_table, left_col, right_table, right_col in conditions:
+        keys[left_table].append(left_col)
+        keys[right_table].append(right_col)
+    return {name: table_stats(df, keys[name]) for name, df in frames.items()}
+
+
+def test_planner_picks_the_cheapest_order_for_a_chain():
+    frames, conditions = chain()
+    stats = stats_for(frames, conditions)
+    plan = plan_join_order(stats, conditions)
+    costs = {order: plan_join_order(stats, conditions, order=list(order))["estimated_cost"]
+             for order in itertools.permutations(frames)}
+    assert plan["estimated_cost"] == min(costs.values())
+    # A⋈B를 먼저 해서 B를 줄이고, 교차곱(A×C)이나 큰 B⋈C를 먼저 만들지 않음
+    assert set(plan["order"][:2]) == {"A", "B"}
+    assert plan["estimated_cost"] * 5 < costs[("B", "C", "A")]
+    assert plan["estimated_cost"] * 10 < costs[("A", "C", "B")]
+    assert _plan_greedy(list(frames), stats, conditions) == ["A", "B", "C"]
+
+
+def test_executed_plan_matches_pandas_and_keeps_intermediates_small():
+    frames, conditions = chain()
+    result, plan = execute_join_plan(frames, conditions)
+    expected = frames["A"].merge(frames["B"], on="customer").merge(frames["C"], on="product")
+    assert len(result) == len(expected)
+    assert sorted(result["C.price"]) == sorted(expected["price"])
+    # 중간 결과는 최종 결과보다 크지 않음 (나쁜 순서의 B⋈C는 2000행)
+    assert max(step["actual_rows"] for step in plan["steps"][1:]) <= len(expected)
+    bad, bad_plan = execute_join_plan(frames, conditions, plan_join_order(stats_for(frames, conditions), conditions,
+                                                                        order=["B", "C", "A"]))
+    assert len(bad) == len(expected)
+    assert bad_plan["steps"][1]["actual_rows"] > 10 * len(expected)
+
+
+def test_many_tables_use_greedy_order_without_cross_products():
+    names = [f"T{i}" for i in range(DP_TABLE_LIMIT + 2)]
+    frames = {name: pd.DataFrame({"k": np.arange(5 + i)}) for i, name in enumerate(names)}
+    conditions = [(left, "k", right, "k") for left, right in zip(names, names[1:])]
+    plan = plan_join_order(stats_for(frames, conditions), conditions)
+    assert sorted(plan["order"]) == sorted(names)
+    assert all(step["conditions"] for step in plan["steps"][1:])
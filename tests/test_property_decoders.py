@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+
+from join import concat_chunks, perform_join
+from property_decoders import decode_property
+from utils import notion_to_dataframe
+
+
+def text(value):
+    return [{"plain_text": value}]
+
+
+USER = {"object": "user", "id": "u1", "name": "Kim"}
+
+# 타입별 (값이 있는 속성, 값이 없는 속성, 디코딩 값, DataFrame dtype)
+CASES = {
+    "title": ({"title": text("A")}, {"title": []}, "A", "string"),
+    "rich_text": ({"rich_text": text("a") + text("b")}, {"rich_text": []}, "ab", "string"),
+    "number": ({"number": 0}, {"number": None}, 0, "Int64"),
+    "select": ({"select": {"name": "x"}}, {"select": None}, "x", "category"),
+    "status": ({"status": {"name": "Done"}}, {"status": None}, "Done", "category"),
+    "date": ({"date": {"start": "2024-05-01T10:00:00.000Z", "end": None}}, {"date": None},
+             "2024-05-01T10:00:00.000Z", "datetime64[ns, UTC]"),
+    "checkbox": ({"checkbox": False}, None, False, "boolean"),
+    "relation": ({"relation": [{"id": "p1"}]}, {"relation": []}, "p1", "string"),
+    "people": ({"people": [USER]}, {"people": []}, "Kim", "string"),
+    "files": ({"files": [{"name": "a.pdf"}]}, {"files": []}, "a.pdf", "string"),
+    "url": ({"url": "https://a"}, {"url": None}, "https://a", "string"),
+    "email": ({"email": "a@b"}, {"email": ""}, "a@b", "string"),
+    "phone_number": ({"phone_number": "010"}, {"phone_number": None}, "010", "string"),
+    "created_by": ({"created_by": USER}, {"created_by": None}, "Kim", "string"),
+    "unique_id": ({"unique_id": {"prefix": "T", "number": 3}}, {"unique_id": {"prefix": None, "number": None}},
+                  "T-3", "string"),
+    "formula": ({"formula": {"type": "number", "number": 1.5}}, {"formula": {"type": "number", "number": None}},
+                1.5, "Float64"),
+    "rollup": ({"rollup": {"type": "number", "number": 2}}, {"rollup": {"type": "number", "number": None}},
+               2, "Int64"),
+}
+
+
+def prop(kind, body):
+    return {"id": kind, "type": kind, **body}
+
+
+@pytest.mark.parametrize("kind", list(CASES))
+def test_empty_values_decode_to_missing(kind):
+    present, empty, value, dtype = CASES[kind]
+    assert decode_property(prop(kind, present)) == value
+    if empty is not None:
+        assert decode_property(prop(kind, empty)) is None
+
+    pages = [{"id": "p", "properties": {"c": prop(kind, present)}}]
+    if empty is not None:
+        pages.append({"id": "q", "properties": {"c": prop(kind, empty)}})
+    column = notion_to_dataframe(["c"], pages)["c"]
+    assert str(column.dtype) == dtype
+    # 0·False·빈 목록 같은 값은 결측값과 구분
+    assert column.notna().iloc[0]
+    if empty is not None:
+        assert column.isna().iloc[1]
+
+
+def test_missing_property_and_unsupported_type_are_missing():
+    pages = [
+        {"id": "p", "properties": {"n": prop("number", {"number": 1}), "b": {"id": "b", "type": "button", "button": {}}}},
+        {"id": "q", "properties": {"b": {"id": "b", "type": "button", "button": {}}}},
+    ]
+    df = notion_to_dataframe(["n", "b"], pages)
+    assert df["n"].tolist()[0] == 1 and df["n"].isna().tolist() == [False, True]
+    assert df["b"].isna().all()
+
+
+def test_schema_types_keep_dtype_for_all_missing_chunk():
+    pages = [{"id": "p", "properties": {"n": prop("number", {"number": None})}}]
+    column = notion_to_dataframe(["n"], pages, {"n": "number"})["n"]
+    assert str(column.dtype) == "Int64" and column.isna().all()
+    assert pd.isna(notion_to_dataframe(["d"], [{"id": "p", "properties": {}}], {"d": "date"})["d"].iloc[0])
+
+
+def date_pages(*starts):
+    return [{"id": f"p{i}", "properties": {"d": prop("date", {"date": {"start": start, "end": None} if start else None})}}
+            for i, start in enumerate(starts)]
+
+
+def test_date_only_values_stay_dates():
+    column = notion_to_dataframe(["d"], date_pages("2024-05-01", None, "2024-12-31"))["d"]
+    # 시간대 없는 자정: UTC로 옮기지 않으므로 날짜가 바뀌지 않음
+    assert str(column.dtype) == "datetime64[ns]"
+    assert [value.date().isoformat() for value in column.dropna()] == ["2024-05-01", "2024-12-31"]
+    assert column.isna().tolist() == [False, True, False]
+
+    mixed = notion_to_dataframe(["d"], date_pages("2024-05-01", "2024-05-01T09:30:00.000+09:00"))["d"]
+    assert str(mixed.dtype) == "datetime64[ns, UTC]"
+    assert mixed.tolist() == [pd.Timestamp("2024-05-01", tz="UTC"), pd.Timestamp("2024-05-01 00:30", tz="UTC")]
+
+    formula = {"id": "f", "type": "formula", "formula": {"type": "date", "date": {"start": "2024-05-01", "end": None}}}
+    assert str(notion_to_dataframe(["f"], [{"id": "p", "properties": {"f": formula}}])["f"].dtype) == "datetime64[ns]"
+
+
+def test_date_only_and_timed_columns_still_join_and_concat():
+    dates = notion_to_dataframe(["d"], date_pages("2024-05-01", "2024-05-02"))
+    times = notion_to_dataframe(["d"], date_pages("2024-05-01T00:00:00.000Z", "2024-05-02T10:00:00.000Z"))
+    result = perform_join(dates, times, [("d", "d")], how="inner")
+    assert len(result) == 1
+    combined = concat_chunks([dates, times])
+    assert str(combined["d"].dtype) == "datetime64[ns, UTC]" and len(combined) == 4
@@ -0,0 +1,88 @@
+import time
+from types import SimpleNamespace
+
+from row_cache import RowCache, get_database_rows_cached, load_database_info_cached
+
+
+class FakeDatabases:
+    def __init__(self):
+        self.schema = {"properties": {"Name": {"id": "title", "type": "title"}}}
+        self.retrieved = 0
+
+    def retrieve(self, database_id):
+        self.retrieved += 1
+        return self.schema
+
+    def query(self, database_id, **kwargs):
+        return {"results": [], "has_more": False, "next_cursor": None}
+
+
+def fake_notion():
+    return SimpleNamespace(databases=FakeDatabases())
+
+
+def expire(cache):
+    """재조회 주기가 지난 것처럼 동기화 시각을 과거로"""
+    past = time.time() - 7200
+    with cache._connect() as conn:
+        conn.execute("UPDATE databases SET last_full_sync = ?, schema_sync = ?", (past, past))
+
+
+def test_schema_is_reused_until_rows_are_reconciled(tmp_path):
+    notion = fake_notion()
+    cache = RowCache(path=str(tmp_path / "rows.sqlite"))
+    load_database_info_cached(notion, "db", cache)
+    get_database_rows_cached(notion, "db", cache)
+    load_database_info_cached(notion, "db", cache)
+    assert notion.databases.retrieved == 1
+
+
+def test_full_reconcile_refreshes_schema(tmp_path):
+    notion = fake_notion()
+    cache = RowCache(path=str(tmp_path / "rows.sqlite"))
+    get_database_rows_cached(notion, "db", cache)
+    notion.databases.schema = {"properties": {
+        "Name": {"id": "title", "type": "title"},
+        "Qty": {"id": "qty", "type": "number"},
+    }}
+    expire(cache)
+
+    _, columns_types = load_database_info_cached(notion, "db", cache)
+    get_database_rows_cached(notion, "db", cache)
+    assert columns_types == {"Name": "title", "Qty": "number"}
+    assert notion.databases.retrieved == 2
+
+    # 스키마를 먼저 읽지 않아도 전체 재조회 때 스키마를 갱신
+    notion.databases.schema = {"properties": {}}
+    expire(cache)
+    get_database_rows_cached(notion, "db", cache)
+    assert cache.get_schema("db") == {"properties": {}}
+
+
+def test_caches_are_separated_by_token(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    page = {"id": "p1", "last_edited_time": "2024-01-01T00:00:00.000Z", "properties": {}}
+    first = RowCache("secret-a")
+    first.write_pages("db", [page], full=True)
+    second = RowCache("secret-b")
+    assert first.path != second.path
+    assert second.load_pages("db") == []
+    assert first.load_pages("db") == [page]
+
+
+def test_only_requested_columns_are_completed(tmp_path, monkeypatch):
+    import row_cache
+
+    completed = []
+    monkeypatch.setattr(row_cache, "complete_properties",
+                        lambda notion, pages, columns, db=None: completed.append(columns) or ([], {}))
+    notion = fake_notion()
+    page = {"id": "p1", "last_edited_time": "2024-01-01T00:00:00.000Z",
+            "properties": {"Name": {"id": "title", "type": "title", "title": []},
+                           "Tags": {"id": "tags", "type": "rich_text", "rich_text": []}}}
+    notion.databases.query = lambda database_id, **kwargs: {"results": [page], "has_more": False, "next_cursor": None}
+    cache = RowCache(path=str(tmp_path / "rows.sqlite"))
+
+    get_database_rows_cached(notion, "db", cache, columns=["Name"])
+    get_database_rows_cached(notion, "db", cache)
+    assert completed == [["Name"], ["Name", "Tags"]]
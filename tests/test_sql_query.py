@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from sql_query import build_plan, execute_plan, parse_sql
+
+
+def run(sql, frames, schemas):
+    plan = build_plan(parse_sql(sql), schemas)
+    result, _ = execute_plan(plan, frames)
+    return result
+
+
+@pytest.mark.parametrize("func, expected", [("SUM", 8), ("AVG", 8 / 3), ("MIN", 1), ("MAX", 4), ("COUNT", 3)])
+def test_distinct_aggregate_applies_function_to_unique_values(func, expected):
+    orders = pd.DataFrame({"Qty": pd.array([1, 1, 3, 4, None], dtype="Int64")})
+    result = run(f"SELECT {func}(DISTINCT o.Qty) AS v FROM Orders o", {"o": orders}, {"o": {"Qty": "number"}})
+    assert result["v"].iloc[0] == pytest.approx(expected)
+
+
+def test_distinct_aggregate_per_group():
+    orders = pd.DataFrame({
+        "Product": pd.array(["A", "A", "A", "B", "B"], dtype="string"),
+        "Qty": pd.array([1, 1, 3, 2, 2], dtype="Int64"),
+    })
+    result = run(
+        "SELECT o.Product, SUM(DISTINCT o.Qty) AS total FROM Orders o GROUP BY o.Product ORDER BY o.Product",
+        {"o": orders}, {"o": {"Product": "select", "Qty": "number"}},
+    )
+    assert result["total"].tolist() == [4, 2]
+
+
+def test_not_equal_pushdown_excludes_empty_values():
+    plan = build_plan(parse_sql("SELECT o.Status FROM Orders o WHERE o.Status != 'Done'"), {"o": {"Status": "select"}})
+    notion_filter = plan["tables"]["o"]["notion_filter"]
+    assert notion_filter == {"and": [
+        {"property": "Status", "select": {"does_not_equal": "Done"}},
+        {"property": "Status", "select": {"is_not_empty": True}},
+    ]}
+    orders = pd.DataFrame({"Status": pd.Categorical(["Done", "Open", None])})
+    result, _ = execute_plan(plan, {"o": orders}, server_filtered=False)
+    assert result["Status"].tolist() == ["Open"]
@@ -0,0 +1,141 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from sumifs import compute_sumifs
+
+
+def select(value):
+    return {"type": "select", "select": {"name": value} if value else None}
+
+
+def date_prop(start, end=None):
+    return {"type": "date", "date": {"start": start, "end": end, "time_zone": None} if start else None}
+
+
+def number(value):
+    return {"type": "number", "number": value}
+
+
+def random_day(rng):
+    day = date(2024, 1, 1) + timedelta(days=rng.randrange(60))
+    if rng.random() < 0.3:
+        # 시각이 있는 날짜도 섞음
+        return datetime(day.year, day.month, day.day, rng.randrange(24), tzinfo=timezone.utc).isoformat()
+    return day.isoformat()
+
+
+def make_pages(seed=0, sources=300, targets=40):
+    rng = random.Random(seed)
+    products = ["A", "B", "C", None]
+    src = [{
+        "id": f"s{i}",
+        "properties": {
+            "Product": select(rng.choice(products)),
+            "Region": select(rng.choice(["N", "S"])),
+            "Date": date_prop(random_day(rng) if rng.random() > 0.1 else None),
+            "Shipped": date_prop(random_day(rng)),
+            "Qty": number(rng.choice([None, rng.randint(1, 50), rng.random() * 10])),
+        },
+    } for i in range(sources)]
+    tgt = []
+    for i in range(targets):
+        start = date(2024, 1, 1) + timedelta(days=rng.randrange(60))
+        end = start + timedelta(days=rng.randrange(20))
+        period = date_prop(start.isoformat(), end.isoformat() if rng.random() > 0.2 else None)
+        tgt.append({"id": f"t{i}", "properties": {
+            "Product": select(rng.choice(products)),
+            "Region": select(rng.choice(["N", "S"])),
+            "Period": period if rng.random() > 0.1 else date_prop(None),
+            "Window": date_prop(start.isoformat(), (start + timedelta(days=30)).isoformat()),
+        }})
+    return src, tgt
+
+
+def _text(prop):
+    return prop["select"]["name"] if prop and prop["select"] else ""
+
+
+def _bounds(prop):
+    if not prop or not prop["date"]:
+        return None
+    start = prop["date"]["start"]
+    end = prop["date"]["end"] or start
+    return _parse(start), _parse(end)
+
+
+def _parse(value):
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def brute_force(src, tgt, conditions, sum_column, aggregate):
+    """Target마다 모든 Source를 확인하는 이중 루프"""
+    results = []
+    for target in tgt:
+        total, count, values = 0.0, 0, 0
+        for source in src:
+            matched = True
+            for condition in conditions:
+                source_prop = source["properties"][condition["src_col"]]
+                target_prop = target["properties"][condition["tgt_col"]]
+                if condition["is_range"]:
+                    bounds = _bounds(target_prop)
+                    source_date = _bounds(source_prop)
+                    matched &= bool(bounds and source_date and bounds[0] <= source_date[0] <= bounds[1])
+                else:
+                    matched &= _text(source_prop) == _text(target_prop)
+            if matched:
+                count += 1
+                value = source["properties"][sum_column]["number"]
+                if value is not None:
+                    total += value
+                    values += 1
+        results.append({"sum": total, "count": count, "average": total / values if values else np.nan}[aggregate])
+    return results
+
+
+CONDITION_SETS = {
+    "equal": [{"src_col": "Product", "tgt_col": "Product", "is_range": False}],
+    "equal+range": [
+        {"src_col": "Product", "tgt_col": "Product", "is_range": False},
+        {"src_col": "Date", "tgt_col": "Period", "is_range": True},
+    ],
+    "two equal+range": [
+        {"src_col": "Product", "tgt_col": "Product", "is_range": False},
+        {"src_col": "Region", "tgt_col": "Region", "is_range": False},
+        {"src_col": "Date", "tgt_col": "Period", "is_range": True},
+    ],
+    "range only": [{"src_col": "Date", "tgt_col": "Period", "is_range": True}],
+    "two ranges": [
+        {"src_col": "Product", "tgt_col": "Product", "is_range": False},
+        {"src_col": "Date", "tgt_col": "Period", "is_range": True},
+        {"src_col": "Shipped", "tgt_col": "Window", "is_range": True},
+    ],
+    "none": [],
+}
+
+
+@pytest.mark.parametrize("aggregate", ["sum", "count", "average"])
+@pytest.mark.parametrize("name", list(CONDITION_SETS))
+def test_compute_sumifs_matches_nested_loop(name, aggregate):
+    src, tgt = make_pages()
+    conditions = CONDITION_SETS[name]
+    result = compute_sumifs(src, tgt, conditions, "Qty", aggregate)
+    assert result["page_id"].tolist() == [page["id"] for page in tgt]
+    np.testing.assert_allclose(result["value"].to_numpy(dtype=float),
+                               brute_force(src, tgt, conditions, "Qty", aggregate), rtol=1e-9, equal_nan=True)
+
+
+def test_date_range_is_inclusive_and_single_day_without_end():
+    src = [{"id": f"s{i}", "properties": {"Date": date_prop(day), "Qty": number(1)}}
+           for i, day in enumerate(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])]
+    tgt = [
+        {"id": "t1", "properties": {"Period": date_prop("2024-01-02", "2024-01-03")}},
+        {"id": "t2", "properties": {"Period": date_prop("2024-01-04")}},
+        {"id": "t3", "properties": {"Period": date_prop(None)}},
+    ]
+    conditions = [{"src_col": "Date", "tgt_col": "Period", "is_range": True}]
+    assert compute_sumifs(src, tgt, conditions, "Qty")["value"].tolist() == [2, 1, 0]
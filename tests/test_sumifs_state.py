@@ -0,0 +1,160 @@
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+import sumifs_state
+from sumifs import compute_sumifs
+from sumifs_state import SumifsState, run_incremental_sumifs
+
+
+CONDITIONS = [
+    {"src_col": "Product", "tgt_col": "Product", "is_range": False},
+    {"src_col": "Date", "tgt_col": "Period", "is_range": True},
+]
+
+
+class FakeWorkspace:
+    """get_database_rows 대신 쓰는 메모리 DB (last_edited_time 필터만 지원)"""
+
+    def __init__(self):
+        self.databases = {"src": {}, "tgt": {}}
+        self.clock = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    def touch(self, database_id, page_id, properties=None, archived=False):
+        # Notion처럼 분 단위 last_edited_time
+        self.clock += timedelta(minutes=1)
+        page = self.databases[database_id].setdefault(page_id, {"id": page_id, "archived": False, "properties": {}})
+        page["properties"].update(properties or {})
+        page["archived"] = archived
+        page["last_edited_time"] = self.clock.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+    def rows(self, notion, database_id, filter=None, filter_properties=None):
+        pages = list(self.databases[database_id].values())
+        if filter:
+            since = filter["last_edited_time"]["on_or_after"]
+            pages = [p for p in pages if p["last_edited_time"] >= since]
+        # 보관된 페이지는 전체 쿼리에는 나오지 않고, 변경 쿼리에는 나올 수 있음
+        return [dict(p) for p in pages if filter or not p["archived"]]
+
+    def live(self, database_id):
+        return [p for p in self.databases[database_id].values() if not p["archived"]]
+
+
+def select(value):
+    return {"type": "select", "select": {"name": value} if value else None}
+
+
+def date_prop(start, end=None):
+    return {"type": "date", "date": {"start": start, "end": end, "time_zone": None} if start else None}
+
+
+def number(value):
+    return {"type": "number", "number": value}
+
+
+def random_source(rng):
+    day = date(2024, 1, 1) + timedelta(days=rng.randrange(60))
+    return {
+        "Product": select(rng.choice(["A", "B", "C", None])),
+        "Date": date_prop(day.isoformat() if rng.random() > 0.1 else None),
+        "Qty": number(rng.choice([None, rng.randint(1, 50), rng.random() * 10])),
+    }
+
+
+def random_target(rng):
+    start = date(2024, 1, 1) + timedelta(days=rng.randrange(60))
+    end = start + timedelta(days=rng.randrange(20))
+    return {
+        "Product": select(rng.choice(["A", "B", "C"])),
+        "Period": date_prop(start.isoformat(), end.isoformat() if rng.random() > 0.2 else None),
+    }
+
+
+@pytest.fixture
+def workspace(monkeypatch):
+    rng = random.Random(7)
+    workspace = FakeWorkspace()
+    for i in range(200):
+        workspace.touch("src", f"s{i}", random_source(rng))
+    for i in range(30):
+        workspace.touch("tgt", f"t{i}", random_target(rng))
+    monkeypatch.setattr(sumifs_state, "get_database_rows", workspace.rows)
+    return workspace
+
+
+def run(workspace, state, aggregate, written, **kwargs):
+    """증분 실행 후 값을 Target 페이지에 기록 (기록도 페이지를 수정하므로 last_edited_time이 바뀜)"""
+    state_id, updates, info = run_incremental_sumifs(
+        None, "src", "tgt", CONDITIONS, "Qty", aggregate, "Total", state=state, **kwargs)
+    for page_id, value in updates.items():
+        workspace.touch("tgt", page_id, {"Total": number(value)})
+    state.mark_written(state_id, updates)
+    written.update(updates)
+    return info
+
+
+def full_recompute(workspace, aggregate):
+    result = compute_sumifs(workspace.live("src"), workspace.live("tgt"), CONDITIONS, "Qty", aggregate)
+    return {
+        page_id: None if isinstance(value, float) and math.isnan(value) else value
+        for page_id, value in zip(result["page_id"], result["value"])
+    }
+
+
+def assert_same(written, expected):
+    assert {page_id: written[page_id] for page_id in expected} == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("aggregate", ["sum", "count", "average"])
+def test_incremental_run_matches_full_recompute_after_source_edits(tmp_path, workspace, aggregate):
+    state = SumifsState(str(tmp_path / "sumifs.sqlite"))
+    written = {}
+    assert run(workspace, state, aggregate, written)["mode"] == "full"
+    assert_same(written, full_recompute(workspace, aggregate))
+
+    rng = random.Random(11)
+    # 값 변경, 조건 값 변경, 날짜 제거, 보관, 추가
+    for i in range(0, 40, 4):
+        workspace.touch("src", f"s{i}", {"Qty": number(rng.randint(1, 100))})
+    for i in range(1, 40, 4):
+        workspace.touch("src", f"s{i}", {"Product": select(rng.choice(["A", "B", "C"]))})
+    for i in range(2, 40, 4):
+        workspace.touch("src", f"s{i}", {"Date": date_prop(None)})
+    for i in range(3, 40, 4):
+        workspace.touch("src", f"s{i}", archived=True)
+    for i in range(200, 220):
+        workspace.touch("src", f"s{i}", random_source(rng))
+
+    info = run(workspace, state, aggregate, written)
+    assert info["mode"] == "incremental"
+    # 같은 분에 수정된 페이지는 다시 가져오므로 60개 이상
+    assert info["source_changed"] >= 60
+    assert_same(written, full_recompute(workspace, aggregate))
+
+    # 변경 없이 다시 실행하면 기록할 값이 없음
+    _, updates, _ = run_incremental_sumifs(
+        None, "src", "tgt", CONDITIONS, "Qty", aggregate, "Total", state=state)
+    assert updates == {}
+
+
+def test_incremental_run_handles_target_edits_and_repeated_rounds(tmp_path, workspace):
+    state = SumifsState(str(tmp_path / "sumifs.sqlite"))
+    written = {}
+    run(workspace, state, "sum", written)
+    rng = random.Random(3)
+    for round_ in range(5):
+        for _ in range(10):
+            workspace.touch("src", f"s{rng.randrange(230)}", random_source(rng))
+        workspace.touch("src", f"s{rng.randrange(200)}", archived=True)
+        workspace.touch("tgt", f"t{rng.randrange(30)}", random_target(rng))
+        workspace.touch("tgt", f"t{30 + round_}", random_target(rng))
+        assert run(workspace, state, "sum", written)["mode"] == "incremental"
+        assert_same(written, full_recompute(workspace, "sum"))
+
+    # 전체 재계산 결과가 Notion에 기록된 값과 같으므로 기록할 값이 없음
+    _, updates, info = run_incremental_sumifs(
+        None, "src", "tgt", CONDITIONS, "Qty", "sum", "Total", state=state, full=True)
+    assert info["mode"] == "full"
+    assert updates == {}
@@ -0,0 +1,23 @@
+from write_journal import WriteJournal
+
+
+def test_resume_run_continues_unfinished_run(tmp_path):
+    journal = WriteJournal(str(tmp_path / "journal.sqlite"))
+    run_id, database_id = journal.resume_run("base")
+    assert database_id is None
+    journal.set_database(run_id, "db1")
+    assert journal.resume_run("base") == (run_id, "db1")
+
+
+def test_finish_and_abandon_start_new_run(tmp_path):
+    journal = WriteJournal(str(tmp_path / "journal.sqlite"))
+    first, _ = journal.resume_run("base")
+    journal.set_database(first, "db1")
+    journal.finish(first)
+    second, database_id = journal.resume_run("base")
+    assert second != first and database_id is None
+
+    journal.set_database(second, "db2")
+    journal.abandon("base")
+    third, database_id = journal.resume_run("base")
+    assert third not in (first, second) and database_id is None
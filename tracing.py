@@ -0,0 +1,211 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+
+
+# 단계별로 누적하는 계측 값
+COUNTERS = ("api_calls", "bytes_received", "throttled", "retries", "retry_wait_seconds", "rate_limit_wait_seconds")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """추적 단계 하나 (시간과 계측 값, 하위 단계 포함)"""
+
+    def __init__(self, trace, name, parent=None, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.parent = parent
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes or {})
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.children = []
+        self.start = time.time()
+        self.end = None
+        self.error = None
+
+    @property
+    def seconds(self):
+        return (self.end or time.time()) - self.start
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def add(self, key, value=1):
+        """이 단계와 상위 단계 모두에 누적 (상위 단계의 값은 하위 단계를 포함)"""
+        with self.trace.lock:
+            span = self
+            while span is not None:
+                span.counters[key] += value
+                span = span.parent
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "start": self.start,
+            "seconds": round(self.seconds, 4),
+            "attributes": self.attributes,
+            **{key: round(value, 4) if isinstance(value, float) else value for key, value in self.counters.items()},
+            **({"error": self.error} if self.error else {}),
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Trace:
+    """JOIN 실행 한 번의 추적 결과 (최상위 단계 하나와 하위 단계 트리)"""
+
+    def __init__(self, name, attributes=None):
+        self.trace_id = os.urandom(16).hex()
+        self.lock = threading.Lock()
+        self.root = Span(self, name, attributes=attributes)
+
+    def spans(self):
+        """모든 단계를 (깊이, Span) 순서로 나열"""
+        stack = [(0, self.root)]
+        while stack:
+            depth, span = stack.pop()
+            yield depth, span
+            stack.extend((depth + 1, child) for child in reversed(span.children))
+
+    def to_dict(self):
+        return {"trace_id": self.trace_id, **self.root.to_dict()}
+
+    def rows(self):
+        """프로필 표시용 평면 목록 (단계 이름 앞에 깊이만큼 표시)"""
+        return [
+            {
+                "stage": "· " * depth + span.name,
+                "seconds": round(span.seconds, 3),
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in span.counters.items()},
+                **({"rows": span.attributes["rows"]} if "rows" in span.attributes else {}),
+            }
+            for depth, span in self.spans()
+        ]
+
+    def to_otlp(self, service_name="notion-sql"):
+        """OpenTelemetry OTLP/JSON 형식 (collector의 OTLP/HTTP JSON 수신이나 파일 가져오기에 사용)"""
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = []
+        for _, span in self.spans():
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent.span_id if span.parent else "",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(int(span.start * 1e9)),
+                "endTimeUnixNano": str(int((span.end or time.time()) * 1e9)),
+                "attributes": [attribute(key, value) for key, value in {**span.attributes, **span.counters}.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]}
+
+
+def current_span():
+    """현재 실행 중인 단계 (추적 중이 아니면 None)"""
+    return _current_span.get()
+
+
+def record(key, value=1):
+    """현재 단계에 계측 값 누적 (추적 중이 아니면 아무것도 하지 않음)"""
+    span = _current_span.get()
+    if span is not None:
+        span.add(key, value)
+
+
+class _SpanContext:
+    def __init__(self, trace, name, attributes):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+        self.token = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if self.trace is None and parent is None:
+            return None
+        if self.trace is not None:
+            self.span = self.trace.root
+        else:
+            self.span = Span(parent.trace, self.name, parent, self.attributes)
+            with parent.trace.lock:
+                parent.children.append(self.span)
+        self.token = _current_span.set(self.span)
+        return self.trace if self.trace is not None else self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return False
+        self.span.end = time.time()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.token)
+        return False
+
+
+def start_trace(name, **attributes):
+    """
+    새 추적 시작. with 블록 안에서 호출한 traced 함수와 Notion API 요청이 이 추적에 기록됨
+        with start_trace("INNER JOIN") as trace: ...
+    """
+    return _SpanContext(Trace(name, attributes), name, attributes)
+
+
+def span(name, **attributes):
+    """현재 추적 안에 하위 단계 생성 (추적 중이 아니면 None을 돌려주고 아무것도 기록하지 않음)"""
+    return _SpanContext(None, name, attributes)
+
+
+def traced(name=None, rows=None):
+    """
+    함수 실행을 하위 단계로 기록하는 데코레이터 (동기·비동기 함수 모두 지원)
+    Args:
+        name (str, optional): 단계 이름 (기본값: 함수 이름)
+        rows (callable, optional): 반환값에서 처리한 행 수를 구하는 함수
+    """
+    def decorator(func):
+        stage = name or func.__name__
+
+        def finish(result, current):
+            if current is not None and rows is not None and result is not None:
+                current.set("rows", rows(result))
+            return result
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with span(stage) as current:
+                    return finish(await func(*args, **kwargs), current)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(stage) as current:
+                return finish(func(*args, **kwargs), current)
+        return wrapper
+    return decorator
+
+
+def run_in_context(executor, func, *args, **kwargs):
+    """현재 추적 단계를 유지한 채 스레드 풀에서 실행 (executor.submit 대신 사용)"""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
@@ -1,10 +1,16 @@
+import asyncio
 import pandas as pd
 import streamlit as st
 from notion_client import Client
-from datetime import datetime
-import aiohttp
-import asyncio
 import time
+from operator import itemgetter
+from property_decoders import PAGE_ID_COLUMN, decode_property, get_decoder
+from concurrent.futures import ThreadPoolExecutor
+from notion_writer import build_create_requests, build_merge_requests, is_uncertain, run_async, send_requests
+from notion_transport import async_notion_client
+from tracing import run_in_context, traced
+from write_journal import make_row_keys
+from join import perform_join
 
 
 def format_database_id(raw_id: str) -> str:
@@ -16,43 +22,200 @@ def get_user_databases(notion):
     dbs = notion.search(filter={"property": "object", "value": "database"})["results"]
     return [(db["title"][0]["plain_text"] if db["title"] else "[제목 없음]", db["id"]) for db in dbs]
 
-def get_database_rows(notion, database_id):
-    """지정한 Notion 데이터베이스의 모든 row를 반환"""
-    results = []
+def iter_database_pages(notion, database_id, filter=None, filter_properties=None):
+    """
+    지정한 Notion 데이터베이스의 row를 API 응답 단위(최대 100개)로 하나씩 생성
+    응답 전체를 붙잡지 않으므로, 받는 쪽이 처리한 페이지 목록은 바로 해제됨
+    Args:
+        get_database_rows와 같음
+    Yields:
+        list: 응답 하나의 페이지 객체 목록 (데이터베이스가 비어 있으면 빈 목록 하나)
+    """
     next_cursor = None
     while True:
-        response = notion.databases.query(
-            **({"database_id": database_id, "start_cursor": next_cursor} if next_cursor else {"database_id": database_id})
-        )
-        results.extend(response["results"])
+        query = {"database_id": database_id}
+        if filter:
+            query["filter"] = filter
+        if filter_properties:
+            query["filter_properties"] = filter_properties
+        if next_cursor:
+            query["start_cursor"] = next_cursor
+        response = notion.databases.query(**query)
         next_cursor = response.get("next_cursor")
-        if not response.get("has_more"):
+        has_more = response.get("has_more")
+        yield response.pop("results")
+        if not has_more:
             break
+
+@traced(rows=len)
+def get_database_rows(notion, database_id, filter=None, filter_properties=None):
+    """
+    지정한 Notion 데이터베이스의 row를 반환
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        database_id (str): 데이터베이스 ID
+        filter (dict, optional): 서버 측에서 적용할 Notion 필터 객체 (notion_filter.build_notion_filter 참고)
+        filter_properties (list, optional): 응답에 포함할 속성 ID 목록 (get_property_ids 참고). 없으면 전체 속성
+    Returns:
+        list: 페이지 객체 목록
+    """
+    results = []
+    for pages in iter_database_pages(notion, database_id, filter=filter, filter_properties=filter_properties):
+        results.extend(pages)
     return results
 
+def _and_filter(base_filter, extra_conditions):
+    """기존 필터와 추가 조건들을 하나의 and 필터로 결합"""
+    conditions = []
+    if base_filter:
+        conditions.extend(base_filter["and"] if "and" in base_filter else [base_filter])
+    conditions.extend(extra_conditions)
+    return conditions[0] if len(conditions) == 1 else {"and": conditions}
+
+def _created_time_slices(notion, database_id, filter, slices, limiter):
+    """created_time 범위로 데이터베이스를 겹치지 않는 구간으로 분할"""
+    bounds = []
+    for direction in ("ascending", "descending"):
+        if limiter:
+            limiter.acquire()
+        query = {
+            "database_id": database_id,
+            "sorts": [{"timestamp": "created_time", "direction": direction}],
+            "page_size": 1,
+        }
+        if filter:
+            query["filter"] = filter
+        response = notion.databases.query(**query)
+        if not response["results"]:
+            return []
+        bounds.append(pd.Timestamp(response["results"][0]["created_time"]))
+    first, last = bounds
+
+    # created_time은 분 단위이므로 구간 경계도 분 단위로 맞춤
+    minutes = int((last - first).total_seconds() // 60) + 1
+    slices = max(1, min(slices, minutes))
+    step = pd.Timedelta(minutes=-(-minutes // slices))
+    edges = [first.floor("min") + step * i for i in range(slices)]
+
+    result = []
+    for i, start in enumerate(edges):
+        conditions = [{"timestamp": "created_time", "created_time": {"on_or_after": start.isoformat()}}]
+        if i + 1 < len(edges):
+            conditions.append({"timestamp": "created_time", "created_time": {"before": edges[i + 1].isoformat()}})
+        result.append((f"created_time >= {start:%Y-%m-%d %H:%M}", _and_filter(filter, conditions)))
+    return result
+
+def _select_slices(notion, database_id, filter, property_name, limiter):
+    """select 속성의 옵션 값별로 데이터베이스를 분할 (값 없음 구간 포함)"""
+    if limiter:
+        limiter.acquire()
+    db = notion.databases.retrieve(database_id=database_id)
+    prop = db["properties"][property_name]
+    prop_type = prop["type"]
+    if prop_type not in ("select", "status"):
+        raise ValueError(f"분할 기준 칼럼은 select 타입이어야 합니다: {property_name} ({prop_type})")
+
+    result = []
+    for option in prop[prop_type].get("options", []):
+        condition = {"property": property_name, prop_type: {"equals": option["name"]}}
+        result.append((f"{property_name} = {option['name']}", _and_filter(filter, [condition])))
+    condition = {"property": property_name, prop_type: {"is_empty": True}}
+    result.append((f"{property_name} is empty", _and_filter(filter, [condition])))
+    return result
+
+@traced(rows=lambda result: len(result[0]))
+def get_database_rows_parallel(notion, database_id, filter=None, partition_by="created_time", slices=None,
+                               max_workers=4, limiter=None, filter_properties=None):
+    """
+    데이터베이스를 겹치지 않는 구간으로 나누어 동시에 페이지네이션
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        database_id (str): 데이터베이스 ID
+        filter (dict, optional): 서버 측에서 적용할 Notion 필터 객체
+        partition_by (str): "created_time" 또는 분할 기준이 될 select 칼럼 이름
+        slices (int, optional): created_time 분할 시 구간 수 (기본값: max_workers)
+        max_workers (int): 동시에 페이지네이션할 구간 수
+        limiter (TokenBucket, optional): 추가로 적용할 요청 한도. notion_transport.get_client로 만든 클라이언트는
+            토큰별 공유 버킷이 이미 적용되므로 필요 없음
+        filter_properties (list, optional): 응답에 포함할 속성 ID 목록
+    Returns:
+        tuple: (페이지 객체 목록, 구간별 소요 시간 정보 목록)
+    """
+    if partition_by == "created_time":
+        partitions = _created_time_slices(notion, database_id, filter, slices or max_workers, limiter)
+    else:
+        partitions = _select_slices(notion, database_id, filter, partition_by, limiter)
+
+    def fetch_slice(label, slice_filter):
+        start_time = time.perf_counter()
+        rows = []
+        requests_made = 0
+        next_cursor = None
+        while True:
+            query = {"database_id": database_id, "filter": slice_filter, "page_size": 100}
+            if filter_properties:
+                query["filter_properties"] = filter_properties
+            if next_cursor:
+                query["start_cursor"] = next_cursor
+            if limiter:
+                limiter.acquire()
+            response = notion.databases.query(**query)
+            requests_made += 1
+            rows.extend(response["results"])
+            next_cursor = response.get("next_cursor")
+            if not response.get("has_more"):
+                break
+        timing = {"slice": label, "rows": len(rows), "requests": requests_made,
+                  "seconds": time.perf_counter() - start_time}
+        return rows, timing
+
+    results = []
+    timings = []
+    seen = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [run_in_context(executor, fetch_slice, label, slice_filter) for label, slice_filter in partitions]
+        for future in futures:
+            rows, timing = future.result()
+            timings.append(timing)
+            for row in rows:
+                # 구간이 겹치지 않더라도 페이지가 중복 반환되는 경우를 대비
+                if row["id"] not in seen:
+                    seen.add(row["id"])
+                    results.append(row)
+    return results, timings
+
+def get_property_ids(db, columns):
+    """칼럼 이름 목록을 filter_properties에 넘길 속성 ID 목록으로 변환"""
+    properties = db.get("properties", {})
+    return [properties[col]["id"] for col in columns if col in properties]
+
+def get_required_columns(columns_types, selected=None, key_columns=(), filters=()):
+    """
+    조회·디코딩할 최소 칼럼 목록 (SELECT 칼럼 + 조인 키 + 로컬에서 평가할 필터 칼럼, 스키마 순서 유지)
+    Args:
+        columns_types (dict): {칼럼: 타입}
+        selected (list, optional): SELECT에서 고른 칼럼. 없으면 전체 칼럼
+        key_columns (iterable): 조인 키 칼럼 (PAGE_ID_COLUMN이 있으면 목록 끝에 추가)
+        filters (iterable): 로컬 필터 조건 목록
+    """
+    needed = set(key_columns) | {condition["column"] for condition in filters}
+    needed |= set(columns_types) if selected is None else set(selected)
+    columns = [col for col in columns_types if col in needed]
+    if PAGE_ID_COLUMN in needed and PAGE_ID_COLUMN not in columns_types:
+        columns.append(PAGE_ID_COLUMN)
+    return columns
+
 def get_database_columns(notion, database_id):
     """Notion 데이터베이스의 컬럼(속성) 이름 목록을 가져옴"""
     response = notion.databases.retrieve(database_id=database_id)
     return list(response.get("properties", {}).keys())
 
 def extract_text_value(prop):
-    """Notion 속성(property) 객체에서 사람이 읽을 수 있는 텍스트 값을 추출"""
-    try:
-        typ = prop["type"]
-        if typ == "title":
-            return prop["title"][0]["plain_text"] if prop["title"] else ""
-        elif typ == "rich_text":
-            return prop["rich_text"][0]["plain_text"] if prop["rich_text"] else ""
-        elif typ == "select":
-            return prop["select"]["name"] if prop["select"] else ""
-        elif typ == "number":
-            return prop["number"] if prop["number"] else 0
-        elif typ == "date":
-            return prop["date"]["start"] if prop["date"] else ""
-        else:
-            return f"[지원 안함: {typ}]"
-    except Exception as e:
-        return f"[에러: {e}]"
+    """Notion 속성(property) 객체에서 사람이 읽을 수 있는 값을 추출 (숫자는 그대로, 값이 없으면 숫자는 None, 나머지는 "")"""
+    value = decode_property(prop)
+    if prop["type"] == "number" or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    return "" if value is None else str(value)
 
 def extract_date_range(prop):
     """날짜 속성에서 시작일과 종료일을 추출"""
@@ -64,6 +227,7 @@ def extract_date_range(prop):
     except:
         return None, None
 
+@traced()
 def load_database_info(notion, database_id):
     """
     Notion 데이터베이스의 정보와 칼럼 타입 정보를 반환
@@ -82,51 +246,158 @@ def load_database_info(notion, database_id):
     
     return db, columns_types
     
-def notion_to_dataframe(db_columns, db_rows):
-    """Notion 데이터베이스 행들을 pandas DataFrame으로 변환"""
-    data = []
-    for row in db_rows:
-        row_dict = {}
-        for col in db_columns:
-            if col in row["properties"]:
-                prop = row["properties"][col]
-                row_dict[col] = extract_text_value(prop)
-            else:
-                row_dict[col] = None
-        data.append(row_dict)
-    return pd.DataFrame(data)
+@traced(rows=len)
+async def get_database_rows_async(notion, database_id, filter=None, filter_properties=None):
+    """get_database_rows의 비동기 버전 (notion은 notion_client.AsyncClient)"""
+    results = []
+    next_cursor = None
+    while True:
+        query = {"database_id": database_id}
+        if filter:
+            query["filter"] = filter
+        if filter_properties:
+            query["filter_properties"] = filter_properties
+        if next_cursor:
+            query["start_cursor"] = next_cursor
+        response = await notion.databases.query(**query)
+        results.extend(response["results"])
+        next_cursor = response.get("next_cursor")
+        if not response.get("has_more"):
+            break
+    return results
 
-def perform_inner_join(left_df, right_df, join_conditions):
-    """두 DataFrame간 inner join 수행"""
+@traced()
+async def load_database_info_async(notion, database_id):
+    """load_database_info의 비동기 버전 (notion은 notion_client.AsyncClient)"""
+    db = await notion.databases.retrieve(database_id=database_id)
+    return db, {name: info.get("type") for name, info in db.get("properties", {}).items()}
+
+async def load_databases_async(notion, sources):
+    """
+    여러 데이터베이스의 스키마와 row를 동시에 조회 (각 데이터베이스는 스키마를 받는 즉시 row 조회 시작)
+    Args:
+        notion (AsyncClient): 비동기 Notion 클라이언트
+        sources (list): {"database_id", "filter"(선택), "columns"(선택)} 목록
+            columns는 칼럼 타입 dict를 받아 조회할 칼럼 목록을 돌려주는 함수 (없으면 전체 칼럼)
+    Returns:
+        list: sources 순서대로 (database_obj, column_types_dict, 페이지 목록)
+    """
+    async def load(source):
+        db, columns_types = await load_database_info_async(notion, source["database_id"])
+        filter_properties = None
+        if source.get("columns"):
+            columns = source["columns"](columns_types)
+            # 전체 칼럼이면 filter_properties를 생략 (URL 길이 절약)
+            if len(columns) < len(columns_types):
+                filter_properties = get_property_ids(db, columns)
+        rows = await get_database_rows_async(
+            notion, source["database_id"], filter=source.get("filter"), filter_properties=filter_properties
+        )
+        return db, columns_types, rows
+
+    return await asyncio.gather(*(load(source) for source in sources))
+
+@traced()
+def load_databases(notion, sources):
+    """
+    load_databases_async를 동기적으로 실행 (요청 한도는 notion과 같은 토큰의 공유 버킷을 따름)
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트 (토큰·API 주소를 가져오는 데 사용)
+        sources (list): load_databases_async 참고
+    """
+    async def run():
+        async_notion = async_notion_client(notion.options.auth, notion.options.base_url, notion.options.notion_version)
+        try:
+            return await load_databases_async(async_notion, sources)
+        finally:
+            await async_notion.aclose()
+
+    return run_async(run())
+
+@traced(rows=len)
+def notion_to_dataframe(db_columns, db_rows, columns_types=None):
+    """
+    Notion 데이터베이스 행들을 pandas DataFrame으로 변환
+    페이지를 한 번만 순회하며 칼럼별 값 목록을 채운 뒤, 타입에 맞는 nullable 배열
+    (Int64/Float64, boolean, string, category, datetime64[ns, UTC], 날짜만 있는 date 칼럼은 datetime64[ns])로 만들어 DataFrame을 구성
+    값이 없는 셀은 0이나 빈 문자열이 아닌 결측값(<NA>, NaT)이 됨
+    columns_types(칼럼 타입 dict)를 주면 행 대신 스키마의 타입을 사용 (청크마다 같은 dtype 유지)
+    db_columns에 PAGE_ID_COLUMN이 있으면 페이지 ID 칼럼을 추가
+    """
+    db_columns = list(db_columns)
+    if PAGE_ID_COLUMN in db_columns and PAGE_ID_COLUMN not in (columns_types or {}):
+        property_columns = [col for col in db_columns if col != PAGE_ID_COLUMN]
+        df = notion_to_dataframe.__wrapped__(property_columns, db_rows, columns_types)
+        df[PAGE_ID_COLUMN] = pd.array([row["id"] for row in db_rows], dtype="string")
+        return df[db_columns]
+    properties = [row["properties"] for row in db_rows]
+
+    # 칼럼 타입은 스키마 또는 해당 속성이 있는 첫 번째 행에서 결정
+    decoders = []
+    for col in db_columns:
+        if columns_types and col in columns_types:
+            typ = columns_types[col]
+        else:
+            typ = next((props[col]["type"] for props in properties if col in props), None)
+        decoders.append(get_decoder(typ))
+    cell_decoders = [decoder for decoder, _ in decoders]
+
+    if not db_columns:
+        return pd.DataFrame(index=range(len(properties)))
+    # 칼럼별 값 목록에 바로 추가 (행마다 dict/list를 만들지 않음)
+    by_column = [[] for _ in db_columns]
+    appends = [values.append for values in by_column]
+    try:
+        # 조회 결과에는 보통 모든 속성이 들어 있음
+        # 페이지 단위로 순회해야 dict 접근이 메모리상 가까운 곳에서 일어나 빠름
+        getter = itemgetter(*db_columns) if len(db_columns) > 1 else (lambda props: (props[db_columns[0]],))
+        for props in properties:
+            for append, decode, prop in zip(appends, cell_decoders, getter(props)):
+                append(decode(prop))
+    except KeyError:
+        by_column = [[] for _ in db_columns]
+        appends = [values.append for values in by_column]
+        for props in properties:
+            for append, decode, col in zip(appends, cell_decoders, db_columns):
+                append(decode(props[col]) if col in props else None)
+
+    columns = {col: build(values) for col, (_, build), values in zip(db_columns, decoders, by_column)}
+    return pd.DataFrame(columns, columns=db_columns, copy=False)
+
+def iter_dataframe_chunks(db_columns, page_batches, columns_types=None):
+    """
+    페이지 목록을 받는 대로 DataFrame 청크로 디코딩 (원본 JSON은 디코딩 직후 해제)
+    Args:
+        db_columns (list): 디코딩할 칼럼
+        page_batches (iterable): 페이지 객체 목록들 (iter_database_pages 참고)
+        columns_types (dict, optional): 칼럼 타입 (주면 모든 청크가 같은 dtype)
+    Yields:
+        DataFrame: notion_to_dataframe과 같은 형식의 청크
+    """
+    db_columns = list(db_columns)
+    for pages in page_batches:
+        chunk = notion_to_dataframe(db_columns, pages, columns_types)
+        del pages
+        yield chunk
+
+def join_dataframes(left_df, right_df, join_conditions, how="inner", plan=None):
+    """두 DataFrame간 join 수행 (inner/left/right/full/semi/anti)"""
     if not join_conditions:
         st.error("조인 조건이 설정되지 않았습니다!")
         return None
-    
-    # join_conditions를 pandas merge에 맞는 형식으로 변환
-    left_on = []
-    right_on = []
-    
-    for left_col, right_col in join_conditions:
-        left_on.append(left_col)
-        right_on.append(right_col)
-    
-    # suffixes 설정
-    left_suffix = '_left'
-    right_suffix = '_right'
-    
-    # 조인 수행
+
+    # SQL과 같이 키가 비어 있는(NULL) 행끼리는 매칭하지 않음
     try:
-        result_df = pd.merge(
-            left_df, right_df, 
-            left_on=left_on, right_on=right_on, 
-            how='inner',
-            suffixes=(left_suffix, right_suffix)
-        )
-        return result_df
+        return perform_join(left_df, right_df, join_conditions, how=how, suffixes=('_left', '_right'), plan=plan)
     except Exception as e:
         st.error(f"조인 수행 중 오류 발생: {e}")
         return None
 
+def perform_inner_join(left_df, right_df, join_conditions):
+    """두 DataFrame간 inner join 수행"""
+    return join_dataframes(left_df, right_df, join_conditions, how="inner")
+
+@traced()
 def create_notion_database(notion, parent_page_id, database_name, columns, left_columns_types=None, right_columns_types=None):
     """
     Notion에 새 데이터베이스 생성
@@ -186,259 +457,141 @@ def create_notion_database(notion, parent_page_id, database_name, columns, left_
         st.error(f"데이터베이스 생성 중 오류 발생: {e}")
         return None
 
+def _warn_uncertain(failed, hint):
+    """처리 여부를 알 수 없는 실패는 일반 실패와 따로 알림 (생성되었을 수도 있으므로)"""
+    uncertain = sum(1 for error in failed.values() if is_uncertain(error))
+    if uncertain:
+        st.error(f"❗ {uncertain}개 요청은 서버 오류나 연결 끊김으로 처리되었는지 알 수 없습니다. {hint}")
+
+@traced(rows=lambda result: result[1])
 def add_rows_to_notion_database(notion, database_id, dataframe, left_db_name=None):
-    """DataFrame의 행을 Notion 데이터베이스에 추가"""
-    total_rows = len(dataframe)
-    success_count = 0
-    
-    # 데이터베이스 스키마 정보 가져오기
-    db_info = notion.databases.retrieve(database_id=database_id)
-    db_properties = db_info["properties"]
-    
-    for idx, row in dataframe.iterrows():
-        # 행 데이터로 properties 구성
-        properties = {}
-        
-        # Name 속성 설정 (페이지 이름이 됨)
-        name_value = f"{left_db_name or 'Row'} #{idx+1}"
-        properties["Name"] = {
-            "title": [{"text": {"content": name_value}}]
-        }
-        
-        # 나머지 속성 처리
-        for col in dataframe.columns:
-            # Name은 제외 (이미 처리함)
-            if col == "Name":
-                continue
-                
-            value = row[col]
-            
-            # 컬럼 속성 타입 확인
-            if col in db_properties:
-                prop_type = db_properties[col]["type"]
-                
-                # 타입에 따라 다르게 처리
-                if prop_type == "title":
-                    properties[col] = {
-                        "title": [{"text": {"content": str(value)}}]
-                    }
-                elif prop_type == "rich_text":
-                    properties[col] = {
-                        "rich_text": [{"text": {"content": str(value)}}]
-                    }
-                elif prop_type == "number":
-                    # 숫자로 변환 시도
-                    try:
-                        num_value = float(value) if value is not None else None
-                        properties[col] = {"number": num_value}
-                    except (ValueError, TypeError):
-                        properties[col] = {"number": None}
-                elif prop_type == "date":
-                    # 날짜 형식으로 변환
-                    try:
-                        if isinstance(value, pd.Timestamp) or isinstance(value, datetime):
-                            date_str = value.isoformat()
-                            properties[col] = {"date": {"start": date_str}}
-                        else:
-                            properties[col] = {"date": None}
-                    except Exception:
-                        properties[col] = {"date": None}
-                elif prop_type == "select":
-                    # 선택 옵션
-                    if value:
-                        properties[col] = {"select": {"name": str(value)}}
-                    else:
-                        properties[col] = {"select": None}
-                elif prop_type == "multi_select":
-                    # 다중 선택 (문자열을 쉼표로 분리)
-                    if isinstance(value, str) and value:
-                        options = [{"name": option.strip()} for option in value.split(',')]
-                        properties[col] = {"multi_select": options}
-                    else:
-                        properties[col] = {"multi_select": []}
-                elif prop_type == "checkbox":
-                    # 불리언 값
-                    bool_value = bool(value) if value is not None else False
-                    properties[col] = {"checkbox": bool_value}
-                else:
-                    # 기타 타입은 텍스트로 변환
-                    properties[col] = {
-                        "rich_text": [{"text": {"content": str(value)}}]
-                    }
-        
-        try:
-            notion.pages.create(
-                parent={"database_id": database_id},
-                properties=properties
-            )
-            success_count += 1
-        except Exception as e:
-            st.error(f"행 {+1} 추가 중 오류: {e}")
-    
+    """DataFrame의 행을 Notion 데이터베이스에 추가 (비동기 쓰기 엔진을 동기적으로 실행)"""
+    db_properties = notion.databases.retrieve(database_id=database_id)["properties"]
+    success_count, total_rows, failed_rows = run_async(
+        add_rows_to_notion_database_async(notion, database_id, dataframe, db_properties, left_db_name)
+    )
+    if failed_rows:
+        st.error(f"{len(failed_rows)}개 행 추가 실패: {failed_rows}")
+        _warn_uncertain(failed_rows, "Notion에서 해당 행이 생성되었는지 확인하세요.")
     return success_count, total_rows
 
-def add_rows_with_progress(notion, database_id, dataframe, left_db_name):
-    import asyncio
-    # 윈도우 환경에서는 아래 코드 필요
-    if asyncio.get_event_loop().is_closed():
-        asyncio.set_event_loop(asyncio.new_event_loop())
-    
-    with st.spinner(f"Notion에 {len(dataframe)}개 행 저장 중..."):
-        start_time = time.time()
-        loop = asyncio.get_event_loop()
-        success, total, failed = loop.run_until_complete(
-            add_rows_to_notion_database_async(notion, database_id, dataframe, left_db_name)
+@traced(rows=lambda result: result[1])
+def add_rows_with_progress(notion, database_id, dataframe, left_db_name, journal=None, run_id=None):
+    """진행률을 표시하면서 DataFrame의 행을 Notion 데이터베이스에 추가"""
+    progress_bar = st.progress(0.0, text=f"Notion에 {len(dataframe)}개 행 저장 중...")
+
+    def on_progress(done, total):
+        progress_bar.progress(done / total, text=f"Notion에 행 저장 중... ({done}/{total})")
+
+    db_properties = notion.databases.retrieve(database_id=database_id)["properties"]
+    start_time = time.time()
+    success, total, failed = run_async(
+        add_rows_to_notion_database_async(
+            notion, database_id, dataframe, db_properties, left_db_name,
+            progress=on_progress, journal=journal, run_id=run_id,
         )
-        end_time = time.time()
-        
-        st.success(f"✅ {success}/{total} 행 저장 완료! (소요 시간: {end_time-start_time:.2f}초)")
-        if failed:
-            st.warning(f"⚠️ {len(failed)}개 행 저장 실패")
-    
+    )
+    end_time = time.time()
+    progress_bar.empty()
+
+    st.success(f"✅ {success}/{total} 행 저장 완료! (소요 시간: {end_time-start_time:.2f}초)")
+    if failed:
+        st.warning(f"⚠️ {len(failed)}개 행 저장 실패")
+        _warn_uncertain(failed, "이 행들은 생성되었을 수도 있습니다. 같은 설정으로 다시 저장하면 저장 기록(journal)에 "
+                                "없는 행만 다시 보내므로, 다시 저장한 뒤 결과 데이터베이스에서 중복을 확인하세요.")
+        with st.expander("실패한 행 보기"):
+            st.dataframe(pd.DataFrame(
+                [{"row": index, "error": error} for index, error in failed.items()]
+            ))
+
     return success, total
 
-async def add_rows_to_notion_database_async(notion, database_id, dataframe, left_db_name=None):
-    """비동기로 DataFrame의 행을 Notion 데이터베이스에 추가"""
-    total_rows = len(dataframe)
-    success_count = 0
-    failed_rows = []
-    
-    # 데이터베이스 스키마 정보 가져오기
-    db_info = notion.databases.retrieve(database_id=database_id)
-    db_properties = db_info["properties"]
-    
-    # Notion API 토큰
-    token = notion.auth
-    
-    async def add_row(session, index, row):
-        # 행 데이터로 properties 구성
-        properties = {}
-        
-        # Name 필드를 의미 있는 값으로 채우기
-        name_value = ""
-        # 1. 첫 번째 열 값을 기본으로 사용
-        if len(dataframe.columns) > 0:
-            first_col = dataframe.columns[0]
-            if not first_col.endswith('_right'):  # 왼쪽 테이블 값 우선 사용
-                name_value = str(row[first_col])
-        
-        # 2. 행 번호 추가
-        name_value = f"{left_db_name or 'Row'} #{index+1}: {name_value}"
-        
-        # Name 속성 설정
-        properties["Name"] = {
-            "title": [{"text": {"content": name_value}}]
-        }
-        
-        # 나머지 속성 처리
-        for col in dataframe.columns:
-            if col == "Name":  # Name은 이미 처리함
-                continue
-                
-            value = row[col]
-            
-            # 컬럼 속성 타입에 따라 처리
-            if col in db_properties:
-                prop_type = db_properties[col]["type"]
-                
-                if prop_type == "title":
-                    properties[col] = {
-                        "title": [{"text": {"content": str(value)}}]
-                    }
-                elif prop_type == "rich_text":
-                    properties[col] = {
-                        "rich_text": [{"text": {"content": str(value)}}]
-                    }
-                elif prop_type == "number":
-                    # 숫자로 변환 시도
-                    try:
-                        num_value = float(value) if value is not None and value != "" else None
-                        properties[col] = {"number": num_value}
-                    except (ValueError, TypeError):
-                        properties[col] = {"number": None}
-                elif prop_type == "date":
-                    # 날짜 형식으로 변환
-                    try:
-                        if pd and isinstance(value, pd.Timestamp):
-                            date_str = value.isoformat()
-                            properties[col] = {"date": {"start": date_str}}
-                        elif isinstance(value, datetime):
-                            date_str = value.isoformat()
-                            properties[col] = {"date": {"start": date_str}}
-                        elif isinstance(value, str) and value:
-                            # 문자열에서 날짜 파싱 시도
-                            try:
-                                date_obj = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                                properties[col] = {"date": {"start": date_obj.isoformat()}}
-                            except:
-                                properties[col] = {"date": None}
-                        else:
-                            properties[col] = {"date": None}
-                    except Exception:
-                        properties[col] = {"date": None}
-                elif prop_type == "select":
-                    # 선택 옵션
-                    if value:
-                        properties[col] = {"select": {"name": str(value)}}
-                    else:
-                        properties[col] = {"select": None}
-                elif prop_type == "multi_select":
-                    # 다중 선택 (문자열을 쉼표로 분리)
-                    if isinstance(value, str) and value:
-                        options = [{"name": option.strip()} for option in value.split(',')]
-                        properties[col] = {"multi_select": options}
-                    else:
-                        properties[col] = {"multi_select": []}
-                elif prop_type == "checkbox":
-                    # 불리언 값
-                    bool_value = bool(value) if value is not None else False
-                    properties[col] = {"checkbox": bool_value}
-                else:
-                    # 기타 타입은 텍스트로 변환
-                    properties[col] = {
-                        "rich_text": [{"text": {"content": str(value) if value is not None else ""}}]
-                    }
-        
-        try:
-            async with session.post(
-                "https://api.notion.com/v1/pages",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                    "Notion-Version": "2022-06-28"  # 최신 버전으로 업데이트 필요할 수 있음
-                },
-                json={
-                    "parent": {"database_id": database_id},
-                    "properties": properties
-                }
-            ) as response:
-                if response.status == 200:
-                    nonlocal success_count
-                    success_count += 1
-                else:
-                    nonlocal failed_rows
-                    failed_rows.append(index)
-                    resp_text = await response.text()
-                    print(f"오류 (행 {index}): {resp_text}")
-        except Exception as e:
-            failed_rows.append(index)
-            print(f"예외 발생 (행 {index}): {str(e)}")
-    
-    # 동시 요청 수 제한 (Notion API 제한 고려)
-    semaphore = asyncio.Semaphore(5)  # 최대 5개 동시 요청
-    
-    async def bounded_add_row(session, index, row):
-        async with semaphore:
-            await add_row(session, index, row)
-    
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for idx, row in dataframe.iterrows():
-            task = asyncio.ensure_future(bounded_add_row(session, idx, row))
-            tasks.append(task)
-        
-        # 진행 상황 표시
-        for f in asyncio.as_completed(tasks):
-            await f
-    
-    return success_count, total_rows, failed_rows
\ No newline at end of file
+@traced(rows=lambda summary: summary['create'] + summary['update'] + summary['archive'])
+def merge_rows_with_progress(notion, database_id, dataframe, key_column, archive_missing=True):
+    """
+    기존 데이터베이스에 결과를 MERGE (키 칼럼으로 비교해 바뀐 행만 추가·수정·보관)
+    Args:
+        notion (Client): 인증된 Notion API 클라이언트
+        database_id (str): MERGE 대상 데이터베이스 ID
+        dataframe (DataFrame): 새 결과
+        key_column (str): 행을 식별하는 칼럼
+        archive_missing (bool): 새 결과에 없는 키의 페이지를 보관할지 여부
+    Returns:
+        dict: {"create", "update", "archive", "unchanged", "skipped", "failed"} 행 수
+    """
+    db = notion.databases.retrieve(database_id=database_id)
+    # 비교에 필요한 속성(결과에 있는 칼럼)만 조회
+    columns = [col for col in dataframe.columns if col in db["properties"]]
+    current_pages = get_database_rows(notion, database_id, filter_properties=get_property_ids(db, columns))
+    requests, summary = build_merge_requests(
+        database_id, dataframe, key_column, current_pages, db["properties"], archive_missing=archive_missing
+    )
+    st.info(
+        f"MERGE: 추가 {summary['create']}행, 수정 {summary['update']}행, 보관 {summary['archive']}행, "
+        f"변경 없음 {summary['unchanged']}행"
+        + (f", 키가 없거나 중복되어 건너뜀 {summary['skipped']}행" if summary["skipped"] else "")
+    )
+    summary["failed"] = 0
+    if not requests:
+        return summary
+
+    progress_bar = st.progress(0.0, text=f"Notion에 {len(requests)}개 변경 반영 중...")
+
+    def on_progress(done, total):
+        progress_bar.progress(done / total, text=f"Notion에 변경 반영 중... ({done}/{total})")
+
+    start_time = time.time()
+    succeeded, failed = run_async(send_requests(
+        notion.options.auth, requests,
+        base_url=notion.options.base_url,
+        notion_version=notion.options.notion_version,
+        progress=on_progress,
+    ))
+    progress_bar.empty()
+
+    st.success(f"✅ {len(succeeded)}/{len(requests)} 변경 반영 완료! (소요 시간: {time.time()-start_time:.2f}초)")
+    if failed:
+        st.warning(f"⚠️ {len(failed)}개 변경 반영 실패")
+        _warn_uncertain(failed, "다시 MERGE하면 키 칼럼으로 비교하므로 이미 생성된 행은 중복 없이 건너뜁니다.")
+        with st.expander("실패한 변경 보기"):
+            st.dataframe(pd.DataFrame(
+                [{"action": action, "key": key, "error": error} for (action, key), error in failed.items()]
+            ))
+    summary["failed"] = len(failed)
+    return summary
+
+@traced(rows=lambda result: result[1])
+async def add_rows_to_notion_database_async(notion, database_id, dataframe, db_properties, left_db_name=None,
+                                            progress=None, journal=None, run_id=None):
+    """
+    비동기로 DataFrame의 행을 Notion 데이터베이스에 추가
+    토큰 버킷으로 요청 속도를 제한하고, 429는 Retry-After만큼 기다렸다가 재시도
+    페이지 생성은 멱등이 아니므로 5xx·응답 없는 끊김은 재시도하지 않고 처리 여부를 알 수 없는 실패로 반환
+    (is_uncertain 참고. 다시 보내면 페이지가 중복 생성될 수 있음)
+    journal(WriteJournal)과 run_id를 주면 저장한 행을 바로 기록하고, 이미 기록된 행은 건너뜀
+    Args:
+        db_properties (dict): 대상 데이터베이스 스키마의 properties (이벤트 루프를 막지 않도록 미리 조회)
+    Returns:
+        tuple: (성공 수(이전 실행 포함), 전체 수, 실패한 행 {행 인덱스: 오류 메시지})
+    """
+    on_success = None
+    already_done = 0
+    if journal is not None:
+        row_keys = make_row_keys(dataframe)
+        done_rows = journal.done_rows(run_id)
+        pending = ~row_keys.isin(done_rows.keys())
+        already_done = len(dataframe) - int(pending.sum())
+        dataframe = dataframe[pending.to_numpy()]
+
+        def on_success(index, page):
+            journal.record(run_id, row_keys[index], page["id"])
+
+    requests = build_create_requests(database_id, dataframe, db_properties, left_db_name)
+    succeeded, failed = await send_requests(
+        notion.options.auth, requests,
+        base_url=notion.options.base_url,
+        notion_version=notion.options.notion_version,
+        progress=progress,
+        on_success=on_success,
+    )
+    return already_done + len(succeeded), already_done + len(dataframe), failed
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+
+# row_cache와 같은 로컬 캐시 디렉터리 사용
+DEFAULT_JOURNAL_PATH = os.path.join(".notion_cache", "journal.sqlite")
+
+
+def make_run_id(*parts):
+    """내보내기 설정(DB, 조건, 저장 위치 등)으로 결정되는 실행 ID"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def make_row_keys(dataframe):
+    """
+    행 내용으로 결정되는 키 (같은 내용의 행은 등장 순서로 구분)
+    재실행해서 행 순서가 바뀌어도 이미 저장한 행을 알아볼 수 있음
+    """
+    hashes = pd.util.hash_pandas_object(dataframe, index=False)
+    occurrence = hashes.groupby(hashes).cumcount()
+    return pd.Series(
+        [f"{h:016x}-{n}" for h, n in zip(hashes.to_numpy(), occurrence.to_numpy())],
+        index=dataframe.index,
+    )
+
+
+class WriteJournal:
+    """내보내기 실행별로 생성된 데이터베이스와 저장이 끝난 행(page ID)을 기록하는 SQLite 저널"""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    base_id TEXT NOT NULL,
+                    database_id TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS rows (
+                    run_id TEXT NOT NULL,
+                    row_key TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    PRIMARY KEY (run_id, row_key)
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def resume_run(self, base_id):
+        """
+        같은 설정으로 중단된 실행이 있으면 이어서, 없으면 새 실행을 시작
+        Returns:
+            tuple: (run_id, database_id 또는 None)
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id, database_id FROM runs WHERE base_id = ? AND finished_at IS NULL "
+                "ORDER BY created_at DESC LIMIT 1",
+                (base_id,),
+            ).fetchone()
+            if row:
+                return row[0], row[1]
+            count = conn.execute("SELECT COUNT(*) FROM runs WHERE base_id = ?", (base_id,)).fetchone()[0]
+            run_id = f"{base_id}-{count + 1}"
+            conn.execute(
+                "INSERT INTO runs (run_id, base_id, created_at) VALUES (?, ?, ?)",
+                (run_id, base_id, time.time()),
+            )
+        return run_id, None
+
+    def set_database(self, run_id, database_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET database_id = ? WHERE run_id = ?", (database_id, run_id))
+
+    def done_rows(self, run_id):
+        """이미 저장한 행 {row_key: page_id}"""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT row_key, page_id FROM rows WHERE run_id = ?", (run_id,)).fetchall())
+
+    def record(self, run_id, row_key, page_id):
+        """행 하나가 저장될 때마다 바로 기록 (중간에 끊겨도 그 시점까지는 보존)"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rows (run_id, row_key, page_id) VALUES (?, ?, ?)",
+                (run_id, row_key, page_id),
+            )
+
+    def finish(self, run_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def abandon(self, base_id):
+        """같은 설정으로 중단된 실행을 모두 끝난 것으로 표시 (다음 resume_run은 새 실행을 시작)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE runs SET finished_at = ? WHERE base_id = ? AND finished_at IS NULL",
+                (time.time(), base_id),
+            )